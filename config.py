@@ -32,8 +32,95 @@ STRAINS = {
 ANALYSIS_PARAMS = {
     "min_contig_length": 500,      # Longueur minimale des contigs à analyser
     "window_size": 1000,           # Taille de fenêtre pour analyses locales
-    "similarity_threshold": 0.8,    # Seuil de similarité
-    "gc_window": 100              # Fenêtre pour calcul GC local
+    "similarity_threshold": 0.8,    # Seuil de similarité (graphe des voisins, groupes de souches)
+    "gc_window": 100,             # Fenêtre pour calcul GC local
+    "min_repeat_length": 100      # Longueur minimale des répétitions exactes
+}
+
+# Métriques de la comparaison (registre lacto.metrics)
+COMPARISON_PARAMS = {
+    "metrics": ["kmer", "sequence", "gc", "size", "codon", "synteny"],  # Métriques calculées
+    "weights": {                    # Similarité composite (poids nul : métrique non calculée)
+        "kmer": 0.4,                # Plus important pour la similarité globale
+        "sequence": 0.3,            # Important pour la structure
+        "gc": 0.2,                  # Composition
+        "size": 0.1                 # Taille moins critique
+    },
+    "dotplots": False               # Matrices de points PNG par paire (~1,3 s/paire ; --dotplots)
+}
+
+# Masquage avant les métriques de composition (lacto.masking)
+MASK_PARAMS = {
+    "soft_mask": True,              # Masquer les minuscules du FASTA (masquage doux)
+    "dust": True,                   # Masquer les régions de faible complexité
+    "dust_window": 64,              # Fenêtre DUST (bases, pas d'une demi-fenêtre)
+    "dust_level": 20                # Seuil DUST (échelle dustmasker -level)
+}
+
+# Contrôle qualité des assemblages sur les longueurs de contigs (lacto.qc)
+QC_PARAMS = {
+    "min_contig_length": 500,       # Contigs plus courts ignorés (comme l'étape 2)
+    "expected_genome_size": None,   # Taille attendue pour NG50 (None: médiane des assemblages)
+    "min_n50": 20_000,              # N50 minimal (bp)
+    "max_contigs": 500,             # Nombre maximal de contigs
+    "max_size_deviation": 0.2,      # Écart relatif maximal à la taille attendue
+    "histogram_bins": [1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000]  # Bornes (bp)
+}
+
+# Paramètres du pangénome (k-mers)
+PANGENOME_PARAMS = {
+    "k": 21,                        # Taille des k-mers canoniques (21-31)
+    "n_permutations": 10,           # Permutations pour les courbes de raréfaction
+    "max_bucket_kmers": 5_000_000,  # Occurrences max. par partition (borne mémoire)
+    "max_memory_mb": 256,           # Budget mémoire du comptage des k-mers (Mo)
+    "seed": 42
+}
+
+# Îlots génomiques propres à une souche (lacto.islands)
+ISLAND_PARAMS = {
+    "k": 21,                        # Taille des k-mers (celle du pangénome : ensembles réutilisés)
+    "window_size": 5000,            # Fenêtres de calcul de la fraction de k-mers spécifiques (bp)
+    "min_specific_fraction": 0.5,   # Fraction minimale d'une fenêtre d'îlot
+    "max_gap_windows": 1,           # Fenêtres sous le seuil tolérées à l'intérieur d'un îlot
+    "min_island_length": 10000      # Longueur minimale d'un îlot (bp)
+}
+
+# Paramètres des profils de k-mers depuis les lectures FASTQ (lacto.reads)
+READS_PARAMS = {
+    "k": 21,                        # Taille des k-mers du filtre d'abondance
+    "min_abundance": 3,             # Occurrences minimales d'un k-mer solide (erreurs exclues)
+    "max_memory_mb": 256,           # Budget mémoire du comptage des k-mers (Mo)
+    "block_mb": 16                  # Taille des blocs de FASTQ lus (Mo de texte)
+}
+
+# Paramètres du bootstrap de l'arbre des souches
+BOOTSTRAP_PARAMS = {
+    "replicates": 100,              # Nombre de réplicats
+    "mode": "kmers",                # Rééchantillonnage: "kmers" (colonnes) ou "windows" (fenêtres)
+    "k": 4,                         # Taille des k-mers des profils
+    "window_size": 10000,           # Taille des fenêtres rééchantillonnées (pb)
+    "linkage": "ward",              # Méthode de construction de l'arbre (comme l'arbre principal)
+    "batch_size": 10,               # Réplicats calculés ensemble par processus
+    "seed": 42
+}
+
+# Graphe creux des voisins et groupes de souches (lacto.neighbors, étape 3)
+NEIGHBOR_PARAMS = {
+    "top_k": 10,                    # Plus proches voisins gardés par souche
+    "max_degree": 50,               # Voisins au plus par souche (top_k + voisins au-dessus du seuil)
+    "block_size": 256,              # Souches comparées à tout le panel par bloc (mémoire block_size x n)
+    "cluster_thresholds": [0.9, 0.95]  # Seuils de groupes en plus de ANALYSIS_PARAMS['similarity_threshold']
+}
+
+# Lecture anticipée des génomes (lacto.prefetch, étapes 02 et 03)
+PREFETCH_PARAMS = {
+    "depth": 2,                     # Génomes lus d'avance (0 : lecture à la demande, 1 : double tampon)
+    "max_memory_mb": 1024           # Mémoire maximale des génomes lus d'avance (Mo)
+}
+
+# Noyaux de calcul par base (lacto.kernels) ; la variable LACTO_KERNELS a priorité
+KERNEL_PARAMS = {
+    "backend": "auto"               # "auto" (Numba si installé), "numba" ou "numpy"
 }
 
 # Dossiers
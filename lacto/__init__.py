@@ -0,0 +1,4 @@
+"""
+Bibliothèque partagée du pipeline de génomique comparative
+Lactobacillus bulgaricus - Fonctions communes aux scripts 02 à 04
+"""
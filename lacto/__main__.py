@@ -0,0 +1,9 @@
+"""
+python3 -m lacto <commande> [options] (voir lacto/cli.py)
+"""
+
+import sys
+
+from lacto.cli import main
+
+sys.exit(main())
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Étape 2 du pipeline : analyse des séquences génomiques
+
+Statistiques d'assemblage, composition, ORF et usage des codons, répétitions
+et pistes positionnelles de chaque souche. run_analysis calcule tout en
+mémoire, write_analysis_outputs écrit les tableaux, le JSON, les répétitions,
+masques et pistes de chaque souche, les graphiques et le rapport ;
+lacto.pipeline enchaîne ces fonctions sans relire les fichiers.
+
+Usage: python3 scripts/02_sequence_analysis.py
+"""
+
+import os
+import sys
+import pandas as pd
+import numpy as np
+import json
+import argparse
+from datetime import datetime
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.atomic import atomic_path
+from lacto.contigs import load_contig_set, contig_metrics, gc_windows
+from lacto.faidx import load_fai
+from lacto.tracks import build_track_pyramid, write_track_file
+from lacto.orfs import codon_usage_profile, codon_usage_table, amino_acid_table
+from lacto.repeats import find_repeats
+from lacto.masking import masked_length, mask_bed_lines
+from lacto.qc import assembly_stats
+from lacto.prefetch import prefetch, describe_prefetch
+
+try:
+    from config import ANALYSIS_PARAMS
+except ImportError:
+    ANALYSIS_PARAMS = {"min_contig_length": 500, "gc_window": 100, "min_repeat_length": 100}
+
+# Résultats gardés en mémoire jusqu'à write_analysis_outputs (absents du JSON détaillé)
+IN_MEMORY_OUTPUTS = ('repeats_table', 'mask_bed_lines', 'track_pyramid', 'track_contigs')
+
+# Configuration simple
+STRAINS = {
+    "ATCC11842": {"filename": "LB_ATCC11842.fna", "description": "Souche type"},
+    "DSM20081": {"filename": "LB_DSM20081.fna", "description": "Souche commerciale"}, 
+    "CNCM1519": {"filename": "LB_CNCM1519.fna", "description": "Souche probiotique"}
+}
+
+def calculate_gc_content(sequence):
+    """Calculer le contenu GC manuellement"""
+    if not sequence:
+        return 0
+    g_count = sequence.upper().count('G')
+    c_count = sequence.upper().count('C')
+    total_bases = len([base for base in sequence.upper() if base in 'ATGC'])
+    if total_bases == 0:
+        return 0
+    return (g_count + c_count) / total_bases * 100
+
+def calculate_n50(lengths):
+    """Calculer N50"""
+    return int(assembly_stats([np.asarray(lengths, dtype=np.int64)])['n50'][0])
+
+def calculate_length_stats(lengths):
+    """Statistiques de longueur des contigs (nombre, total, extrêmes, N50)"""
+    lengths = [int(length) for length in lengths]
+    return {
+        'num_contigs': len(lengths),
+        'contig_lengths': lengths,
+        'total_length': sum(lengths),
+        'longest_contig': max(lengths) if lengths else 0,
+        'shortest_contig': min(lengths) if lengths else 0,
+        'mean_contig_length': float(np.mean(lengths)) if lengths else 0,
+        'median_contig_length': float(np.median(lengths)) if lengths else 0,
+        'n50': calculate_n50(lengths),
+    }
+
+def analyze_fasta_file(fasta_path, strain_name, min_contig_length=None, contigs=None):
+    """Analyser un fichier FASTA
+    
+    Les contigs plus courts que ANALYSIS_PARAMS['min_contig_length'] sont
+    exclus. Les métriques sont calculées par contig en un seul passage
+    vectorisé, puis agrégées pour le génome entier. contigs permet de
+    réutiliser un génome déjà chargé (même min_contig_length). Rien n'est
+    écrit : répétitions, masque et pistes sont rendus dans les statistiques
+    (IN_MEMORY_OUTPUTS) et écrits par write_analysis_outputs.
+    """
+    print_status('info', f"Analyse de {strain_name}...")
+    
+    if not os.path.exists(fasta_path):
+        print_status('error', f"Fichier non trouvé: {fasta_path}")
+        return None
+    
+    if min_contig_length is None:
+        min_contig_length = ANALYSIS_PARAMS['min_contig_length']
+    
+    # Statistiques de longueur depuis l'index .fai (sans décoder les séquences)
+    try:
+        index = load_fai(fasta_path)
+    except ValueError:
+        index = None
+    
+    if contigs is None:
+        try:
+            contigs = load_contig_set(fasta_path, min_contig_length)
+        except Exception as e:
+            print_status('error', f"Erreur lecture {fasta_path}: {e}")
+            return None
+    
+    if not contigs['total_length']:
+        print_status('error', f"Aucune séquence >= {min_contig_length} bp dans {fasta_path}")
+        return None
+    
+    if index is not None:
+        keep = index['lengths'] >= min_contig_length
+        length_stats = calculate_length_stats(index['lengths'][keep])
+    else:
+        length_stats = calculate_length_stats(contigs['lengths'])
+    
+    # Métriques par contig (composition, GC, fraction de N)
+    per_contig = contig_metrics(contigs)
+    a_count, c_count, g_count, t_count, n_count, other_count = (
+        int(count) for count in per_contig['composition'].sum(axis=0))
+    total_length = length_stats['total_length']
+    acgt_count = a_count + c_count + g_count + t_count
+    
+    # GC local (fenêtres de ANALYSIS_PARAMS['gc_window'] bp, contig par contig)
+    local_gc = gc_windows(contigs, ANALYSIS_PARAMS['gc_window'])
+    
+    # ORF sur les six cadres et usage des codons
+    codon_profile = codon_usage_profile(contigs)
+    
+    # Répétitions exactes (tableau des suffixes, deux brins)
+    repeats = find_repeats(contigs, ANALYSIS_PARAMS['min_repeat_length'])
+    repeats_path = os.path.join('data/analysis/repeats', f"{strain_name}_repeats.tsv")
+    
+    # Masque (IUPAC, minuscules, faible complexité) appliqué aux k-mers et au GC local
+    mask_path = os.path.join('data/analysis/masks', f"{strain_name}_mask.bed")
+    mask = contigs.get('mask')
+    
+    # Pistes positionnelles multi-résolution (GC, skew, entropie, ambiguïtés)
+    tracks_path = os.path.join('data/analysis/tracks', f"{strain_name}.tracks")
+    track_pyramid = build_track_pyramid(contigs)
+    
+    # Calculer les statistiques
+    stats = {
+        'strain_name': strain_name,
+        'file_path': fasta_path,
+        'analysis_date': datetime.now().isoformat(),
+        'min_contig_length': min_contig_length,
+        'num_contigs': length_stats['num_contigs'],
+        'excluded_contigs': contigs['excluded_contigs'],
+        'excluded_length': contigs['excluded_length'],
+        'contig_lengths': length_stats['contig_lengths'],
+        'contig_names': contigs['names'],
+        'contig_gc': [round(float(gc), 3) for gc in per_contig['gc_percent']],
+        'contig_n_fraction': [round(float(nf), 6) for nf in per_contig['n_fraction']],
+        'total_length': total_length,
+        'longest_contig': length_stats['longest_contig'],
+        'shortest_contig': length_stats['shortest_contig'],
+        'mean_contig_length': length_stats['mean_contig_length'],
+        'median_contig_length': length_stats['median_contig_length'],
+        'n50': length_stats['n50'],
+        'gc_content': (g_count + c_count) / acgt_count * 100 if acgt_count else 0,
+        'gc_local_std': float(local_gc.std()) if len(local_gc) else 0.0,
+        'a_count': a_count,
+        't_count': t_count,
+        'g_count': g_count,
+        'c_count': c_count,
+        'n_count': n_count,
+        'ambiguous_count': other_count,
+        'n_fraction': n_count / total_length,
+        'masked_length': masked_length(mask) if mask is not None else 0,
+        'masked_low_complexity': mask['low_complexity'] if mask is not None else 0,
+        'masked_soft': mask['soft_masked'] if mask is not None else 0,
+        'mask_file': mask_path if mask is not None else None,
+        'tracks_file': tracks_path,
+        'orf_count': codon_profile['orf_count'],
+        'coding_fraction': codon_profile['coding_fraction'],
+        'codon_counts': [int(count) for count in codon_profile['codon_counts']],
+        'rscu': [round(float(value), 4) for value in codon_profile['rscu']],
+        'amino_acids': [float(freq) for freq in codon_profile['amino_acids']],
+        'repeat_families': repeats['families'],
+        'repeat_fraction': repeats['repeat_fraction'],
+        'longest_repeat': repeats['longest_repeat'],
+        'max_repeat_copies': repeats['max_copies'],
+        'repeats_file': repeats_path,
+        'repeats_table': repeats['repeats'],
+        'mask_bed_lines': mask_bed_lines(contigs) if mask is not None else None,
+        'track_pyramid': track_pyramid,
+        'track_contigs': {'names': contigs['names'], 'lengths': contigs['lengths']},
+    }
+    
+    # Calculer AT content
+    total_at = stats['a_count'] + stats['t_count']
+    stats['at_content'] = total_at / total_length * 100
+    
+    excluded = f" ({contigs['excluded_contigs']} contigs < {min_contig_length} bp exclus)" if contigs['excluded_contigs'] else ""
+    print_status('success', f"{strain_name}: {stats['num_contigs']} contigs, {stats['total_length']:,} bp, GC: {stats['gc_content']:.1f}%{excluded}")
+    
+    return stats
+
+def create_summary_table(all_stats):
+    """Créer un tableau de résumé"""
+    summary_data = []
+    
+    for stats in all_stats:
+        if stats:
+            summary_data.append({
+                'Souche': stats['strain_name'],
+                'Contigs': stats['num_contigs'],
+                'Taille_totale_bp': stats['total_length'],
+                'Taille_totale_Mb': round(stats['total_length'] / 1_000_000, 2),
+                'GC_percent': round(stats['gc_content'], 2),
+                'AT_percent': round(stats['at_content'], 2),
+                'N50_bp': stats['n50'],
+                'Contig_max_bp': stats['longest_contig'],
+                'Contig_min_bp': stats['shortest_contig'],
+                'Contig_moyen_bp': round(stats['mean_contig_length'], 0),
+                'Repetitions_familles': stats['repeat_families'],
+                'Repetitions_percent': round(stats['repeat_fraction'] * 100, 2),
+                'Repetition_max_bp': stats['longest_repeat'],
+                'Masque_percent': round(stats['masked_length'] / stats['total_length'] * 100, 2),
+                'Complexite': round(len(set(stats['contig_names'])) / stats['num_contigs'], 3) if stats['num_contigs'] > 0 else 0
+            })
+    
+    return pd.DataFrame(summary_data)
+
+def create_basic_plots(all_stats):
+    """Créer des graphiques de base"""
+    import matplotlib.pyplot as plt
+    
+    if not all_stats or all([s is None for s in all_stats]):
+        print_status('warning', "Aucune donnée pour les graphiques")
+        return
+    
+    valid_stats = [s for s in all_stats if s is not None]
+    strains = [s['strain_name'] for s in valid_stats]
+    
+    # Créer les dossiers
+    os.makedirs('data/results/plots', exist_ok=True)
+    
+    plt.style.use('default')
+    
+    # Graphique des statistiques de base
+    fig, axes = plt.subplots(2, 2, figsize=(12, 10))
+    fig.suptitle('Statistiques Génomiques - Lactobacillus bulgaricus', fontsize=14, fontweight='bold')
+    
+    # Taille des génomes
+    genome_sizes = [s['total_length'] / 1_000_000 for s in valid_stats]
+    bars1 = axes[0, 0].bar(strains, genome_sizes, color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
+    axes[0, 0].set_title('Taille des Génomes (Mb)')
+    axes[0, 0].set_ylabel('Taille (Mb)')
+    axes[0, 0].tick_params(axis='x', rotation=45)
+    
+    for bar, size in zip(bars1, genome_sizes):
+        axes[0, 0].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.05,
+                       f'{size:.2f}', ha='center', va='bottom', fontweight='bold')
+    
+    # Contenu GC
+    gc_contents = [s['gc_content'] for s in valid_stats]
+    bars2 = axes[0, 1].bar(strains, gc_contents, color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
+    axes[0, 1].set_title('Contenu GC (%)')
+    axes[0, 1].set_ylabel('GC (%)')
+    axes[0, 1].tick_params(axis='x', rotation=45)
+    
+    for bar, gc in zip(bars2, gc_contents):
+        axes[0, 1].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.5,
+                       f'{gc:.1f}%', ha='center', va='bottom', fontweight='bold')
+    
+    # Nombre de contigs
+    contig_counts = [s['num_contigs'] for s in valid_stats]
+    bars3 = axes[1, 0].bar(strains, contig_counts, color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
+    axes[1, 0].set_title('Nombre de Contigs')
+    axes[1, 0].set_ylabel('Contigs')
+    axes[1, 0].tick_params(axis='x', rotation=45)
+    
+    for bar, count in zip(bars3, contig_counts):
+        axes[1, 0].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
+                       f'{count}', ha='center', va='bottom', fontweight='bold')
+    
+    # N50
+    n50_values = [s['n50'] / 1000 for s in valid_stats]
+    bars4 = axes[1, 1].bar(strains, n50_values, color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
+    axes[1, 1].set_title('N50 (kb)')
+    axes[1, 1].set_ylabel('N50 (kb)')
+    axes[1, 1].tick_params(axis='x', rotation=45)
+    
+    for bar, n50 in zip(bars4, n50_values):
+        axes[1, 1].text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(n50_values)*0.02,
+                       f'{n50:.0f}', ha='center', va='bottom', fontweight='bold')
+    
+    plt.tight_layout()
+    
+    output_path = 'data/results/plots/genome_statistics.png'
+    with atomic_path(output_path) as temporary:
+        plt.savefig(temporary, dpi=300, bbox_inches='tight')
+    print_status('success', f"Graphique sauvegardé: {output_path}")
+    plt.close()
+
+def run_analysis(genomes=None, loaded=None):
+    """Analyser chaque souche de STRAINS ; genomes : contigs déjà chargés par souche (optionnel)
+    
+    Les génomes non fournis sont lus d'avance sur un fil d'arrière-plan
+    (lacto.prefetch) pendant l'analyse de la souche précédente. Si loaded est
+    un dictionnaire, il reçoit les contigs de chaque souche analysée.
+    """
+    genomes = genomes or {}
+    all_stats = []
+    min_contig_length = ANALYSIS_PARAMS['min_contig_length']
+    
+    print_status('info', f"Analyse de {len(STRAINS)} souches...")
+    print()
+    
+    def load(strain_name):
+        if strain_name in genomes:
+            return genomes[strain_name]
+        fasta_path = os.path.join('data/genomes', STRAINS[strain_name]['filename'])
+        return load_contig_set(fasta_path, min_contig_length) if os.path.exists(fasta_path) else None
+    
+    prefetch_stats = {}
+    for strain_name, contigs, error in prefetch(list(STRAINS), load, stats=prefetch_stats):
+        fasta_path = os.path.join('data/genomes', STRAINS[strain_name]['filename'])
+        if error is not None:
+            print_status('error', f"Erreur lecture {fasta_path}: {error}")
+            all_stats.append(None)
+            continue
+        
+        stats = analyze_fasta_file(fasta_path, strain_name, contigs=contigs)
+        all_stats.append(stats)
+        if stats is not None and loaded is not None:
+            loaded[strain_name] = contigs
+        del contigs
+    
+    print()
+    print_status('info', describe_prefetch(prefetch_stats))
+    
+    # Filtrer les analyses réussies
+    successful_analyses = [s for s in all_stats if s is not None]
+    
+    if successful_analyses:
+        print_status('success', f"{len(successful_analyses)}/{len(all_stats)} analyses réussies")
+        print()
+    return successful_analyses
+
+def write_strain_outputs(stats):
+    """Répétitions, masque (BED) et pistes d'une souche (IN_MEMORY_OUTPUTS), chacun écrit atomiquement"""
+    os.makedirs(os.path.dirname(stats['repeats_file']), exist_ok=True)
+    with atomic_path(stats['repeats_file']) as temporary:
+        stats['repeats_table'].to_csv(temporary, sep='\t', index=False)
+    
+    if stats['mask_file'] is not None:
+        os.makedirs(os.path.dirname(stats['mask_file']), exist_ok=True)
+        with atomic_path(stats['mask_file']) as temporary, open(temporary, 'w') as f:
+            f.writelines(stats['mask_bed_lines'])
+    
+    os.makedirs(os.path.dirname(stats['tracks_file']), exist_ok=True)
+    with atomic_path(stats['tracks_file']) as temporary:
+        write_track_file(stats['track_pyramid'], stats['track_contigs'], temporary)
+
+def write_analysis_outputs(successful_analyses):
+    """Tableau de résumé, JSON détaillé, usage des codons, fichiers par souche, graphiques et rapport ; retourne le résumé"""
+    # Créer le tableau de résumé
+    print_status('info', "Création du tableau de résumé...")
+    summary_df = create_summary_table(successful_analyses)
+    
+    # Sauvegarder les résultats
+    json_path = 'data/analysis/detailed_analysis.json'
+    with atomic_path(json_path) as temporary, open(temporary, 'w') as f:
+        json.dump([{key: value for key, value in stats.items() if key not in IN_MEMORY_OUTPUTS}
+                   for stats in successful_analyses], f, indent=2, default=str)
+    print_status('success', f"Analyse détaillée: {json_path}")
+    
+    csv_path = 'data/analysis/genome_statistics.csv'
+    with atomic_path(csv_path) as temporary:
+        summary_df.to_csv(temporary, index=False)
+    print_status('success', f"Tableau de résumé: {csv_path}")
+    
+    codon_profiles = {
+        stats['strain_name']: {
+            'orf_count': stats['orf_count'],
+            'coding_fraction': stats['coding_fraction'],
+            'codon_counts': stats['codon_counts'],
+            'rscu': stats['rscu'],
+            'amino_acids': stats['amino_acids'],
+        }
+        for stats in successful_analyses
+    }
+    codon_path = 'data/analysis/codon_usage.csv'
+    with atomic_path(codon_path) as temporary:
+        codon_usage_table(codon_profiles).to_csv(temporary, index=False)
+    print_status('success', f"Usage des codons: {codon_path}")
+    
+    amino_path = 'data/analysis/amino_acid_composition.csv'
+    with atomic_path(amino_path) as temporary:
+        amino_acid_table(codon_profiles).to_csv(temporary, index=False)
+    print_status('success', f"Composition en acides aminés: {amino_path}")
+    
+    for stats in successful_analyses:
+        write_strain_outputs(stats)
+    print_status('success', "Répétitions, masques et pistes: data/analysis/repeats, masks, tracks")
+    
+    # Affichage du résumé
+    print()
+    print("📊 === RÉSUMÉ DES ANALYSES ===")
+    print()
+    print(summary_df.to_string(index=False))
+    print()
+    
+    # Créer des graphiques
+    print_status('info', "Création des visualisations...")
+    create_basic_plots(successful_analyses)
+    
+    # Rapport textuel
+    report_path = 'data/analysis/analysis_report.txt'
+    with atomic_path(report_path) as temporary, open(temporary, 'w') as f:
+        f.write("=== RAPPORT D'ANALYSE GÉNOMIQUE ===\n")
+        f.write(f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n")
+        f.write(f"Projet: Lactobacillus bulgaricus - Génomique comparative\n\n")
+        
+        f.write("SOUCHES ANALYSÉES:\n")
+        for stats in successful_analyses:
+            f.write(f"\n{stats['strain_name']}:\n")
+            f.write(f"  - Taille: {stats['total_length']:,} bp ({stats['total_length']/1_000_000:.2f} Mb)\n")
+            f.write(f"  - Contigs: {stats['num_contigs']}\n")
+            f.write(f"  - GC: {stats['gc_content']:.1f}%\n")
+            f.write(f"  - N50: {stats['n50']:,} bp\n")
+            f.write(f"  - ORF (six cadres, >= 100 codons): {stats['orf_count']:,}\n")
+            f.write(f"  - Répétitions >= {ANALYSIS_PARAMS['min_repeat_length']} bp: {stats['repeat_families']} familles, "
+                    f"{stats['repeat_fraction'] * 100:.2f}% du génome, plus longue {stats['longest_repeat']:,} bp "
+                    f"(copies max: {stats['max_repeat_copies']})\n")
+        
+        f.write(f"\nSTATISTIQUES COMPARATIVES:\n")
+        f.write(f"  - Taille moyenne: {summary_df['Taille_totale_bp'].mean():,.0f} bp\n")
+        f.write(f"  - GC moyen: {summary_df['GC_percent'].mean():.1f}%\n")
+        f.write(f"  - Variation de taille: {summary_df['Taille_totale_bp'].std():,.0f} bp\n")
+        f.write(f"  - Variation GC: {summary_df['GC_percent'].std():.2f}%\n")
+    
+    print_status('success', f"Rapport textuel: {report_path}")
+    return summary_df
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Analyse des séquences génomiques (étape 2)")
+    parser.parse_args()
+    
+    print("🧬 === ANALYSE DES SÉQUENCES GÉNOMIQUES ===")
+    print(f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    print()
+    
+    # Créer les dossiers
+    os.makedirs('data/analysis', exist_ok=True)
+    os.makedirs('data/results/plots', exist_ok=True)
+    
+    # Analyser chaque souche
+    successful_analyses = run_analysis()
+    
+    if not successful_analyses:
+        print_status('error', "Aucune analyse réussie !")
+        sys.exit(1)
+    
+    write_analysis_outputs(successful_analyses)
+    
+    print()
+    print_status('success', "🎉 Analyse des séquences terminée!")
+    print_status('info', "➡️  Prochaine étape: python3 scripts/03_genome_comparison.py")
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Écriture atomique des fichiers de résultats
+
+Le fichier est écrit sous un nom temporaire dans le même dossier puis
+renommé (os.replace) : un lecteur voit l'ancienne ou la nouvelle version,
+jamais un fichier partiel.
+"""
+
+import os
+import socket
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_path(path):
+    """Chemin temporaire à écrire, remplacé atomiquement à path en sortie du bloc
+
+    Le nom temporaire garde l'extension (format déduit par matplotlib, pandas)
+    et contient l'hôte et le processus (plusieurs écrivains sur un dossier partagé).
+    """
+    directory, name = os.path.split(path)
+    temporary = os.path.join(directory, f".{socket.gethostname()}.{os.getpid()}.{name}")
+    try:
+        yield temporary
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
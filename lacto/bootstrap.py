@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Valeurs de support bootstrap pour l'arbre des souches
+
+Chaque génome est résumé par la matrice des comptes de k-mers de ses
+fenêtres (n_fenêtres x 4^k). Deux modes de rééchantillonnage :
+
+  - kmers   : tirage avec remise des colonnes (k-mers) du profil global,
+              commun à toutes les souches ;
+  - windows : tirage avec remise des fenêtres de chaque génome, profil
+              recalculé comme somme pondérée des lignes.
+
+Pour chaque réplicat, la matrice de distances (1 - similarité cosinus, comme
+compare_kmer_vectors) est recalculée par lots de réplicats en une seule
+opération matricielle, puis l'arbre est construit (scipy linkage). Les
+réplicats sont répartis sur un pool de processus ; chaque réplicat a son
+propre générateur issu de np.random.SeedSequence(seed).spawn(), si bien que
+le résultat ne dépend ni du nombre de processus ni du découpage en lots.
+
+Le support d'un clade est la fraction des réplicats qui le contiennent ; il
+est reporté sur l'arbre des données complètes et sur l'arbre consensus
+majoritaire (Newick).
+
+Usage: python3 -m lacto.bootstrap --replicates 100 --workers 4
+"""
+
+import os
+import sys
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import linkage
+from scipy.spatial.distance import squareform
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.contigs import as_contig_set, kmer_start_mask, load_contig_set
+
+try:
+    from config import STRAINS, PATHS, ANALYSIS_PARAMS, BOOTSTRAP_PARAMS
+except ImportError:
+    STRAINS, PATHS = {}, {"genomes": "data/genomes", "results": "data/results"}
+    ANALYSIS_PARAMS = {"min_contig_length": 500}
+    BOOTSTRAP_PARAMS = {"replicates": 100, "mode": "kmers", "k": 4, "window_size": 10000,
+                        "linkage": "ward", "batch_size": 10, "seed": 42}
+
+MODES = ('kmers', 'windows')
+
+# Données partagées par les processus du pool (fixées par _init_worker)
+_WORKER_DATA = None
+
+
+def window_kmer_matrix(contigs, k=4, window_size=10000):
+    """Comptes de k-mers (uint32) de chaque fenêtre d'un génome, matrice (n_fenêtres, 4^k)
+
+    Les fenêtres sont découpées contig par contig (la dernière peut être plus
+    courte) ; chaque k-mer valide est attribué à la fenêtre de sa position de
+    début, si bien que la somme des lignes est le profil complet du génome.
+    """
+    contigs = as_contig_set(contigs)
+    codes, valid = kmer_start_mask(contigs, k)
+    n_kmers = len(valid)
+    windows_per_contig = -(-contigs['lengths'] // window_size)
+    n_windows = int(windows_per_contig.sum())
+    if n_kmers == 0:
+        return np.zeros((n_windows, 4 ** k), dtype=np.uint32)
+
+    kmer_index = np.zeros(n_kmers, dtype=np.int64)
+    for offset in range(k):
+        kmer_index = kmer_index * 4 + (codes[offset:offset + n_kmers] & 3)
+
+    # Fenêtre de chaque position : première fenêtre du contig + rang dans le contig
+    first_window = np.concatenate(([0], np.cumsum(windows_per_contig)[:-1]))
+    contig_of = np.repeat(np.arange(len(contigs['lengths'])), contigs['lengths'])[:n_kmers]
+    window_of = first_window[contig_of] + (np.arange(n_kmers) - contigs['offsets'][:-1][contig_of]) // window_size
+
+    counts = np.bincount(window_of[valid] * 4 ** k + kmer_index[valid], minlength=n_windows * 4 ** k)
+    return counts.reshape(n_windows, 4 ** k).astype(np.uint32)
+
+
+def cosine_distances(profiles):
+    """Distances 1 - cosinus pour un lot de profils (réplicats, souches, k-mers)"""
+    norms = np.linalg.norm(profiles, axis=2, keepdims=True)
+    unit = np.divide(profiles, norms, out=np.zeros_like(profiles), where=norms > 0)
+    similarity = unit @ unit.transpose(0, 2, 1)
+    distances = np.clip(1.0 - similarity, 0.0, None)
+    diagonal = np.arange(profiles.shape[1])
+    distances[:, diagonal, diagonal] = 0.0
+    return distances
+
+
+def replicate_profiles(data, generators):
+    """Profils rééchantillonnés d'un lot de réplicats : (réplicats, souches, 4^k)"""
+    if data['mode'] == 'kmers':
+        profiles = data['profiles']
+        n_columns = profiles.shape[1]
+        weights = np.stack([rng.multinomial(n_columns, np.full(n_columns, 1.0 / n_columns))
+                            for rng in generators]).astype(np.float64)
+        return profiles[None, :, :] * weights[:, None, :]
+
+    batch = np.zeros((len(generators), len(data['windows']), data['windows'][0].shape[1]))
+    for strain, matrix in enumerate(data['windows']):
+        n_windows = matrix.shape[0]
+        weights = np.stack([rng.multinomial(n_windows, np.full(n_windows, 1.0 / n_windows))
+                            for rng in generators]).astype(np.float64)
+        batch[:, strain, :] = weights @ matrix
+    return batch
+
+
+def tree_clades(distance_matrix, method='ward'):
+    """Arbre (matrice de liaison) et clades internes sous forme de masques de bits"""
+    n_strains = len(distance_matrix)
+    tree = linkage(squareform(distance_matrix, checks=False), method=method)
+    members = [1 << leaf for leaf in range(n_strains)]
+    for left, right, _, _ in tree:
+        members.append(members[int(left)] | members[int(right)])
+    return tree, members[n_strains:]
+
+
+def _init_worker(data):
+    global _WORKER_DATA
+    _WORKER_DATA = data
+
+
+def _run_batch(seeds):
+    """Clades de chaque réplicat d'un lot (exécuté dans un processus du pool)"""
+    data = _WORKER_DATA
+    generators = [np.random.default_rng(seed) for seed in seeds]
+    distances = cosine_distances(replicate_profiles(data, generators))
+    return [tree_clades(matrix, data['method'])[1] for matrix in distances]
+
+
+def prepare_bootstrap_data(genomes, mode='kmers', k=4, window_size=10000, method='ward'):
+    """Matrices de fenêtres de chaque génome et profils complets"""
+    if mode not in MODES:
+        raise ValueError(f"Mode de bootstrap inconnu: {mode} (attendu: {', '.join(MODES)})")
+    windows = [window_kmer_matrix(genome, k, window_size) for genome in genomes.values()]
+    profiles = np.stack([matrix.sum(axis=0) for matrix in windows]).astype(np.float64)
+    data = {'mode': mode, 'method': method, 'profiles': profiles}
+    if mode == 'windows':
+        data['windows'] = windows
+    return data
+
+
+def clade_names(mask, strain_names):
+    return [name for bit, name in enumerate(strain_names) if mask >> bit & 1]
+
+
+def consensus_newick(clade_counts, n_replicates, strain_names, threshold=0.5):
+    """Arbre consensus majoritaire (Newick) avec le support de chaque clade"""
+    n_strains = len(strain_names)
+    root = (1 << n_strains) - 1
+    clades = sorted((mask for mask, count in clade_counts.items()
+                     if count / n_replicates > threshold and mask != root),
+                    key=lambda mask: bin(mask).count('1'))
+
+    # Les clades majoritaires sont compatibles : parent = plus petit clade englobant
+    children = {mask: [] for mask in clades + [root]}
+    for rank, mask in enumerate(clades):
+        parent = next((other for other in clades[rank + 1:] if other != mask and other & mask == mask), root)
+        children[parent].append(mask)
+
+    def render(mask, support=None):
+        covered = 0
+        parts = []
+        for child in children[mask]:
+            parts.append(render(child, clade_counts[child] / n_replicates))
+            covered |= child
+        parts.extend(strain_names[bit] for bit in range(n_strains) if mask >> bit & 1 and not covered >> bit & 1)
+        label = f"{support * 100:.0f}" if support is not None else ''
+        return f"({','.join(parts)}){label}"
+
+    return render(root) + ';'
+
+
+def reference_newick(tree, strain_names, supports):
+    """Arbre des données complètes (Newick, longueurs de branches) annoté des supports"""
+    n_strains = len(strain_names)
+    heights = np.concatenate((np.zeros(n_strains), tree[:, 2]))
+
+    def render(node, parent_height):
+        length = max(parent_height - heights[node], 0.0)
+        if node < n_strains:
+            return f"{strain_names[node]}:{length:.6f}"
+        left, right = (int(child) for child in tree[node - n_strains, :2])
+        label = f"{supports[node - n_strains] * 100:.0f}" if node != 2 * n_strains - 2 else ''
+        return (f"({render(left, heights[node])},{render(right, heights[node])}){label}"
+                f":{length:.6f}")
+
+    root = 2 * n_strains - 2
+    return render(root, heights[root]).rsplit(':', 1)[0] + ';'
+
+
+def bootstrap_tree(genomes, n_replicates=100, mode='kmers', k=4, window_size=10000,
+                   method='ward', workers=None, batch_size=10, seed=42):
+    """Arbre des données complètes, supports bootstrap de ses clades et consensus
+
+    genomes : {souche: jeu de contigs}. Retourne un dictionnaire avec
+    'tree' (matrice de liaison), 'supports' (un support par nœud interne),
+    'clades' (DataFrame), 'newick', 'consensus_newick' et 'distances'.
+    """
+    strain_names = list(genomes.keys())
+    data = prepare_bootstrap_data(genomes, mode, k, window_size, method)
+
+    distances = cosine_distances(data['profiles'][None])[0]
+    tree, reference_clades = tree_clades(distances, method)
+
+    seeds = np.random.SeedSequence(seed).spawn(n_replicates)
+    batches = [seeds[start:start + batch_size] for start in range(0, n_replicates, batch_size)]
+    workers = workers or os.cpu_count() or 1
+
+    clade_counts = Counter()
+    if workers == 1 or len(batches) == 1:
+        _init_worker(data)
+        results = map(_run_batch, batches)
+        for replicate_clades in results:
+            for clades in replicate_clades:
+                clade_counts.update(clades)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as pool:
+            for replicate_clades in pool.map(_run_batch, batches):
+                for clades in replicate_clades:
+                    clade_counts.update(clades)
+
+    supports = np.array([clade_counts[mask] / n_replicates for mask in reference_clades])
+    clades = pd.DataFrame({
+        'Noeud': np.arange(len(reference_clades)) + len(strain_names),
+        'Taille': [bin(mask).count('1') for mask in reference_clades],
+        'Hauteur': tree[:, 2],
+        'Support': supports,
+        'Souches': [';'.join(clade_names(mask, strain_names)) for mask in reference_clades],
+    })
+
+    return {
+        'strain_names': strain_names,
+        'distances': distances,
+        'tree': tree,
+        'supports': supports,
+        'clades': clades,
+        'n_replicates': n_replicates,
+        'mode': mode,
+        'newick': reference_newick(tree, strain_names, supports),
+        'consensus_newick': consensus_newick(clade_counts, n_replicates, strain_names),
+    }
+
+
+def save_bootstrap(result, output_dir):
+    """Écrire le tableau des supports et les arbres Newick"""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        'clades': os.path.join(output_dir, 'bootstrap_support.csv'),
+        'newick': os.path.join(output_dir, 'bootstrap_tree.nwk'),
+        'consensus': os.path.join(output_dir, 'consensus_tree.nwk'),
+    }
+    result['clades'].to_csv(paths['clades'], index=False)
+    with open(paths['newick'], 'w') as f:
+        f.write(result['newick'] + '\n')
+    with open(paths['consensus'], 'w') as f:
+        f.write(result['consensus_newick'] + '\n')
+    return paths
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Supports bootstrap de l'arbre des souches")
+    parser.add_argument('--replicates', type=int, default=BOOTSTRAP_PARAMS['replicates'],
+                        help="Nombre de réplicats")
+    parser.add_argument('--mode', choices=MODES, default=BOOTSTRAP_PARAMS['mode'],
+                        help="Rééchantillonnage des k-mers ou des fenêtres")
+    parser.add_argument('--workers', type=int, help="Nombre de processus (défaut: nombre de CPU)")
+    parser.add_argument('--output', default=os.path.join(PATHS['results'], 'bootstrap'),
+                        help="Dossier de sortie")
+    args = parser.parse_args()
+
+    genomes = {}
+    for strain_name, strain_info in STRAINS.items():
+        genome_path = os.path.join(PATHS['genomes'], strain_info['filename'])
+        if os.path.exists(genome_path):
+            genomes[strain_name] = load_contig_set(genome_path, ANALYSIS_PARAMS['min_contig_length'])
+        else:
+            print_status('warning', f"Fichier non trouvé: {genome_path}")
+
+    if len(genomes) < 3:
+        print_status('error', "Au moins 3 génomes sont nécessaires pour des supports de clades!")
+        sys.exit(1)
+
+    result = bootstrap_tree(genomes, args.replicates, args.mode, BOOTSTRAP_PARAMS['k'],
+                            BOOTSTRAP_PARAMS['window_size'], BOOTSTRAP_PARAMS['linkage'],
+                            args.workers, BOOTSTRAP_PARAMS['batch_size'], BOOTSTRAP_PARAMS['seed'])
+    paths = save_bootstrap(result, args.output)
+    print(result['clades'].to_string(index=False))
+    print_status('success', f"Supports: {paths['clades']}")
+    print_status('success', f"Arbres: {paths['newick']}, {paths['consensus']}")
+
+
+if __name__ == "__main__":
+    main()
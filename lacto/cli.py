@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Point d'entrée unique du pipeline : python3 -m lacto <commande> [options]
+
+Les modules des commandes ne sont importés qu'au moment de leur exécution :
+--help, info et imports ne chargent ni NumPy, ni pandas, ni matplotlib et
+répondent en moins de HELP_BUDGET_MS. Les graphiques utilisent le backend
+non interactif Agg sauf si MPLBACKEND est déjà défini.
+
+La commande imports mesure le temps d'import de chaque module (python -X
+importtime, dépendances comprises) et le compare au budget IMPORT_BUDGET_MS,
+fixé à partir des temps mesurés avec une marge : un import lourd ajouté au
+niveau module (seaborn, scipy, matplotlib.pyplot...) le fait dépasser.
+
+Usage: python3 -m lacto analyze | compare | report | pipeline | ... [options]
+       python3 -m lacto imports
+"""
+
+import os
+import sys
+import time
+import argparse
+import importlib
+import subprocess
+
+sys.path.append('.')
+from lacto.console import print_status
+
+# Commande -> (module, description)
+COMMANDS = {
+    'analyze': ('lacto.analysis', "Analyse des séquences génomiques (étape 2)"),
+    'compare': ('lacto.comparison', "Comparaison génomique toutes-paires (étape 3)"),
+    'report': ('lacto.report', "Visualisations et rapport final (étape 4)"),
+    'pipeline': ('lacto.pipeline', "Étapes 2 à 4 dans un seul processus"),
+    'pangenome': ('lacto.pangenome', "Pangénome k-mers"),
+    'islands': ('lacto.islands', "Îlots génomiques propres à une souche"),
+    'bootstrap': ('lacto.bootstrap', "Supports bootstrap de l'arbre des souches"),
+    'synteny': ('lacto.synteny', "Blocs de synténie d'une paire de génomes"),
+    'repeats': ('lacto.repeats', "Répétitions d'un génome"),
+    'orfs': ('lacto.orfs', "ORFs et usage des codons"),
+    'kmers': ('lacto.kmers', "Profils de k-mers"),
+    'reads': ('lacto.reads', "Profil k-mers de lectures FASTQ (filtre d'abondance)"),
+    'mask': ('lacto.masking', "Masque IUPAC, minuscules et faible complexité (BED)"),
+    'qc': ('lacto.qc', "Contrôle qualité des assemblages (N50, NG50, L50, auN)"),
+    'neighbors': ('lacto.neighbors', "Groupes de souches du graphe des voisins (seuils)"),
+    'kernels': ('lacto.kernels', "Backend des noyaux de calcul (Numba / NumPy), vérification"),
+    'tracks': ('lacto.tracks', "Pistes génomiques multi-résolution"),
+    'faidx': ('lacto.faidx', "Index FASTA (.fai)"),
+    'service': ('lacto.service', "Service de comparaison à la demande"),
+    'shard': ('lacto.shard', "File de blocs de la comparaison fractionnée"),
+    'journal': ('lacto.journal', "Contenu d'un journal de reprise"),
+    'schedule': ('lacto.scheduler', "Plan d'exécution sous budget mémoire"),
+    'watch': ('lacto.watch', "Traitement incrémental des génomes déposés dans data/genomes"),
+}
+
+# Temps d'import maximal de chaque module (ms), dépendances comprises
+IMPORT_BUDGET_MS = {
+    'lacto.analysis': 450,
+    'lacto.comparison': 450,
+    'lacto.report': 450,
+    'lacto.pipeline': 550,
+    'lacto.pangenome': 400,
+    'lacto.islands': 450,
+    'lacto.bootstrap': 700,
+    'lacto.synteny': 400,
+    'lacto.repeats': 450,
+    'lacto.orfs': 450,
+    'lacto.kmers': 150,
+    'lacto.reads': 150,
+    'lacto.masking': 150,
+    'lacto.qc': 400,
+    'lacto.neighbors': 500,
+    'lacto.kernels': 150,
+    'lacto.tracks': 200,
+    'lacto.faidx': 200,
+    'lacto.service': 450,
+    'lacto.shard': 50,
+    'lacto.journal': 50,
+    'lacto.scheduler': 200,
+    'lacto.watch': 600,
+}
+HELP_BUDGET_MS = 200
+
+
+def run_command(command, args):
+    """Importer le module de la commande et exécuter son main() avec les arguments restants"""
+    module_name = COMMANDS[command][0]
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    module = importlib.import_module(module_name)
+    sys.argv = [f"lacto {command}"] + list(args)
+    return module.main()
+
+
+def show_info():
+    """Résumé du projet et des génomes (configuration et tailles de fichiers seulement)"""
+    try:
+        from config import PROJECT_NAME, PROJECT_VERSION, ORGANISM, STRAINS, PATHS
+    except ImportError:
+        print_status('error', "config.py introuvable (lancer depuis la racine du projet)")
+        return 1
+
+    print(f"{PROJECT_NAME} {PROJECT_VERSION} - {ORGANISM}")
+    print(f"Python {sys.version.split()[0]} ({sys.executable})")
+    print()
+    for strain, info in STRAINS.items():
+        path = os.path.join(PATHS['genomes'], info['filename'])
+        if os.path.exists(path):
+            size = f"{os.path.getsize(path) / 1_000_000:.1f} Mo"
+        else:
+            size = "absent"
+        print(f"  {strain:<12} {info['accession']:<18} {size:>10}  {info['description']}")
+    print()
+    for name in ('analysis', 'results'):
+        path = PATHS.get(name)
+        if path:
+            state = 'présent' if os.path.isdir(path) else 'absent'
+            print(f"  {name:<12} {path} ({state})")
+    return 0
+
+
+def measure_import_ms(module_name):
+    """Temps d'import cumulé d'un module dans un interpréteur neuf (ms)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module_name}"],
+                            capture_output=True, text=True, env=dict(os.environ, MPLBACKEND='Agg'))
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    for line in reversed(result.stderr.splitlines()):
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module_name:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"Temps d'import de {module_name} introuvable")
+
+
+def measure_help_ms():
+    """Durée de python3 -m lacto --help (ms, processus complet)"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'lacto', '--help'], capture_output=True, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def check_imports(repeats=3):
+    """Comparer les temps d'import (meilleur de repeats essais) aux budgets ; 0 si tous sont respectés"""
+    over_budget = 0
+    help_ms = min(measure_help_ms() for _ in range(repeats))
+    level = 'success' if help_ms <= HELP_BUDGET_MS else 'error'
+    print_status(level, f"{'--help':<18} {help_ms:6.0f} ms (budget {HELP_BUDGET_MS} ms)")
+    over_budget += help_ms > HELP_BUDGET_MS
+
+    for command, (module_name, _) in COMMANDS.items():
+        try:
+            elapsed = min(measure_import_ms(module_name) for _ in range(repeats))
+        except RuntimeError as e:
+            print_status('error', f"{module_name}: {e}")
+            over_budget += 1
+            continue
+        budget = IMPORT_BUDGET_MS[module_name]
+        level = 'success' if elapsed <= budget else 'error'
+        print_status(level, f"{module_name:<18} {elapsed:6.0f} ms (budget {budget} ms)")
+        over_budget += elapsed > budget
+
+    if over_budget:
+        print_status('error', f"{over_budget} budget(s) dépassé(s)")
+        return 1
+    print_status('success', "Tous les temps d'import respectent leur budget")
+    return 0
+
+
+def build_parser():
+    commands = '\n'.join(f"  {command:<10} {description}" for command, (_, description) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog='lacto',
+        description="Pipeline de génomique comparative Lactobacillus bulgaricus",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(f"commandes:\n{commands}\n"
+                f"  {'info':<10} Résumé du projet et des génomes\n"
+                f"  {'imports':<10} Vérifier les budgets de temps d'import\n\n"
+                "Options d'une commande: python3 -m lacto <commande> --help"))
+    parser.add_argument('command', metavar='commande', choices=list(COMMANDS) + ['info', 'imports'],
+                        help="Commande à exécuter (voir la liste ci-dessous)")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    """Fonction principale"""
+    args = build_parser().parse_args(argv)
+    if args.command == 'info':
+        return show_info()
+    if args.command == 'imports':
+        return check_imports()
+    return run_command(args.command, args.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
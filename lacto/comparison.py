@@ -0,0 +1,1181 @@
+#!/usr/bin/env python3
+"""
+Étape 3 du pipeline : comparaison génomique toutes-paires
+
+K-mers, similarité de séquence, GC, taille, usage des codons et synténie pour
+chaque paire de souches, similarité composite et arbre. Les métriques viennent
+du registre lacto.metrics : seules celles sélectionnées (COMPARISON_PARAMS,
+--metrics, --weights) sont calculées. create_comparison_matrix travaille sur
+des génomes déjà chargés, write_comparison_outputs écrit matrices, CSV, JSON
+et rapport ; lacto.pipeline les enchaîne en mémoire.
+
+Usage: python3 scripts/03_genome_comparison.py [--resume] [--max-memory MO] [--bootstrap] [--dotplots]
+       python3 scripts/03_genome_comparison.py --metrics kmer,size --weights kmer=0.8,size=0.2
+"""
+
+import os
+import sys
+import pandas as pd
+import numpy as np
+import json
+from datetime import datetime
+import itertools
+import argparse
+from functools import partial
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.atomic import atomic_path
+from lacto.contigs import load_contig_set, as_contig_set, gc_windows
+from lacto.orfs import DEFAULT_MIN_CODONS
+from lacto.masking import MASK_PARAMS
+from lacto.synteny import dotplot_raster, DEFAULT_K, DEFAULT_WINDOW
+from lacto.metrics import (METRICS, COMPARISON_PARAMS, GenomeInputs, calculate_kmer_vector, compare_kmer_vectors,
+                           calculate_sequence_similarity, gc_profile_similarity, calculate_size_similarity,
+                           metric_selection, required_inputs, profile_inputs, split_by_cost, evaluate_pairs,
+                           pair_record, matrix_values, composite_score, parse_metric_list, parse_weights)
+from lacto import shard
+from lacto.journal import Journal, input_fingerprint
+from lacto.neighbors import (NEIGHBOR_PARAMS, neighbor_graph, graph_from_matrix, write_neighbor_outputs,
+                             parse_thresholds)
+from lacto.prefetch import PREFETCH_PARAMS, prefetch, describe_prefetch
+from lacto.scheduler import GenomeCache, plan_schedule, run_schedule, report_peak, describe_schedule
+
+try:
+    from config import ANALYSIS_PARAMS, BOOTSTRAP_PARAMS
+except ImportError:
+    ANALYSIS_PARAMS = {"min_contig_length": 500, "window_size": 1000}
+    BOOTSTRAP_PARAMS = {"replicates": 100, "mode": "kmers", "k": 4, "window_size": 10000,
+                        "linkage": "ward", "batch_size": 10, "seed": 42}
+
+# Configuration simple
+STRAINS = {
+    "ATCC11842": {"filename": "LB_ATCC11842.fna", "description": "Souche type"},
+    "DSM20081": {"filename": "LB_DSM20081.fna", "description": "Souche commerciale"}, 
+    "CNCM1519": {"filename": "LB_CNCM1519.fna", "description": "Souche probiotique"}
+}
+
+def calculate_gc_content(sequence):
+    """Calculer le contenu GC manuellement"""
+    if not sequence:
+        return 0
+    g_count = sequence.upper().count('G')
+    c_count = sequence.upper().count('C')
+    total_bases = len([base for base in sequence.upper() if base in 'ATGC'])
+    if total_bases == 0:
+        return 0
+    return (g_count + c_count) / total_bases * 100
+
+def load_genome_sequences(genome_path, min_contig_length=None):
+    """Charger les contigs d'un génome (contigs trop courts exclus)"""
+    if min_contig_length is None:
+        min_contig_length = ANALYSIS_PARAMS['min_contig_length']
+    try:
+        contigs = load_contig_set(genome_path, min_contig_length)
+    except Exception as e:
+        print_status('error', f"Erreur lors du chargement de {genome_path}: {e}")
+        return None
+    return checked_genome(genome_path, contigs, min_contig_length)
+
+def checked_genome(genome_path, contigs, min_contig_length):
+    """Signaler les contigs exclus d'un génome chargé ; None s'il ne reste aucune séquence"""
+    if contigs['excluded_contigs']:
+        print_status('info', f"{os.path.basename(genome_path)}: {contigs['excluded_contigs']} contigs "
+                     f"< {min_contig_length} bp ignorés ({contigs['excluded_length']:,} bp)")
+    return contigs if contigs['total_length'] else None
+
+def calculate_kmer_profile(genome, k=4):
+    """Calculer le profil de k-mers d'un génome"""
+    if genome_length(genome) < k:
+        return {}
+    
+    kmer_freqs = calculate_kmer_vector(genome, k)
+    
+    profile = {}
+    for index in np.flatnonzero(kmer_freqs):
+        kmer = ''.join('ACGT'[(index >> (2 * (k - 1 - pos))) & 3] for pos in range(k))
+        profile[kmer] = kmer_freqs[index]
+    
+    return profile
+
+def compare_kmer_profiles(profile1, profile2):
+    """Comparer deux profils de k-mers en utilisant la similarité cosinus"""
+    # Obtenir tous les k-mers uniques
+    all_kmers = set(profile1.keys()) | set(profile2.keys())
+    
+    if not all_kmers:
+        return 0.0
+    
+    # Créer des vecteurs
+    vector1 = np.array([profile1.get(kmer, 0) for kmer in all_kmers])
+    vector2 = np.array([profile2.get(kmer, 0) for kmer in all_kmers])
+    
+    return compare_kmer_vectors(vector1, vector2)
+
+def get_gc_windows(genome, window_size):
+    """Contenu GC (%) de chaque fenêtre complète, sans fenêtre à cheval sur deux contigs"""
+    return gc_windows(genome, window_size)
+
+def analyze_gc_content_similarity(seq1, seq2, window_size=1000):
+    """Analyser la similarité du contenu GC entre deux séquences"""
+    return gc_profile_similarity(get_gc_windows(seq1, window_size), get_gc_windows(seq2, window_size))
+
+def genome_length(genome):
+    """Longueur totale d'un génome (jeu de contigs, chaîne ou tableau d'octets)"""
+    return as_contig_set(genome)['total_length']
+
+def compare_genome_pair(inputs1, inputs2, metrics):
+    """Métriques sélectionnées d'une paire de génomes (entrées précalculées partagées, voir lacto.metrics)"""
+    return evaluate_pairs([inputs1], [inputs2], metrics)[0]
+
+def synteny_from_record(record):
+    """Résumé de synténie (blocs en coordonnées contig) reconstruit depuis pair_record"""
+    return {
+        'blocks': pd.DataFrame(record['synteny_blocks']),
+        'synteny_fraction': record['synteny_fraction'],
+        'breakpoints': record['breakpoints'],
+        'inversions': record['inversions'],
+    }
+
+def genome_inputs(genome, metrics, profile=None, names=None):
+    """Entrées précalculées d'un génome pour les métriques sélectionnées (profil journalisé réutilisé)
+    
+    names : entrées à calculer tout de suite (défaut : toutes celles des métriques).
+    """
+    inputs = GenomeInputs(genome, ANALYSIS_PARAMS['window_size'], profile)
+    inputs.prepare(required_inputs(metrics) if names is None else names)
+    return inputs
+
+def new_comparison_data(strain_names, selection=None):
+    """Matrices vides (diagonale = similarité parfaite avec soi-même, NaN pour les métriques non calculées)"""
+    selection = selection or metric_selection()
+    comparison_data = {'strain_names': strain_names, 'synteny': {}, 'dotplots': {},
+                       'metrics': selection['metrics'], 'weights': selection['weights']}
+    for name, metric in METRICS.items():
+        matrix = np.eye(len(strain_names))
+        if name not in selection['metrics']:
+            matrix[~np.eye(len(strain_names), dtype=bool)] = np.nan
+        comparison_data[metric['matrix']] = matrix
+    return comparison_data
+
+def store_pair(comparison_data, i, j, record):
+    """Reporter les métriques d'une paire (pair_record) dans les matrices"""
+    for name in comparison_data['metrics']:
+        key = METRICS[name]['matrix']
+        comparison_data[key][i, j] = comparison_data[key][j, i] = record[METRICS[name]['field']]
+    if 'synteny_blocks' in record:
+        strain1, strain2 = comparison_data['strain_names'][i], comparison_data['strain_names'][j]
+        comparison_data['synteny'][(strain1, strain2)] = synteny_from_record(record)
+
+def print_pair(status, strain1, strain2, record):
+    values = ', '.join(f"{metric['short']}={record[metric['field']]:.3f}"
+                       for metric in METRICS.values() if metric['field'] in record)
+    print_status('info', f"{status} {strain1} vs {strain2}: {values}")
+
+def create_comparison_matrix(genomes_data, journal=None, selection=None, dotplots=None):
+    """Créer une matrice de comparaison entre tous les génomes
+    
+    Seules les métriques sélectionnées (lacto.metrics.metric_selection) sont
+    calculées. Les entrées de chaque génome sont précalculées une fois ; les
+    métriques sur profils sont évaluées en un seul lot pour toutes les paires,
+    celles qui parcourent les séquences paire par paire. genomes_data est un
+    dictionnaire ou un itérable de couples (souche, contigs), par exemple
+    iter_panel_genomes : le génome suivant est alors lu pendant le calcul des
+    entrées du précédent.
+    
+    Avec un journal, les profils et les paires déjà enregistrés sont repris
+    tels quels ; chaque nouveau résultat est enregistré dès qu'il est terminé.
+    Avec dotplots (défaut : COMPARISON_PARAMS), la matrice de points
+    rastérisée de chaque nouvelle paire est gardée pour write_comparison_outputs.
+    """
+    selection = selection or metric_selection()
+    metrics = selection['metrics']
+    dotplots = COMPARISON_PARAMS.get('dotplots', False) if dotplots is None else dotplots
+    
+    # Entrées précalculées de toutes les souches (codage partagé entre métriques)
+    print_status('info', f"Calcul des entrées par génome ({', '.join(required_inputs(metrics))})...")
+    strain_names, inputs = [], {}
+    for strain, sequence in (genomes_data.items() if isinstance(genomes_data, dict) else genomes_data):
+        strain_names.append(strain)
+        if not sequence:
+            continue
+        profile = journal.get('profile', strain) if journal else None
+        inputs[strain] = genome_inputs(sequence, metrics, profile)
+        if journal and profile is None:
+            journal.append('profile', strain, inputs[strain].profile())
+    n_strains = len(strain_names)
+    comparison_data = new_comparison_data(strain_names, selection)
+    
+    print_status('info', f"Calcul des matrices de comparaison ({', '.join(metrics)})...")
+    
+    records, pending = {}, []
+    for i, j in itertools.combinations(range(n_strains), 2):  # Triangle supérieur seulement
+        strain1, strain2 = strain_names[i], strain_names[j]
+        if not (strain1 in inputs and strain2 in inputs):
+            continue
+        record = journal.get('pair', f"{strain1}|{strain2}") if journal else None
+        if record is None:
+            pending.append((i, j))
+        else:
+            records[(i, j)] = record
+    
+    # Métriques sur profils : un seul lot pour toutes les paires à calculer
+    batch_metrics, sequence_metrics = split_by_cost(metrics)
+    batch = evaluate_pairs([inputs[strain_names[i]] for i, _ in pending],
+                           [inputs[strain_names[j]] for _, j in pending], batch_metrics)
+    batch = dict(zip(pending, batch))
+    
+    for i, j in itertools.combinations(range(n_strains), 2):
+        strain1, strain2 = strain_names[i], strain_names[j]
+        if (i, j) in records:
+            status = "Reprise"
+            record = records[(i, j)]
+        elif (i, j) in batch:
+            pair = {**batch[(i, j)], **compare_genome_pair(inputs[strain1], inputs[strain2], sequence_metrics)}
+            if dotplots and 'synteny' in pair:
+                comparison_data['dotplots'][(strain1, strain2)] = dotplot_data(pair['synteny'])
+            record = pair_record(pair)
+            if journal:
+                journal.append('pair', f"{strain1}|{strain2}", record)
+            status = "Comparaison"
+        else:
+            continue
+        
+        store_pair(comparison_data, i, j, record)
+        print_pair(status, strain1, strain2, record)
+    
+    return comparison_data
+
+def _compare_tile(genome_paths, strain_names, profiles, metrics, dotplots, block, pairs):
+    """Comparer les paires d'une tuile (worker) en ne gardant que les génomes encore utiles
+    
+    Avec dotplots, chaque résultat porte aussi la matrice de points de la paire ('dotplot').
+    """
+    def load(item):
+        strain = strain_names[item]
+        return genome_inputs(load_genome_sequences(genome_paths[strain]), metrics, profiles[strain])
+    
+    cache = GenomeCache(load, pairs)
+    results = []
+    for i, j in pairs:
+        pair = compare_genome_pair(cache.get(i), cache.get(j), metrics)
+        result = {'i': i, 'j': j, **pair_record(pair)}
+        if dotplots and 'synteny' in pair:
+            result['dotplot'] = dotplot_data(pair['synteny'])
+        results.append(result)
+        del pair
+        cache.release(i, j)
+    return results
+
+def create_comparison_matrix_scheduled(genome_paths, journal, max_memory_mb, max_workers=None, selection=None,
+                                       dotplots=None):
+    """Comparaison toutes-paires sous budget mémoire (génomes chargés à la demande)
+    
+    Les profils sont calculés un génome à la fois ; les paires sont ensuite
+    réparties en tuiles entre des workers dont le nombre et la taille des
+    tuiles sont choisis par lacto.scheduler d'après la longueur des génomes.
+    """
+    selection = selection or metric_selection()
+    metrics = selection['metrics']
+    dotplots = COMPARISON_PARAMS.get('dotplots', False) if dotplots is None else dotplots
+    
+    print_status('info', f"Calcul des entrées par génome ({', '.join(profile_inputs(metrics))}, "
+                 f"un génome à la fois)...")
+    profiles = {strain: journal.get('profile', strain) for strain in genome_paths}
+    missing = {strain: path for strain, path in genome_paths.items() if profiles[strain] is None}
+    # Génome suivant lu pendant le calcul des profils du précédent (au plus un quart du budget d'avance)
+    prefetch_memory_mb = min(PREFETCH_PARAMS['max_memory_mb'], max_memory_mb / 4)
+    for strain, genome in iter_panel_genomes(missing, max_memory_mb=prefetch_memory_mb):
+        profiles[strain] = genome_inputs(genome, metrics, names=profile_inputs(metrics) + ['length']).profile()
+        journal.append('profile', strain, profiles[strain])
+        del genome
+    profiles = {strain: profile for strain, profile in profiles.items() if profile is not None}
+    
+    strain_names = [strain for strain in genome_paths if strain in profiles]
+    schedule = plan_schedule([profiles[strain]['length'] for strain in strain_names], max_memory_mb,
+                             metrics=metrics, max_workers=max_workers)
+    print_status('info', f"Plan: {describe_schedule(schedule)}")
+    if not schedule['fits']:
+        print_status('warning', "Budget insuffisant pour une seule paire: exécution séquentielle paire par paire")
+    
+    comparison_data = new_comparison_data(strain_names, selection)
+    done = {}
+    dotplot_rasters = comparison_data['dotplots']
+    for i, j in itertools.combinations(range(len(strain_names)), 2):
+        record = journal.get('pair', f"{strain_names[i]}|{strain_names[j]}")
+        if record is not None:
+            done[(i, j)] = record
+            print_pair("Reprise", strain_names[i], strain_names[j], record)
+    
+    def on_result(result):
+        i, j = result.pop('i'), result.pop('j')
+        if 'dotplot' in result:
+            dotplot_rasters[(strain_names[i], strain_names[j])] = result.pop('dotplot')
+        journal.append('pair', f"{strain_names[i]}|{strain_names[j]}", result)
+        done[(i, j)] = result
+        print_pair("Comparaison", strain_names[i], strain_names[j], result)
+    
+    print_status('info', f"Calcul des matrices de comparaison ({', '.join(metrics)})...")
+    task = partial(_compare_tile, {strain: genome_paths[strain] for strain in strain_names}, strain_names,
+                   profiles, metrics, dotplots)
+    worker_peak = run_schedule(schedule, task, skip=set(done), on_result=on_result)
+    report_peak(schedule, worker_peak)
+    
+    for (i, j), record in sorted(done.items()):
+        store_pair(comparison_data, i, j, record)
+    genome_lengths = {strain: profiles[strain]['length'] for strain in strain_names}
+    return comparison_data, genome_lengths
+
+def json_matrix(matrix):
+    """Matrice en listes sérialisables en JSON (None à la place de NaN)"""
+    return [[None if np.isnan(value) else value for value in row] for row in np.asarray(matrix, dtype=float).tolist()]
+
+
+def create_composite_similarity_matrix(comparison_data):
+    """Créer une matrice de similarité composite pondérée (poids de la sélection des métriques)"""
+    matrices = {name: comparison_data[METRICS[name]['matrix']] for name in comparison_data['weights']}
+    return composite_score(matrices, comparison_data['weights'])
+
+def plot_similarity_matrices(comparison_data):
+    """Créer des heatmaps pour toutes les matrices de similarité"""
+    import matplotlib.pyplot as plt
+    
+    strain_names = comparison_data['strain_names']
+    # Métriques de la similarité composite, deux heatmaps par ligne
+    matrices = {METRICS[name]['label']: comparison_data[METRICS[name]['matrix']]
+                for name in comparison_data['weights']}
+    n_rows = (len(matrices) + 1) // 2
+    n_columns = 2 if len(matrices) > 1 else 1
+    
+    fig, axes = plt.subplots(n_rows, n_columns, figsize=(7.5 * n_columns, 6 * n_rows), squeeze=False)
+    fig.suptitle('Matrices de Similarité - Lactobacillus bulgaricus', fontsize=16, fontweight='bold')
+    
+    axes = axes.flatten()
+    for axis in axes[len(matrices):]:
+        axis.set_visible(False)
+    
+    for idx, (title, matrix) in enumerate(matrices.items()):
+        im = axes[idx].imshow(matrix, cmap='RdYlBu_r', vmin=0, vmax=1)
+        axes[idx].set_title(title, fontsize=12, fontweight='bold')
+        axes[idx].set_xticks(range(len(strain_names)))
+        axes[idx].set_yticks(range(len(strain_names)))
+        axes[idx].set_xticklabels(strain_names, rotation=45)
+        axes[idx].set_yticklabels(strain_names)
+        
+        # Ajouter les valeurs dans les cellules
+        for i in range(len(strain_names)):
+            for j in range(len(strain_names)):
+                text = axes[idx].text(j, i, f'{matrix[i, j]:.3f}',
+                                    ha="center", va="center", color="black", fontweight='bold')
+        
+        # Colorbar
+        plt.colorbar(im, ax=axes[idx], fraction=0.046, pad=0.04)
+    
+    plt.tight_layout()
+    
+    output_path = 'data/results/plots/similarity_matrices.png'
+    with atomic_path(output_path) as temporary:
+        plt.savefig(temporary, dpi=300, bbox_inches='tight')
+    print_status('success', f"Matrices de similarité: {output_path}")
+    plt.close()
+
+def dotplot_data(synteny, pixels=1000):
+    """Matrice de points rastérisée d'une paire et ce qu'il faut pour la tracer (sans les ancres)"""
+    return {
+        'raster': dotplot_raster(synteny, pixels).astype(np.uint32),
+        'length1': synteny['index1']['total_length'],
+        'length2': synteny['index2']['total_length'],
+        'offsets1': synteny['index1']['offsets'],
+        'offsets2': synteny['index2']['offsets'],
+        'synteny_fraction': synteny['synteny_fraction'],
+        'inversions': synteny['inversions'],
+    }
+
+def plot_dot_plot(strain1, strain2, dotplot):
+    """Matrice de points génome contre génome (ancres rastérisées, dotplot_data) d'une paire"""
+    import matplotlib.pyplot as plt
+    
+    raster = dotplot['raster']
+    pixels = raster.shape[-1]
+    length1 = dotplot['length1'] / 1_000_000
+    length2 = dotplot['length2'] / 1_000_000
+    
+    # Brin direct en rouge, brin inverse en bleu (intensité logarithmique)
+    intensity = np.log1p(raster) / max(np.log1p(raster).max(), 1e-9)
+    image = np.ones((pixels, pixels, 3))
+    image[..., 1] -= np.maximum(intensity[0], intensity[1])
+    image[..., 2] -= intensity[0]
+    image[..., 0] -= intensity[1]
+    
+    plt.figure(figsize=(8, 8))
+    plt.imshow(image, origin='lower', extent=[0, length1, 0, length2], aspect='auto')
+    for offset in dotplot['offsets1'][1:-1]:
+        plt.axvline(offset / 1_000_000, color='grey', linewidth=0.5)
+    for offset in dotplot['offsets2'][1:-1]:
+        plt.axhline(offset / 1_000_000, color='grey', linewidth=0.5)
+    plt.xlabel(f'{strain1} (Mb)')
+    plt.ylabel(f'{strain2} (Mb)')
+    plt.title(f'Matrice de points {strain1} vs {strain2}\n'
+              f"synténie {dotplot['synteny_fraction'] * 100:.1f}%, "
+              f"{dotplot['inversions']} inversions (rouge: direct, bleu: inverse)",
+              fontsize=12, fontweight='bold')
+    plt.tight_layout()
+    
+    output_path = f'data/results/plots/dotplot_{strain1}_vs_{strain2}.png'
+    with atomic_path(output_path) as temporary:
+        plt.savefig(temporary, dpi=150, bbox_inches='tight')
+    print_status('success', f"Matrice de points: {output_path}")
+    plt.close()
+
+def plot_phylogenetic_tree(composite_matrix, strain_names):
+    """Créer un dendrogramme (arbre phylogénétique)"""
+    import matplotlib.pyplot as plt
+    from scipy.spatial.distance import squareform
+    from scipy.cluster.hierarchy import dendrogram, linkage
+    
+    # Convertir similarité en distance
+    distance_matrix = 1 - composite_matrix
+    
+    # Pour scipy, on a besoin d'une matrice condensée
+    condensed_distances = squareform(distance_matrix, checks=False)
+    
+    # Clustering hiérarchique
+    linkage_matrix = linkage(condensed_distances, method='ward')
+    
+    plt.figure(figsize=(10, 6))
+    
+    dendrogram(linkage_matrix, 
+               labels=strain_names,
+               leaf_rotation=45,
+               leaf_font_size=12)
+    
+    plt.title('Arbre Phylogénétique - Lactobacillus bulgaricus\n(Basé sur la similarité génomique)', 
+              fontsize=14, fontweight='bold')
+    plt.xlabel('Souches')
+    plt.ylabel('Distance génomique')
+    plt.grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    
+    output_path = 'data/results/plots/phylogenetic_tree.png'
+    with atomic_path(output_path) as temporary:
+        plt.savefig(temporary, dpi=300, bbox_inches='tight')
+    print_status('success', f"Arbre phylogénétique: {output_path}")
+    plt.close()
+
+def plot_bootstrap_tree(bootstrap):
+    """Dendrogramme des profils de k-mers annoté des supports bootstrap (%)"""
+    import matplotlib.pyplot as plt
+    from scipy.cluster.hierarchy import dendrogram
+    
+    tree = bootstrap['tree']
+    strain_names = bootstrap['strain_names']
+    n_strains = len(strain_names)
+    
+    plt.figure(figsize=(max(10, n_strains * 0.3), 6))
+    dendrogram_data = dendrogram(tree, labels=strain_names, leaf_rotation=45, leaf_font_size=12)
+    
+    # Abscisse de chaque nœud : milieu de ses deux enfants (comme scipy)
+    x_positions = np.zeros(2 * n_strains - 1)
+    x_positions[dendrogram_data['leaves']] = 5 + 10 * np.arange(n_strains)
+    for row, (left, right, height, _) in enumerate(tree):
+        node = n_strains + row
+        x_positions[node] = (x_positions[int(left)] + x_positions[int(right)]) / 2
+        if row < len(tree) - 1:
+            plt.text(x_positions[node], height, f"{bootstrap['supports'][row] * 100:.0f}",
+                     ha='center', va='bottom', fontsize=9, color='darkred', fontweight='bold')
+    
+    plt.title(f"Arbre des profils de k-mers - supports bootstrap\n"
+              f"({bootstrap['n_replicates']} réplicats, rééchantillonnage: {bootstrap['mode']})",
+              fontsize=14, fontweight='bold')
+    plt.xlabel('Souches')
+    plt.ylabel('Distance (1 - cosinus)')
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    
+    output_path = 'data/results/plots/phylogenetic_tree_bootstrap.png'
+    with atomic_path(output_path) as temporary:
+        plt.savefig(temporary, dpi=300, bbox_inches='tight')
+    print_status('success', f"Arbre avec supports bootstrap: {output_path}")
+    plt.close()
+
+def create_comparison_summary(comparison_data, composite_matrix):
+    """Créer un résumé des comparaisons sous forme de DataFrame"""
+    strain_names = comparison_data['strain_names']
+    n_strains = len(strain_names)
+    
+    comparisons = []
+    
+    for i in range(n_strains):
+        for j in range(i + 1, n_strains):
+            synteny = comparison_data['synteny'].get((strain_names[i], strain_names[j]))
+            comparison = {
+                'Souche_1': strain_names[i],
+                'Souche_2': strain_names[j],
+                **{metric['column']: comparison_data[metric['matrix']][i, j] for metric in METRICS.values()},
+                'Blocs_synteny': len(synteny['blocks']) if synteny else np.nan,
+                'Points_cassure': synteny['breakpoints'] if synteny else np.nan,
+                'Inversions': synteny['inversions'] if synteny else np.nan,
+                'Similarite_composite': composite_matrix[i, j],
+                'Distance_genetique': 1 - composite_matrix[i, j]
+            }
+            comparisons.append(comparison)
+    
+    return pd.DataFrame(comparisons)
+
+def build_panel_index(genomes_data, index_dir, k=4):
+    """Construire l'index du panel (profils de k-mers + séquences binaires)"""
+    strain_names = [strain for strain, sequence in genomes_data.items() if sequence]
+    sequences_dir = os.path.join(index_dir, 'sequences')
+    os.makedirs(sequences_dir, exist_ok=True)
+    
+    kmer_matrix = np.zeros((len(strain_names), 4 ** k))
+    lengths = []
+    for row, strain in enumerate(strain_names):
+        contigs = as_contig_set(genomes_data[strain])
+        kmer_matrix[row] = calculate_kmer_vector(contigs, k)
+        lengths.append(contigs['total_length'])
+        # Séquence stockée en .npy pour être relue en mémoire partagée (mmap)
+        np.save(os.path.join(sequences_dir, f"{strain}.npy"), contigs['sequence'])
+        np.save(os.path.join(sequences_dir, f"{strain}.contigs.npy"), contigs['lengths'])
+        if contigs.get('mask') is not None:
+            np.save(os.path.join(sequences_dir, f"{strain}.mask.npy"),
+                    np.stack((contigs['mask']['starts'], contigs['mask']['ends'])))
+    
+    np.save(os.path.join(index_dir, 'kmer_profiles.npy'), kmer_matrix)
+    
+    manifest = {
+        'strain_names': strain_names,
+        'lengths': lengths,
+        'k': k,
+        'created': datetime.now().isoformat()
+    }
+    with open(os.path.join(index_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    
+    print_status('success', f"Index du panel: {index_dir} ({len(strain_names)} souches)")
+    return manifest
+
+def load_panel_index(index_dir):
+    """Charger un index de panel (séquences en mmap, chargement paresseux)"""
+    manifest_path = os.path.join(index_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        print_status('error', f"Index non trouvé: {manifest_path}")
+        return None
+    
+    with open(manifest_path, 'r') as f:
+        index = json.load(f)
+    
+    index['kmer_profiles'] = np.load(os.path.join(index_dir, 'kmer_profiles.npy'))
+    index['sequences'] = {}
+    for strain in index['strain_names']:
+        sequence = np.load(os.path.join(index_dir, 'sequences', f"{strain}.npy"), mmap_mode='r')
+        lengths = np.load(os.path.join(index_dir, 'sequences', f"{strain}.contigs.npy"))
+        index['sequences'][strain] = {
+            'names': [],
+            'lengths': lengths,
+            'offsets': np.concatenate(([0], np.cumsum(lengths))),
+            'sequence': sequence,
+            'total_length': int(lengths.sum()),
+            'excluded_contigs': 0,
+            'excluded_length': 0,
+        }
+        mask_path = os.path.join(index_dir, 'sequences', f"{strain}.mask.npy")
+        if os.path.exists(mask_path):
+            starts, ends = np.load(mask_path)
+            index['sequences'][strain]['mask'] = {'starts': starts, 'ends': ends}
+    return index
+
+def panel_kmer_scores(query_vector, index):
+    """Similarité cosinus d'un vecteur de k-mers contre tout le panel en une seule opération"""
+    profiles = index['kmer_profiles']
+    norms = np.linalg.norm(profiles, axis=1) * np.linalg.norm(query_vector)
+    kmer_scores = np.zeros(len(profiles))
+    np.divide(profiles @ query_vector, norms, out=kmer_scores, where=norms > 0)
+    return kmer_scores
+
+def query_panel_index(query_sequence, index, top_k=5, prefilter=4, weights=None):
+    """Trouver les souches du panel les plus proches d'un nouveau génome
+    
+    Les candidats sont présélectionnés par similarité k-mers (produit matriciel
+    sur tout le panel), puis les métriques pondérées de la similarité composite
+    sont calculées en un lot, uniquement pour les top_k * prefilter meilleurs
+    candidats.
+    """
+    weights = weights or metric_selection()['weights']
+    window_size = ANALYSIS_PARAMS['window_size']
+    query_contigs = as_contig_set(query_sequence)
+    query_vector = calculate_kmer_vector(query_contigs, index['k'])
+    
+    kmer_scores = panel_kmer_scores(query_vector, index)
+    
+    n_candidates = min(len(kmer_scores), top_k * prefilter)
+    candidates = np.argsort(-kmer_scores, kind='stable')[:n_candidates]
+    
+    query_inputs = GenomeInputs(query_contigs, window_size, {'kmer_vector': query_vector})
+    panel_inputs = [GenomeInputs(index['sequences'][index['strain_names'][row]], window_size,
+                                 {'kmer_vector': index['kmer_profiles'][row], 'length': index['lengths'][row]})
+                    for row in candidates]
+    values = evaluate_pairs([query_inputs] * len(panel_inputs), panel_inputs, list(weights))
+    
+    hits = []
+    for row, pair in zip(candidates, values):
+        pair = matrix_values(pair)
+        hit = {'Souche': index['strain_names'][row],
+               **{METRICS[name]['column']: pair[name] for name in weights},
+               'Similarite_composite': float(composite_score(pair, weights))}
+        hits.append(hit)
+    
+    hits.sort(key=lambda hit: hit['Similarite_composite'], reverse=True)
+    return pd.DataFrame(hits[:top_k])
+
+def query_panel_profile(query_vector, index, top_k=5):
+    """Classer le panel par similarité k-mers seule (requête sans séquence assemblée, ex. lectures)"""
+    kmer_scores = panel_kmer_scores(query_vector, index)
+    order = np.argsort(-kmer_scores, kind='stable')[:top_k]
+    return pd.DataFrame({'Souche': [index['strain_names'][row] for row in order],
+                         'Similarite_kmers': kmer_scores[order]})
+
+def panel_genome_paths():
+    """Chemins des génomes du panel (STRAINS) présents sur le disque"""
+    genome_paths = {}
+    for strain_name, strain_info in STRAINS.items():
+        genome_path = os.path.join('data/genomes', strain_info['filename'])
+        if os.path.exists(genome_path):
+            genome_paths[strain_name] = genome_path
+        else:
+            print_status('warning', f"Fichier non trouvé: {genome_path}")
+    return genome_paths
+
+def iter_panel_genomes(genome_paths=None, loaded=None, max_memory_mb=None):
+    """Couples (souche, contigs) des génomes du panel, lus d'avance pendant le traitement du précédent
+    
+    Les génomes dont le chargement échoue sont signalés et omis. Si loaded
+    est un dictionnaire, chaque génome rendu y est aussi rangé. max_memory_mb
+    borne les génomes lus d'avance (défaut: PREFETCH_PARAMS).
+    """
+    genome_paths = panel_genome_paths() if genome_paths is None else genome_paths
+    min_contig_length = ANALYSIS_PARAMS['min_contig_length']
+    prefetch_stats = {}
+    for strain_name, sequence, error in prefetch(list(genome_paths),
+                                                 lambda strain: load_contig_set(genome_paths[strain], min_contig_length),
+                                                 max_memory_mb=max_memory_mb, stats=prefetch_stats):
+        if error is not None:
+            print_status('error', f"Erreur lors du chargement de {genome_paths[strain_name]}: {error}")
+        else:
+            sequence = checked_genome(genome_paths[strain_name], sequence, min_contig_length)
+        if not sequence:
+            print_status('error', f"Échec du chargement de {strain_name}")
+            continue
+        print_status('success', f"{strain_name}: {sequence['total_length']:,} bp chargés "
+                     f"({len(sequence['lengths'])} contigs)")
+        if loaded is not None:
+            loaded[strain_name] = sequence
+        yield strain_name, sequence
+    print_status('info', describe_prefetch(prefetch_stats))
+
+def load_panel_genomes():
+    """Charger les génomes du panel définis dans STRAINS"""
+    return dict(iter_panel_genomes())
+
+def run_query(query_path, index_dir, top_k=5, output_path=None, weights=None):
+    """Mode requête: placer un nouveau génome contre un panel indexé"""
+    start_time = datetime.now()
+    
+    index = load_panel_index(index_dir)
+    if index is None:
+        sys.exit(1)
+    
+    if not os.path.exists(query_path):
+        print_status('error', f"Fichier non trouvé: {query_path}")
+        sys.exit(1)
+    
+    query_sequence = load_genome_sequences(query_path)
+    if not query_sequence:
+        sys.exit(1)
+    
+    hits = query_panel_index(query_sequence, index, top_k=top_k, weights=weights)
+    elapsed = (datetime.now() - start_time).total_seconds()
+    
+    print()
+    print(f"🔎 Souches les plus proches de {os.path.basename(query_path)} "
+          f"({query_sequence['total_length']:,} bp, {elapsed:.2f} s):")
+    print()
+    print(hits.round(3).to_string(index=False))
+    print()
+    
+    if output_path:
+        hits.to_csv(output_path, index=False)
+        print_status('success', f"Résultats de la requête: {output_path}")
+    
+    return hits
+
+def run_query_reads(read_paths, index_dir, top_k=5, output_path=None):
+    """Mode requête sur lectures: profil k-mers des lectures (filtre d'abondance) contre le panel indexé"""
+    from lacto.reads import profile_reads
+    
+    index = load_panel_index(index_dir)
+    if index is None:
+        sys.exit(1)
+    if index['k'] != 4:
+        print_status('error', f"Index construit avec k={index['k']}, les profils de lectures utilisent k=4")
+        sys.exit(1)
+    
+    try:
+        profile = profile_reads(read_paths)
+    except (FileNotFoundError, ValueError) as e:
+        print_status('error', str(e))
+        sys.exit(1)
+    
+    hits = query_panel_profile(profile['kmer_vector'], index, top_k=top_k)
+    
+    print()
+    print(f"🔎 Souches les plus proches des lectures {', '.join(profile['files'])} "
+          f"({profile['reads']:,} lectures, génome estimé {profile['estimated_genome_length']:,} bp, "
+          f"couverture ~{profile['estimated_coverage']:.0f}x):")
+    print()
+    print(hits.round(4).to_string(index=False))
+    print()
+    
+    if output_path:
+        hits.to_csv(output_path, index=False)
+        print_status('success', f"Résultats de la requête: {output_path}")
+    
+    return hits
+
+def shard_selection(manifest):
+    """Sélection des métriques enregistrée dans le plan (configuration courante pour un ancien plan)"""
+    metadata = manifest['metadata']
+    if 'metrics' not in metadata:
+        return metric_selection()
+    return {'metrics': metadata['metrics'], 'weights': metadata['weights']}
+
+def _load_shard_genome(strain, manifest):
+    """Génome et entrées précalculées d'une souche du plan"""
+    metadata = manifest['metadata']
+    genome = load_genome_sequences(metadata['genome_paths'][strain], metadata['min_contig_length'])
+    if genome is None:
+        raise RuntimeError(f"Échec du chargement de {strain}")
+    inputs = GenomeInputs(genome, metadata['window_size'])
+    inputs.prepare(required_inputs(shard_selection(manifest)['metrics']))
+    return inputs
+
+def plan_sharded_comparison(shard_dir, block_size, selection=None):
+    """Créer le plan de comparaison fractionnée des souches disponibles"""
+    genome_paths = {strain: os.path.abspath(path) for strain, path in panel_genome_paths().items()}
+    
+    if len(genome_paths) < 2:
+        print_status('error', "Au moins 2 génomes sont nécessaires pour la comparaison!")
+        sys.exit(1)
+    
+    manifest = shard.create_shard_plan(shard_dir, list(genome_paths), block_size, metadata={
+        'genome_paths': genome_paths,
+        'min_contig_length': ANALYSIS_PARAMS['min_contig_length'],
+        'window_size': ANALYSIS_PARAMS['window_size'],
+        **(selection or metric_selection()),
+    })
+    n_pairs = sum(block['pairs'] for block in manifest['blocks'])
+    print_status('success', f"Plan: {len(manifest['blocks'])} blocs, {n_pairs} paires ({shard_dir})")
+    return manifest
+
+def process_comparison_block(manifest, block, beat):
+    """Comparer toutes les paires d'un bloc (exécuté par un worker)
+    
+    Seuls les génomes des lignes et colonnes du bloc sont gardés en mémoire,
+    chacun libéré après sa dernière paire du bloc.
+    """
+    strains = manifest['items']
+    metrics = shard_selection(manifest)['metrics']
+    block_pairs = shard.block_pairs(block)
+    cache = GenomeCache(lambda item: _load_shard_genome(strains[item], manifest), block_pairs)
+    pairs, lengths = [], {}
+    
+    for i, j in block_pairs:
+        inputs1, inputs2 = cache.get(i), cache.get(j)
+        pair = compare_genome_pair(inputs1, inputs2, metrics)
+        pairs.append({'i': i, 'j': j, **pair_record(pair)})
+        lengths[strains[i]] = inputs1.contigs['total_length']
+        lengths[strains[j]] = inputs2.contigs['total_length']
+        del pair, inputs1, inputs2
+        cache.release(i, j)
+        beat()
+    
+    return {'block': block['id'], 'pairs': pairs, 'lengths': lengths}
+
+def merge_sharded_comparison(shard_dir):
+    """Assembler les résultats des blocs en matrices, CSV, JSON et rapport"""
+    try:
+        manifest, results = shard.load_block_results(shard_dir)
+    except RuntimeError as e:
+        print_status('error', str(e))
+        sys.exit(1)
+    
+    strain_names = manifest['items']
+    comparison_data = new_comparison_data(strain_names, shard_selection(manifest))
+    
+    genome_lengths = {}
+    for result in results:
+        genome_lengths.update(result['lengths'])
+        for pair in result['pairs']:
+            store_pair(comparison_data, pair['i'], pair['j'], pair)
+    
+    print_status('success', f"{len(results)} blocs assemblés ({len(strain_names)} souches)")
+    write_comparison_outputs(comparison_data, genome_lengths)
+
+def run_sparse_comparison(genome_paths, selection=None, top_k=None, thresholds=None, results_dir='data/results'):
+    """Comparaison creuse des grands panels : graphe des top_k voisins et groupes, sans matrice n x n
+    
+    Seules les métriques sur profils sont calculées (entrées de chaque génome
+    gardées sans sa séquence) ; les métriques par séquence sont ignorées et
+    les poids restants renormalisés.
+    """
+    selection = selection or metric_selection()
+    batch_metrics, sequence_metrics = split_by_cost(selection['metrics'])
+    if sequence_metrics:
+        print_status('warning', f"Mode creux: métriques par séquence ignorées ({', '.join(sequence_metrics)})")
+    weights = {name: weight for name, weight in selection['weights'].items() if name in batch_metrics}
+    if not weights:
+        print_status('error', "Mode creux: aucune métrique sur profils pondérée (ex. --metrics kmer,size)")
+        sys.exit(1)
+    selection = metric_selection(batch_metrics, weights)
+    
+    print_status('info', f"Calcul des entrées par génome ({', '.join(required_inputs(selection['metrics']))})...")
+    strain_names, inputs = [], []
+    for strain, genome in iter_panel_genomes(genome_paths):
+        strain_inputs = genome_inputs(genome, selection['metrics'])
+        strain_inputs.contigs = None  # Seules les entrées sur profils restent en mémoire
+        strain_names.append(strain)
+        inputs.append(strain_inputs)
+        del genome
+    
+    if len(inputs) < 2:
+        print_status('error', "Au moins 2 génomes sont nécessaires pour la comparaison!")
+        sys.exit(1)
+    print_status('info', f"Graphe des voisins de {len(inputs)} souches ({', '.join(selection['weights'])})...")
+    graph = neighbor_graph(inputs, strain_names, selection, top_k=top_k)
+    return graph, write_neighbor_outputs(graph, results_dir, thresholds)
+
+def comparison_fingerprint(strains, metrics=None):
+    """Empreinte des génomes comparés et des paramètres qui influencent les résultats"""
+    paths = {strain: os.path.join('data/genomes', STRAINS[strain]['filename']) for strain in strains}
+    return input_fingerprint(paths, {
+        'strains': list(strains),
+        'min_contig_length': ANALYSIS_PARAMS['min_contig_length'],
+        'window_size': ANALYSIS_PARAMS['window_size'],
+        'kmer_k': 4,
+        'synteny_k': DEFAULT_K,
+        'synteny_window': DEFAULT_WINDOW,
+        'synteny_chain': '1:1',
+        'min_codons': DEFAULT_MIN_CODONS,
+        'mask': MASK_PARAMS,
+        'metrics': metrics or metric_selection()['metrics'],
+    })
+
+def open_comparison_journal(path, strains, resume=False, metrics=None):
+    """Journal de reprise de la comparaison (arrêt si les entrées ou les métriques ont changé depuis)"""
+    try:
+        journal = Journal(path, comparison_fingerprint(strains, metrics), resume=resume)
+    except ValueError as e:
+        print_status('error', f"{e} (relancer sans --resume pour recommencer)")
+        sys.exit(1)
+    if resume:
+        print_status('info', f"Reprise: {journal.count('profile')} profils et {journal.count('pair')} paires "
+                     f"dans {path}")
+    return journal
+
+def parse_arguments():
+    """Arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Comparaison génomique des souches")
+    parser.add_argument('--build-index', metavar='DIR',
+                        help="Construire l'index du panel dans DIR puis quitter")
+    parser.add_argument('--query', metavar='FASTA',
+                        help="Génome à placer contre un panel indexé (nécessite --index)")
+    parser.add_argument('--query-reads', metavar='FASTQ', nargs='+',
+                        help="Lectures FASTQ (.gz) d'un isolat non assemblé à placer contre le panel "
+                             "(similarité k-mers seule, nécessite --index)")
+    parser.add_argument('--index', metavar='DIR', help="Dossier de l'index du panel")
+    parser.add_argument('--top-k', type=int, default=5,
+                        help="Nombre de souches proches à retourner (défaut: 5)")
+    parser.add_argument('--output', metavar='CSV', help="Fichier CSV des résultats de la requête")
+    parser.add_argument('--bootstrap', type=int, nargs='?', const=BOOTSTRAP_PARAMS['replicates'], default=0,
+                        metavar='N', help=f"Supports bootstrap de l'arbre (défaut: {BOOTSTRAP_PARAMS['replicates']} réplicats)")
+    parser.add_argument('--bootstrap-mode', choices=['kmers', 'windows'], default=BOOTSTRAP_PARAMS['mode'],
+                        help="Rééchantillonnage des colonnes de k-mers ou des fenêtres des génomes")
+    parser.add_argument('--workers', type=int,
+                        help="Processus pour le bootstrap et --max-memory (défaut: nombre de CPU)")
+    parser.add_argument('--max-memory', type=int, metavar='MO',
+                        help="Budget mémoire (Mo): génomes chargés à la demande, workers et tuiles "
+                             "dimensionnés d'après la taille des génomes")
+    parser.add_argument('--shard-plan', metavar='DIR',
+                        help="Découper les paires en blocs dans DIR (dossier partagé) puis quitter")
+    parser.add_argument('--block-size', type=int, default=16,
+                        help="Souches par côté de bloc pour --shard-plan (défaut: 16)")
+    parser.add_argument('--shard-worker', metavar='DIR',
+                        help="Traiter les blocs de DIR jusqu'à épuisement de la file")
+    parser.add_argument('--processes', type=int, default=1,
+                        help="Workers locaux lancés par --shard-worker (défaut: 1)")
+    parser.add_argument('--stale-after', type=float, default=3600,
+                        help="Remettre en file les blocs sans signe de vie depuis N secondes")
+    parser.add_argument('--shard-merge', metavar='DIR',
+                        help="Assembler les résultats des blocs de DIR (matrices, CSV, JSON, rapport)")
+    parser.add_argument('--sparse', action='store_true',
+                        help="Grands panels: graphe creux des plus proches voisins et groupes de souches, "
+                             "sans matrices n x n (métriques sur profils seulement)")
+    parser.add_argument('--neighbors', type=int, metavar='K',
+                        help=f"Voisins gardés par souche en mode creux (défaut: {NEIGHBOR_PARAMS['top_k']})")
+    parser.add_argument('--thresholds', type=parse_thresholds, metavar='LISTE',
+                        help="Seuils de similarité des groupes de souches, ex. 0.8,0.9,0.95")
+    parser.add_argument('--metrics', type=parse_metric_list, metavar='LISTE',
+                        help=f"Métriques à calculer, séparées par des virgules (disponibles: {', '.join(METRICS)} ; "
+                             "défaut: COMPARISON_PARAMS)")
+    parser.add_argument('--weights', metavar='POIDS',
+                        help="Poids de la similarité composite, ex. kmer=0.7,gc=0.3 (complète COMPARISON_PARAMS ; "
+                             "un poids nul retire la métrique du calcul)")
+    parser.add_argument('--dotplots', action='store_true', default=COMPARISON_PARAMS.get('dotplots', False),
+                        help="Matrice de points PNG de chaque paire (~1,3 s par paire ; blocs de synténie toujours écrits)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprendre un calcul interrompu (profils et paires déjà présents dans le journal)")
+    parser.add_argument('--journal', default='data/results/comparison_journal.jsonl',
+                        help="Journal de reprise (défaut: data/results/comparison_journal.jsonl)")
+    args = parser.parse_args()
+    
+    if args.query and not args.index:
+        parser.error("--query nécessite --index")
+    if args.query_reads and not args.index:
+        parser.error("--query-reads nécessite --index")
+    try:
+        args.selection = metric_selection(args.metrics, parse_weights(args.weights) if args.weights else None)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+def write_synteny_outputs(comparison_data):
+    """Blocs de synténie de chaque paire (TSV) et matrices de points gardées par --dotplots (PNG)"""
+    if comparison_data['synteny']:
+        os.makedirs('data/results/synteny', exist_ok=True)
+    for (strain1, strain2), synteny in comparison_data['synteny'].items():
+        blocks_path = f'data/results/synteny/{strain1}_vs_{strain2}_blocks.tsv'
+        with atomic_path(blocks_path) as temporary:
+            synteny['blocks'].to_csv(temporary, sep='\t', index=False)
+    if comparison_data['synteny']:
+        print_status('success', f"Blocs de synténie: data/results/synteny ({len(comparison_data['synteny'])} paires)")
+    for (strain1, strain2), dotplot in comparison_data['dotplots'].items():
+        plot_dot_plot(strain1, strain2, dotplot)
+
+def write_comparison_outputs(comparison_data, genome_lengths, bootstrap=None):
+    """Matrice composite, graphiques, CSV, JSON et rapport à partir des matrices de comparaison
+    
+    Retourne la matrice composite et les tableaux écrits (similarity_matrix,
+    comparisons), tels que l'étape 4 les relirait.
+    """
+    # Créer la matrice composite
+    print_status('info', "Calcul de la similarité composite...")
+    composite_matrix = create_composite_similarity_matrix(comparison_data)
+    
+    plot_similarity_matrices(comparison_data)
+    plot_phylogenetic_tree(composite_matrix, comparison_data['strain_names'])
+    write_synteny_outputs(comparison_data)
+    
+    # Créer le résumé des comparaisons
+    print_status('info', "Création du résumé des comparaisons...")
+    comparison_summary = create_comparison_summary(comparison_data, composite_matrix)
+    
+    # Sauvegarder les résultats
+    
+    # 1. Matrice de similarité composite
+    composite_df = pd.DataFrame(composite_matrix, 
+                               index=comparison_data['strain_names'],
+                               columns=comparison_data['strain_names'])
+    composite_path = 'data/results/similarity_matrix.csv'
+    with atomic_path(composite_path) as temporary:
+        composite_df.to_csv(temporary)
+    print_status('success', f"Matrice de similarité: {composite_path}")
+    
+    # 2. Résumé des comparaisons par paires
+    summary_path = 'data/results/pairwise_comparisons.csv'
+    with atomic_path(summary_path) as temporary:
+        comparison_summary.to_csv(temporary, index=False)
+    print_status('success', f"Comparaisons par paires: {summary_path}")
+    
+    # 3. Graphe des voisins et groupes de souches
+    write_neighbor_outputs(graph_from_matrix(composite_matrix, comparison_data['strain_names']), 'data/results')
+    
+    # 4. Données détaillées (JSON)
+    # Métriques non calculées (NaN) écrites null : NaN n'est pas du JSON valide
+    detailed_data = {'strain_names': comparison_data['strain_names']}
+    for key in ('kmer_similarity', 'sequence_similarity', 'gc_similarity', 'size_similarity',
+                'codon_similarity', 'synteny_fraction'):
+        detailed_data[key] = json_matrix(comparison_data[key])
+    detailed_data['composite_similarity'] = json_matrix(composite_matrix)
+    
+    json_path = 'data/results/detailed_comparisons.json'
+    with atomic_path(json_path) as temporary, open(temporary, 'w') as f:
+        json.dump(detailed_data, f, indent=2)
+    print_status('success', f"Données détaillées: {json_path}")
+    
+    # 5. Affichage des résultats
+    print()
+    print("📊 === RÉSUMÉ DES COMPARAISONS ===")
+    print()
+    print("Matrice de similarité composite:")
+    print(composite_df.round(3))
+    print()
+    
+    print("Comparaisons par paires:")
+    for _, row in comparison_summary.iterrows():
+        print(f"{row['Souche_1']} vs {row['Souche_2']}: "
+              f"Similarité = {row['Similarite_composite']:.3f}, "
+              f"Distance = {row['Distance_genetique']:.3f}")
+    
+    # 5. Rapport textuel
+    report_path = 'data/results/comparison_report.txt'
+    with atomic_path(report_path) as temporary, open(temporary, 'w') as f:
+        f.write("=== RAPPORT DE COMPARAISON GÉNOMIQUE ===\n")
+        f.write(f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n")
+        f.write(f"Projet: Lactobacillus bulgaricus - Génomique comparative\n\n")
+        
+        f.write("GÉNOMES COMPARÉS:\n")
+        for strain in comparison_data['strain_names']:
+            f.write(f"  - {strain}: {genome_lengths[strain]:,} bp\n")
+        
+        f.write(f"\nMÉTHODES DE COMPARAISON:\n")
+        for name in comparison_data['metrics']:
+            f.write(f"  - {METRICS[name]['description']}\n")
+        weights = ', '.join(f"{name} {weight:.2f}" for name, weight in comparison_data['weights'].items())
+        f.write(f"  - Similarité composite: {weights}\n")
+        f.write(f"  - Contigs < {ANALYSIS_PARAMS['min_contig_length']} bp exclus, "
+                f"fenêtres de {ANALYSIS_PARAMS['window_size']} bp\n")
+        
+        upper_triangle = np.triu_indices_from(composite_matrix, k=1)
+        f.write(f"\nRÉSULTATS PRINCIPAUX:\n")
+        f.write(f"  - Similarité moyenne: {composite_matrix[upper_triangle].mean():.3f}\n")
+        f.write(f"  - Distance moyenne: {1 - composite_matrix[upper_triangle].mean():.3f}\n")
+        
+        if comparison_data['synteny']:
+            f.write(f"\nSYNTÉNIE:\n")
+        for (strain1, strain2), synteny in comparison_data['synteny'].items():
+            f.write(f"  - {strain1} vs {strain2}: {len(synteny['blocks'])} blocs, "
+                    f"{synteny['synteny_fraction'] * 100:.1f}% en synténie, "
+                    f"{synteny['breakpoints']} points de cassure, {synteny['inversions']} inversions\n")
+        
+        if bootstrap is not None:
+            f.write(f"\nBOOTSTRAP ({bootstrap['n_replicates']} réplicats, {bootstrap['mode']}):\n")
+            for _, clade in bootstrap['clades'].iloc[:-1].iterrows():
+                f.write(f"  - {clade['Support'] * 100:.0f}% : {clade['Souches'].replace(';', ', ')}\n")
+            f.write(f"  - Consensus majoritaire: {bootstrap['consensus_newick']}\n")
+    
+    print_status('success', f"Rapport détaillé: {report_path}")
+    return {'composite': composite_matrix, 'similarity_matrix': composite_df, 'comparisons': comparison_summary}
+
+def main():
+    """Fonction principale"""
+    args = parse_arguments()
+    
+    if args.query:
+        run_query(args.query, args.index, top_k=args.top_k, output_path=args.output,
+                  weights=args.selection['weights'])
+        return
+    
+    if args.query_reads:
+        run_query_reads(args.query_reads, args.index, top_k=args.top_k, output_path=args.output)
+        return
+    
+    if args.shard_plan:
+        plan_sharded_comparison(args.shard_plan, args.block_size, args.selection)
+        return
+    
+    if args.shard_worker:
+        if args.processes > 1:
+            command = [sys.executable, '-m', 'lacto.comparison', '--shard-worker', args.shard_worker,
+                       '--stale-after', str(args.stale_after)]
+            codes = shard.launch_local_workers(command, args.processes)
+            if any(codes):
+                print_status('error', f"Workers en échec: {sum(1 for code in codes if code)}/{len(codes)}")
+                sys.exit(1)
+        else:
+            processed = shard.run_worker(args.shard_worker, process_comparison_block, stale_after=args.stale_after)
+            print_status('success', f"{processed} blocs traités")
+        status = shard.block_status(args.shard_worker)
+        print_status('info', f"File: {status['queue']} en attente, {status['claimed']} réservés, "
+                     f"{status['done']} terminés")
+        return
+    
+    print("🔬 === COMPARAISON GÉNOMIQUE ===")
+    print(f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    print()
+    
+    # Créer les dossiers
+    os.makedirs('data/results', exist_ok=True)
+    os.makedirs('data/results/plots', exist_ok=True)
+    
+    if args.shard_merge:
+        merge_sharded_comparison(args.shard_merge)
+        return
+    
+    if args.sparse:
+        run_sparse_comparison(panel_genome_paths(), args.selection, args.neighbors, args.thresholds)
+        print()
+        print_status('success', "🎉 Comparaison creuse terminée!")
+        return
+    
+    if args.build_index:
+        print_status('info', "Chargement des génomes...")
+        build_panel_index(load_panel_genomes(), args.build_index)
+        return
+    
+    # Génomes chargés à la demande sous --max-memory, sinon lus au fil du calcul de leurs entrées
+    strains = panel_genome_paths()
+    genomes_data = None if args.max_memory else {}
+    
+    if len(strains) < 2:
+        print_status('error', "Au moins 2 génomes sont nécessaires pour la comparaison!")
+        sys.exit(1)
+    
+    print()
+    print_status('info', f"Comparaison de {len(strains)} génomes...")
+    print()
+    
+    # Créer les matrices de comparaison
+    with open_comparison_journal(args.journal, strains, args.resume, args.selection['metrics']) as journal:
+        if genomes_data is None:
+            comparison_data, genome_lengths = create_comparison_matrix_scheduled(strains, journal, args.max_memory,
+                                                                                 args.workers, args.selection,
+                                                                                 args.dotplots)
+        else:
+            print_status('info', "Chargement des génomes...")
+            comparison_data = create_comparison_matrix(iter_panel_genomes(strains, loaded=genomes_data), journal,
+                                                       args.selection, args.dotplots)
+            if len(genomes_data) < 2:
+                print_status('error', "Au moins 2 génomes sont nécessaires pour la comparaison!")
+                sys.exit(1)
+            genome_lengths = {strain: genome['total_length'] for strain, genome in genomes_data.items()}
+    
+    print_status('info', "Création des visualisations...")
+    
+    bootstrap = None
+    if args.bootstrap:
+        if genomes_data is None and len(strains) >= 3:
+            print_status('warning', "Bootstrap: chargement de tous les génomes (hors budget --max-memory)")
+            genomes_data = load_panel_genomes()
+        if len(strains) < 3:
+            print_status('warning', "Bootstrap ignoré: au moins 3 génomes sont nécessaires")
+        else:
+            print_status('info', f"Bootstrap de l'arbre ({args.bootstrap} réplicats, mode {args.bootstrap_mode})...")
+            from lacto.bootstrap import bootstrap_tree, save_bootstrap
+            bootstrap = bootstrap_tree(genomes_data, args.bootstrap, args.bootstrap_mode,
+                                       BOOTSTRAP_PARAMS['k'], BOOTSTRAP_PARAMS['window_size'],
+                                       BOOTSTRAP_PARAMS['linkage'], args.workers,
+                                       BOOTSTRAP_PARAMS['batch_size'], BOOTSTRAP_PARAMS['seed'])
+            paths = save_bootstrap(bootstrap, 'data/results')
+            plot_bootstrap_tree(bootstrap)
+            print_status('success', f"Supports bootstrap: {paths['clades']} (consensus: {paths['consensus']})")
+    
+    write_comparison_outputs(comparison_data, genome_lengths, bootstrap)
+    
+    print()
+    print_status('success', "🎉 Comparaison génomique terminée!")
+    print_status('info', "➡️  Prochaine étape: python3 scripts/04_visualize_results.py")
+    print()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""
+Affichage des messages du pipeline (couleurs et icônes)
+"""
+
+
+def print_status(status, message):
+    """Afficher des messages avec des couleurs et icônes"""
+    colors = {
+        'success': '\033[92m✅',
+        'error': '\033[91m❌',
+        'warning': '\033[93m⚠️',
+        'info': '\033[94mℹ️'
+    }
+    print(f"{colors.get(status, '')} {message}\033[0m")
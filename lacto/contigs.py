@@ -0,0 +1,264 @@
+"""
+Chargement des génomes contig par contig et métriques vectorisées par contig
+
+Un génome est représenté par un « jeu de contigs » : un dictionnaire contenant
+les séquences de tous les contigs retenus dans un seul tableau d'octets
+(uint8, majuscules), leurs noms, longueurs et positions de début. Les métriques
+sont calculées par contig en un seul passage NumPy puis agrégées, sans jamais
+construire de chaîne concaténée et sans créer de k-mers aux jonctions.
+
+Au chargement, un masque d'intervalles (codes IUPAC, minuscules, faible
+complexité : voir lacto.masking) est rangé dans le jeu de contigs ; les
+k-mers et le GC local l'appliquent, les statistiques d'assemblage (taille,
+GC global, composition) portent sur toute la séquence.
+"""
+
+import gzip
+
+import numpy as np
+
+from lacto.faidx import load_fai, IndexedFasta
+from lacto.masking import build_mask, intervals_to_mask, runs_to_intervals
+
+# Table de conversion ASCII -> code nucléotidique (A=0, C=1, G=2, T=3, autre=4)
+NUCLEOTIDE_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _base in enumerate(b'ACGT'):
+    NUCLEOTIDE_CODES[_base] = _code
+
+# Classes de bases pour la composition (A, C, G, T, N, autre ambiguïté)
+BASE_CLASSES = np.full(256, 5, dtype=np.uint8)
+for _code, _base in enumerate(b'ACGTN'):
+    BASE_CLASSES[_base] = _code
+N_BASE_CLASSES = 6
+
+# Table ASCII -> majuscule (les minuscules du FASTA sont relevées avant conversion)
+UPPERCASE = np.arange(256, dtype=np.uint8)
+UPPERCASE[ord('a'):ord('z') + 1] -= 32
+
+
+def sequence_to_bytes(sequence):
+    """Convertir une séquence (str ou tableau uint8) en tableau d'octets ASCII"""
+    if isinstance(sequence, np.ndarray):
+        return sequence
+    return np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)
+
+
+def read_fasta_records(fasta_path):
+    """Lire un fichier FASTA (éventuellement gzippé) en liste de (nom, octets)
+
+    Lecture au niveau des octets : les séquences sont débarrassées des retours
+    à la ligne sans passer par des objets Python par base. La casse est
+    conservée (masquage doux), build_contig_set met en majuscules.
+    """
+    opener = gzip.open if fasta_path.endswith('.gz') else open
+    with opener(fasta_path, 'rb') as f:
+        data = f.read()
+
+    if not data.lstrip().startswith(b'>'):
+        raise ValueError(f"Format FASTA invalide: {fasta_path}")
+
+    records = []
+    for block in (b'\n' + data.lstrip()).split(b'\n>')[1:]:
+        header, _, body = block.partition(b'\n')
+        fields = header.split()
+        name = fields[0].decode() if fields else ''
+        records.append((name, body.translate(None, b' \t\r\n')))
+    return records
+
+
+def build_contig_set(records, min_contig_length=0, mask=True):
+    """Construire un jeu de contigs à partir de (nom, séquence) en filtrant les petits contigs
+
+    mask : True (paramètres MASK_PARAMS), dictionnaire de paramètres ou False.
+    Le masque (lacto.masking) est rangé sous la clé 'mask'.
+    """
+    kept = [(name, seq) for name, seq in records if len(seq) >= min_contig_length]
+    lengths = np.array([len(seq) for _, seq in kept], dtype=np.int64)
+
+    offsets = np.zeros(len(kept) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    raw = np.frombuffer(b''.join(seq for _, seq in kept), dtype=np.uint8)
+    sequence = UPPERCASE[raw]
+
+    contigs = {
+        'names': [name for name, _ in kept],
+        'lengths': lengths,
+        'offsets': offsets,
+        'sequence': sequence,
+        'total_length': int(lengths.sum()),
+        'excluded_contigs': len(records) - len(kept),
+        'excluded_length': int(sum(len(seq) for _, seq in records) - lengths.sum()),
+    }
+    if mask is not False:
+        contigs['mask'] = build_mask(NUCLEOTIDE_CODES[sequence], offsets, raw != sequence,
+                                     mask if isinstance(mask, dict) else None)
+    return contigs
+
+
+def load_contig_set(fasta_path, min_contig_length=0, mask=True):
+    """Charger un fichier FASTA en jeu de contigs filtrés
+
+    Si le fichier peut être indexé (.fai), seuls les contigs retenus sont lus,
+    par accès direct ; sinon (gzip, lignes irrégulières) le fichier est lu en entier.
+    mask : voir build_contig_set.
+    """
+    index = None
+    if not fasta_path.endswith('.gz'):
+        try:
+            index = load_fai(fasta_path)
+        except ValueError:
+            index = None
+
+    if index is None:
+        return build_contig_set(read_fasta_records(fasta_path), min_contig_length, mask)
+
+    keep = index['lengths'] >= min_contig_length
+    with IndexedFasta(fasta_path, index) as fasta:
+        # Par rang et non par nom : les contigs de même nom restent distincts
+        records = [(name, fasta.fetch_row(row, upper=False))
+                   for row, (name, kept) in enumerate(zip(index['names'], keep)) if kept]
+
+    contigs = build_contig_set(records, mask=mask)
+    contigs['excluded_contigs'] = int((~keep).sum())
+    contigs['excluded_length'] = int(index['lengths'][~keep].sum())
+    return contigs
+
+
+def as_contig_set(genome):
+    """Accepter un jeu de contigs, une chaîne ou un tableau d'octets (un seul contig)"""
+    if isinstance(genome, dict):
+        return genome
+    sequence = sequence_to_bytes(genome)
+    return {
+        'names': ['sequence'],
+        'lengths': np.array([len(sequence)], dtype=np.int64),
+        'offsets': np.array([0, len(sequence)], dtype=np.int64),
+        'sequence': sequence,
+        'total_length': int(len(sequence)),
+        'excluded_contigs': 0,
+        'excluded_length': 0,
+    }
+
+
+def contig_ids(contigs):
+    """Indice du contig de chaque position du tableau de séquence"""
+    return np.repeat(np.arange(len(contigs['lengths']), dtype=np.int32), contigs['lengths'])
+
+
+def contig_composition(contigs):
+    """Comptes (A, C, G, T, N, autre) par contig, matrice (n_contigs, 6)"""
+    n_contigs = len(contigs['lengths'])
+    classes = BASE_CLASSES[contigs['sequence']].astype(np.int64)
+    counts = np.bincount(contig_ids(contigs) * N_BASE_CLASSES + classes,
+                         minlength=n_contigs * N_BASE_CLASSES)
+    return counts.reshape(n_contigs, N_BASE_CLASSES)
+
+
+def contig_metrics(contigs):
+    """Longueur, GC (%) et fraction de N de chaque contig, calculés en un seul passage"""
+    composition = contig_composition(contigs)
+    gc_counts = composition[:, 1] + composition[:, 2]
+    acgt_counts = composition[:, :4].sum(axis=1)
+    lengths = contigs['lengths']
+
+    gc_percent = np.zeros(len(lengths))
+    np.divide(gc_counts * 100.0, acgt_counts, out=gc_percent, where=acgt_counts > 0)
+    n_fraction = np.zeros(len(lengths))
+    np.divide(composition[:, 4].astype(np.float64), lengths, out=n_fraction, where=lengths > 0)
+
+    return {
+        'lengths': lengths,
+        'composition': composition,
+        'gc_percent': gc_percent,
+        'n_fraction': n_fraction,
+    }
+
+
+def masked_positions(contigs):
+    """Masque booléen des positions masquées (lacto.masking), None si le jeu n'a pas de masque"""
+    mask = contigs.get('mask')
+    if mask is None:
+        return None
+    return intervals_to_mask(mask['starts'], mask['ends'], len(contigs['sequence']))
+
+
+def kmer_start_mask(contigs, k, codes=None):
+    """Positions de début des k-mers valides (entièrement dans un contig, sans ambiguïté ni base masquée)
+
+    codes : codes nucléotidiques déjà calculés (NUCLEOTIDE_CODES de la séquence), partagés entre métriques.
+    """
+    if codes is None:
+        codes = NUCLEOTIDE_CODES[contigs['sequence']]
+    n_kmers = len(codes) - k + 1
+    if n_kmers <= 0:
+        return codes, np.zeros(0, dtype=bool)
+
+    # Intervalles exclus : bases ambiguës, masque du jeu de contigs et jonctions
+    # entre contigs (intervalles vides en fin de contig). Un k-mer est invalide
+    # s'il commence dans [début - k + 1, fin) d'un intervalle : les k - 1
+    # dernières positions de chaque contig sont ainsi exclues.
+    starts, ends = runs_to_intervals(codes > 3)
+    mask = contigs.get('mask')
+    if mask is not None:
+        starts, ends = np.concatenate((starts, mask['starts'])), np.concatenate((ends, mask['ends']))
+    junctions = contigs['offsets'][1:]
+    starts, ends = np.concatenate((starts, junctions)), np.concatenate((ends, junctions))
+
+    # Un seul masque booléen (un octet par position, pas de tableau int64 par base)
+    valid = ~intervals_to_mask(starts - (k - 1), ends, n_kmers)
+    return codes, valid
+
+
+def kmer_counts(contigs, k=4, per_contig=False, codes=None):
+    """Comptes de k-mers (vecteur 4^k, ou matrice (n_contigs, 4^k) si per_contig)"""
+    contigs = as_contig_set(contigs)
+    n_contigs = len(contigs['lengths'])
+    codes, valid = kmer_start_mask(contigs, k, codes)
+    n_kmers = len(valid)
+    if n_kmers == 0:
+        return np.zeros((n_contigs, 4 ** k) if per_contig else 4 ** k, dtype=np.int64)
+
+    # Encodage des k-mers en entiers (base 4)
+    kmer_index = np.zeros(n_kmers, dtype=np.int64)
+    for offset in range(k):
+        kmer_index = kmer_index * 4 + (codes[offset:offset + n_kmers] & 3)
+
+    if not per_contig:
+        return np.bincount(kmer_index[valid], minlength=4 ** k)
+
+    rows = contig_ids(contigs)[:n_kmers][valid].astype(np.int64)
+    counts = np.bincount(rows * 4 ** k + kmer_index[valid], minlength=n_contigs * 4 ** k)
+    return counts.reshape(n_contigs, 4 ** k)
+
+
+def window_starts(contigs, window_size):
+    """Débuts des fenêtres complètes, contig par contig (aucune fenêtre à cheval)"""
+    windows_per_contig = contigs['lengths'] // window_size
+    total_windows = int(windows_per_contig.sum())
+    first_window = np.repeat(np.cumsum(windows_per_contig) - windows_per_contig, windows_per_contig)
+    rank_in_contig = np.arange(total_windows) - first_window
+    return np.repeat(contigs['offsets'][:-1], windows_per_contig) + rank_in_contig * window_size
+
+
+def gc_windows(contigs, window_size, codes=None):
+    """Contenu GC (%) de chaque fenêtre complète, contig par contig (bases masquées non comptées)"""
+    contigs = as_contig_set(contigs)
+    starts = window_starts(contigs, window_size)
+    if len(starts) == 0:
+        return np.zeros(0)
+
+    if codes is None:
+        codes = NUCLEOTIDE_CODES[contigs['sequence']]
+    counted = codes < 4
+    masked = masked_positions(contigs)
+    if masked is not None:
+        counted &= ~masked
+    gc_prefix = np.concatenate(([0], np.cumsum(((codes == 1) | (codes == 2)) & counted)))
+    acgt_prefix = np.concatenate(([0], np.cumsum(counted)))
+    gc_counts = gc_prefix[starts + window_size] - gc_prefix[starts]
+    acgt_counts = acgt_prefix[starts + window_size] - acgt_prefix[starts]
+
+    gc_values = np.zeros(len(starts))
+    np.divide(gc_counts * 100.0, acgt_counts, out=gc_values, where=acgt_counts > 0)
+    return gc_values
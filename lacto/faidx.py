@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Index FASTA compatible samtools faidx (.fai) et accès direct aux régions
+
+Le fichier .fai contient une ligne par contig :
+  NOM  LONGUEUR  DÉCALAGE  BASES_PAR_LIGNE  OCTETS_PAR_LIGNE
+
+L'index est construit en un seul balayage des octets du fichier (positions
+des retours à la ligne trouvées avec NumPy sur un mmap), sans décoder les
+séquences. Le lecteur IndexedFasta se positionne ensuite directement sur
+n'importe quel contig ou région.
+
+Usage: python3 -m lacto.faidx data/genomes/*.fna
+"""
+
+import os
+import sys
+import argparse
+
+import numpy as np
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.atomic import atomic_path
+
+FAI_COLUMNS = ['names', 'lengths', 'offsets', 'line_bases', 'line_widths']
+
+
+def fai_path_for(fasta_path):
+    return fasta_path + '.fai'
+
+
+def scan_fasta(fasta_path):
+    """Balayer un FASTA non compressé et retourner les colonnes de l'index"""
+    if fasta_path.endswith('.gz'):
+        raise ValueError(f"Index impossible sur un fichier gzip: {fasta_path}")
+
+    if os.path.getsize(fasta_path) == 0:
+        return _empty_index()
+    data = np.memmap(fasta_path, dtype=np.uint8, mode='r')
+
+    newlines = np.flatnonzero(data == 10)
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(data)]))
+    keep = ends > starts
+    starts, ends = starts[keep], ends[keep]
+    if len(starts) == 0:
+        return _empty_index()
+
+    # Longueur utile (sans \r) et largeur réelle (avec \r\n) de chaque ligne
+    carriage = data[ends - 1] == 13
+    content = ends - starts - carriage
+    width = ends - starts + 1
+
+    is_header = data[starts] == ord('>')
+    if not is_header[0]:
+        raise ValueError(f"Format FASTA invalide: {fasta_path}")
+
+    header_lines = np.flatnonzero(is_header)
+    record_of_line = np.cumsum(is_header) - 1
+    sequence_lines = np.flatnonzero(~is_header)
+    seq_record = record_of_line[sequence_lines]
+    n_records = len(header_lines)
+
+    lengths = np.bincount(seq_record, weights=content[sequence_lines], minlength=n_records).astype(np.int64)
+
+    # Première ligne de séquence de chaque contig
+    has_sequence = np.bincount(seq_record, minlength=n_records) > 0
+    first_line = np.minimum(header_lines + 1, len(starts) - 1)
+    offsets = np.where(has_sequence, starts[first_line], ends[header_lines] + 1)
+    line_bases = np.where(has_sequence, content[first_line], 0)
+    line_widths = np.where(has_sequence, width[first_line], 0)
+
+    # Toutes les lignes sauf la dernière de chaque contig doivent avoir la même largeur
+    is_last = np.ones(len(sequence_lines), dtype=bool)
+    is_last[:-1] = seq_record[1:] != seq_record[:-1]
+    inner = ~is_last
+    inner_lines = sequence_lines[inner]
+    bad = ((content[inner_lines] != line_bases[seq_record[inner]]) |
+           (starts[inner_lines + 1] - starts[inner_lines] != line_widths[seq_record[inner]]))
+    bad_last = content[sequence_lines[is_last]] > line_bases[seq_record[is_last]]
+    if bad.any() or bad_last.any():
+        record = seq_record[inner][np.argmax(bad)] if bad.any() else seq_record[is_last][np.argmax(bad_last)]
+        raise ValueError(f"Longueurs de lignes irrégulières dans le contig n°{record + 1} de {fasta_path}")
+
+    names = []
+    for start, end in zip(starts[header_lines] + 1, ends[header_lines] - carriage[header_lines]):
+        fields = bytes(data[start:end]).split()
+        names.append(fields[0].decode() if fields else '')
+
+    return {
+        'names': names,
+        'lengths': lengths,
+        'offsets': offsets.astype(np.int64),
+        'line_bases': line_bases.astype(np.int64),
+        'line_widths': line_widths.astype(np.int64),
+    }
+
+
+def _empty_index():
+    return {'names': [], **{column: np.zeros(0, dtype=np.int64) for column in FAI_COLUMNS[1:]}}
+
+
+def write_fai(index, fai_path):
+    """Écrire un index au format .fai (samtools), atomiquement (lecteurs concurrents)"""
+    with atomic_path(fai_path) as temporary, open(temporary, 'w') as f:
+        for row in zip(*(index[column] for column in FAI_COLUMNS)):
+            f.write('\t'.join(str(value) for value in row) + '\n')
+
+
+def read_fai(fai_path):
+    """Lire un fichier .fai"""
+    rows = []
+    with open(fai_path, 'r') as f:
+        for line in f:
+            if line.strip():
+                rows.append(line.rstrip('\n').split('\t')[:5])
+    if not rows:
+        return _empty_index()
+    names, *numeric = zip(*rows)
+    index = {'names': list(names)}
+    for column, values in zip(FAI_COLUMNS[1:], numeric):
+        index[column] = np.array(values, dtype=np.int64)
+    return index
+
+
+def build_fai(fasta_path, fai_path=None):
+    """Construire et écrire l'index .fai d'un fichier FASTA"""
+    index = scan_fasta(fasta_path)
+    write_fai(index, fai_path or fai_path_for(fasta_path))
+    return index
+
+
+def load_fai(fasta_path, build=True):
+    """Charger l'index d'un FASTA, en le (re)construisant s'il est absent ou périmé"""
+    fai_path = fai_path_for(fasta_path)
+    if os.path.exists(fai_path) and os.path.getmtime(fai_path) >= os.path.getmtime(fasta_path):
+        return read_fai(fai_path)
+    if not build:
+        return None
+    try:
+        return build_fai(fasta_path)
+    except OSError:
+        # Dossier en lecture seule : index gardé en mémoire uniquement
+        return scan_fasta(fasta_path)
+
+
+class IndexedFasta:
+    """Accès direct aux contigs et régions d'un FASTA indexé"""
+
+    def __init__(self, fasta_path, index=None):
+        self.fasta_path = fasta_path
+        self.index = index if index is not None else load_fai(fasta_path)
+        # Noms en double : le premier contig du nom est servi par nom (fetch_row pour les autres)
+        self.rows = {}
+        for row, name in enumerate(self.index['names']):
+            self.rows.setdefault(name, row)
+        self._handle = open(fasta_path, 'rb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._handle.close()
+
+    @property
+    def names(self):
+        return self.index['names']
+
+    def length(self, name):
+        return int(self.index['lengths'][self._row(name)])
+
+    def _row(self, name):
+        if name not in self.rows:
+            raise KeyError(f"Contig inconnu: {name}")
+        return self.rows[name]
+
+    def _byte_offset(self, row, position):
+        line_bases = self.index['line_bases'][row]
+        return int(self.index['offsets'][row] +
+                   (position // line_bases) * self.index['line_widths'][row] + position % line_bases)
+
+    def fetch(self, name, start=0, end=None, upper=True):
+        """Séquence (octets, majuscules sauf upper=False) de la région [start, end) d'un contig (0-based)"""
+        return self.fetch_row(self._row(name), start, end, upper)
+
+    def fetch_row(self, row, start=0, end=None, upper=True):
+        """Comme fetch, pour le contig de rang row de l'index (noms en double possibles)"""
+        length = int(self.index['lengths'][row])
+        end = length if end is None else min(end, length)
+        start = max(0, start)
+        if start >= end:
+            return b''
+
+        first = self._byte_offset(row, start)
+        last = self._byte_offset(row, end - 1)
+        self._handle.seek(first)
+        sequence = self._handle.read(last - first + 1).translate(None, b'\r\n')
+        return sequence.upper() if upper else sequence
+
+    def fetch_array(self, name, start=0, end=None):
+        """Comme fetch, sous forme de tableau uint8"""
+        return np.frombuffer(self.fetch(name, start, end), dtype=np.uint8)
+
+    def fetch_region(self, region):
+        """Région au format samtools 'contig:début-fin' (1-based, bornes incluses)"""
+        name, _, span = region.partition(':')
+        if not span:
+            return self.fetch(name)
+        start, _, end = span.replace(',', '').partition('-')
+        return self.fetch(name, int(start) - 1, int(end) if end else None)
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Index FASTA compatible samtools faidx")
+    parser.add_argument('fasta', nargs='+', help="Fichiers FASTA à indexer")
+    parser.add_argument('--region', help="Extraire une région 'contig:début-fin' (1-based)")
+    args = parser.parse_args()
+
+    for fasta_path in args.fasta:
+        if args.region:
+            with IndexedFasta(fasta_path) as fasta:
+                sequence = fasta.fetch_region(args.region).decode()
+            print(f">{args.region}")
+            for i in range(0, len(sequence), 60):
+                print(sequence[i:i + 60])
+            continue
+        try:
+            index = build_fai(fasta_path)
+        except ValueError as e:
+            print_status('error', str(e))
+            continue
+        print_status('success', f"{fai_path_for(fasta_path)}: {len(index['names'])} contigs, "
+                                f"{int(index['lengths'].sum()):,} bp")
+
+
+if __name__ == "__main__":
+    main()
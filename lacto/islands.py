@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Îlots génomiques propres à une souche (k-mers absents de tout le reste du panel)
+
+Index de présence du panel : les ensembles triés de k-mers canoniques de
+chaque souche (ceux du pangénome) sont parcourus par partitions comme dans
+lacto.pangenome ; les k-mers vus dans au moins deux souches forment un seul
+tableau trié « partagés ». Un k-mer d'un génome est alors spécifique s'il
+n'est pas dans ce tableau : un searchsorted par bloc de positions, coût
+linéaire en la taille du génome (logarithmique en celle de l'index).
+
+Pour chaque génome, la fraction de k-mers spécifiques est calculée par
+fenêtre (window_size bases, contig par contig, dernière fenêtre
+éventuellement plus courte). Les fenêtres dont la fraction atteint
+min_specific_fraction sont fusionnées en îlots candidats (trous d'au plus
+max_gap_windows fenêtres tolérés, jamais d'un contig à l'autre) ; les îlots
+plus courts que min_island_length sont écartés. Un écart de GC à la moyenne
+du génome appuie l'hypothèse d'un transfert horizontal.
+
+Les ensembles de k-mers du pangénome sont réutilisés s'ils existent pour le
+même k. Sorties (data/results/islands/) : islands.tsv (toutes souches),
+<souche>_islands.bed et <souche>_specific.bedgraph (fraction par fenêtre,
+affichée comme piste dans le rapport).
+
+Usage: python3 -m lacto.islands [--k 21] [--window 5000] [--min-fraction 0.5]
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.atomic import atomic_path
+from lacto.contigs import NUCLEOTIDE_CODES, load_contig_set
+from lacto.kmers import iter_canonical_kmers
+from lacto.pangenome import (KMER_SETS_MARKER, build_strain_kmer_sets, load_strain_kmer_sets, bucket_boundaries,
+                             iter_buckets, group_occurrences)
+
+try:
+    from config import STRAINS, PATHS, ANALYSIS_PARAMS, PANGENOME_PARAMS, ISLAND_PARAMS
+except ImportError:
+    print("❌ Erreur: fichier config.py non trouvé")
+    sys.exit(1)
+
+ISLAND_COLUMNS = ['Souche', 'Ilot', 'Contig', 'Debut', 'Fin', 'Longueur_bp', 'Fenetres',
+                  'Fraction_specifique', 'GC_percent', 'Ecart_GC']
+
+
+def shared_kmer_set(kmer_sets, max_bucket_kmers=5_000_000):
+    """k-mers présents dans au moins deux souches (tableau trié uint64)"""
+    shared = []
+    for kmers, _ in iter_buckets(kmer_sets, bucket_boundaries(kmer_sets, max_bucket_kmers)):
+        if len(kmers) == 0:
+            continue
+        _, group_starts = group_occurrences(kmers)
+        n_strains_per_kmer = np.diff(np.append(group_starts, len(kmers)))
+        shared.append(kmers[group_starts][n_strains_per_kmer > 1])
+    return np.concatenate(shared) if shared else np.zeros(0, dtype=np.uint64)
+
+
+def window_layout(contigs, window_size):
+    """Fenêtres de chaque contig (contig, début, fin en coordonnées du contig)"""
+    lengths = contigs['lengths']
+    windows_per_contig = -(-lengths // window_size)
+    first_window = np.cumsum(windows_per_contig) - windows_per_contig
+    contig = np.repeat(np.arange(len(lengths)), windows_per_contig)
+    starts = (np.arange(len(contig)) - first_window[contig]) * window_size
+    return {
+        'contig': contig,
+        'start': starts,
+        'end': np.minimum(starts + window_size, lengths[contig]),
+        'first_window': first_window,
+    }
+
+
+def window_specificity(contigs, k, shared, window_size, chunk_size=1 << 22):
+    """k-mers valides et spécifiques (absents de l'index partagé) de chaque fenêtre
+
+    Chaque k-mer est rattaché à la fenêtre de sa position de départ.
+    """
+    windows = window_layout(contigs, window_size)
+    n_windows = len(windows['contig'])
+    offsets = contigs['offsets']
+    valid_counts = np.zeros(n_windows, dtype=np.int64)
+    specific_counts = np.zeros(n_windows, dtype=np.int64)
+
+    for start, kmers, valid in iter_canonical_kmers(contigs, k, chunk_size):
+        positions = start + np.flatnonzero(valid)
+        kmers = kmers[valid]
+        contig = np.searchsorted(offsets, positions, side='right') - 1
+        window = windows['first_window'][contig] + (positions - offsets[contig]) // window_size
+        if len(shared):
+            found = shared[np.minimum(np.searchsorted(shared, kmers), len(shared) - 1)] == kmers
+        else:
+            found = np.zeros(len(kmers), dtype=bool)
+        valid_counts += np.bincount(window, minlength=n_windows)
+        specific_counts += np.bincount(window[~found], minlength=n_windows)
+
+    windows['valid'] = valid_counts
+    windows['specific'] = specific_counts
+    windows['fraction'] = np.divide(specific_counts, valid_counts, out=np.zeros(n_windows),
+                                    where=valid_counts > 0)
+    return windows
+
+
+def merge_islands(windows, min_fraction, max_gap_windows=1, min_length=0):
+    """Îlots : fenêtres de fraction >= min_fraction fusionnées (premier et dernier indice de fenêtre)"""
+    hits = np.flatnonzero(windows['fraction'] >= min_fraction)
+    if len(hits) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    contig = windows['contig']
+    breaks = np.ones(len(hits), dtype=bool)
+    breaks[1:] = (np.diff(hits) > max_gap_windows + 1) | (contig[hits[1:]] != contig[hits[:-1]])
+    first = hits[breaks]
+    last = hits[np.append(breaks[1:], True)]
+    keep = windows['end'][last] - windows['start'][first] >= min_length
+    return first[keep], last[keep]
+
+
+def island_table(strain, contigs, windows, first, last):
+    """Tableau des îlots d'une souche (coordonnées 0-based, fin exclue)"""
+    specific_prefix = np.concatenate(([0], np.cumsum(windows['specific'])))
+    valid_prefix = np.concatenate(([0], np.cumsum(windows['valid'])))
+    specific = specific_prefix[last + 1] - specific_prefix[first]
+    valid = valid_prefix[last + 1] - valid_prefix[first]
+
+    # GC des îlots et du génome (bases A, C, G, T seulement)
+    codes = NUCLEOTIDE_CODES[contigs['sequence']]
+    gc_prefix = np.concatenate(([0], np.cumsum((codes == 1) | (codes == 2))))
+    acgt_prefix = np.concatenate(([0], np.cumsum(codes < 4)))
+    contig = windows['contig'][first]
+    starts = windows['start'][first]
+    ends = windows['end'][last]
+    begin = contigs['offsets'][contig] + starts
+    finish = contigs['offsets'][contig] + ends
+    acgt = acgt_prefix[finish] - acgt_prefix[begin]
+    gc = np.divide((gc_prefix[finish] - gc_prefix[begin]) * 100.0, acgt, out=np.zeros(len(first)), where=acgt > 0)
+    genome_gc = gc_prefix[-1] * 100.0 / acgt_prefix[-1] if acgt_prefix[-1] else 0.0
+
+    return pd.DataFrame({
+        'Souche': strain,
+        'Ilot': [f"{strain}_ilot_{number}" for number in range(1, len(first) + 1)],
+        'Contig': [contigs['names'][row] for row in contig],
+        'Debut': starts,
+        'Fin': ends,
+        'Longueur_bp': ends - starts,
+        'Fenetres': last - first + 1,
+        'Fraction_specifique': np.divide(specific, valid, out=np.zeros(len(first)), where=valid > 0).round(4),
+        'GC_percent': gc.round(2),
+        'Ecart_GC': (gc - genome_gc).round(2),
+    }, columns=ISLAND_COLUMNS)
+
+
+def write_islands_bed(islands, path):
+    """Îlots au format BED6 (score = fraction spécifique x 1000)"""
+    with atomic_path(path) as temporary, open(temporary, 'w') as f:
+        for row in islands.itertuples(index=False):
+            f.write(f"{row.Contig}\t{row.Debut}\t{row.Fin}\t{row.Ilot}\t"
+                    f"{int(round(row.Fraction_specifique * 1000))}\t.\n")
+
+
+def write_specificity_bedgraph(strain, names, windows, path):
+    """Fraction de k-mers spécifiques par fenêtre (bedGraph) ; names : noms des contigs"""
+    with atomic_path(path) as temporary, open(temporary, 'w') as f:
+        f.write(f'track type=bedGraph name="{strain} k-mers spécifiques"\n')
+        f.writelines(f"{names[contig]}\t{start}\t{end}\t{fraction:.4f}\n"
+                     for contig, start, end, fraction in zip(windows['contig'], windows['start'],
+                                                             windows['end'], windows['fraction']))
+
+
+def pangenome_kmer_sets(genome_paths, k, pangenome_dir=None):
+    """Ensembles de k-mers déjà écrits par le pangénome (même k, plus récents que les génomes), sinon None
+
+    Seul un jeu complet est réutilisé : le marqueur KMER_SETS_MARKER n'est
+    écrit qu'après le dernier .npy (voir build_strain_kmer_sets).
+    """
+    pangenome_dir = pangenome_dir or os.path.join(PATHS['results'], 'pangenome')
+    marker_path = os.path.join(pangenome_dir, 'kmers', KMER_SETS_MARKER)
+    if not os.path.exists(marker_path):
+        return None
+    with open(marker_path, 'r') as f:
+        marker = json.load(f)
+    if marker.get('k') != k or not set(genome_paths) <= set(marker.get('strains', [])):
+        return None
+    set_paths = {strain: os.path.join(pangenome_dir, 'kmers', f"{strain}.npy") for strain in genome_paths}
+    for strain, set_path in set_paths.items():
+        if not os.path.exists(set_path) or os.path.getmtime(set_path) < os.path.getmtime(genome_paths[strain]):
+            return None
+    print_status('info', f"Ensembles de k-mers du pangénome réutilisés ({pangenome_dir})")
+    return load_strain_kmer_sets(set_paths)
+
+
+def run_islands(genome_paths, output_dir, k=21, window_size=5000, min_fraction=0.5, max_gap_windows=1,
+                min_island_length=10000, min_contig_length=0, max_memory_mb=256, max_bucket_kmers=5_000_000,
+                genomes=None, kmer_sets=None):
+    """Îlots spécifiques de chaque souche du panel (écrits par write_islands_outputs)
+
+    genomes fournit des contigs déjà chargés et kmer_sets des ensembles de
+    k-mers déjà calculés (même k et min_contig_length, ex. ceux du pangénome) ;
+    sinon les ensembles sont écrits sous output_dir/kmers. Retourne
+    {'islands': tableau de tous les îlots, 'strains': {souche: (îlots, noms des contigs, fenêtres)}}.
+    """
+    genomes = genomes or {}
+    os.makedirs(output_dir, exist_ok=True)
+    if kmer_sets is None:
+        set_paths = build_strain_kmer_sets(genome_paths, k, output_dir, min_contig_length, max_memory_mb, genomes)
+        kmer_sets = load_strain_kmer_sets(set_paths)
+
+    shared = shared_kmer_set(kmer_sets, max_bucket_kmers)
+    print_status('info', f"Index de présence: {len(shared):,} k-mers partagés par au moins deux souches (k={k})")
+
+    strains = {}
+    for strain, genome_path in genome_paths.items():
+        contigs = genomes.get(strain) or load_contig_set(genome_path, min_contig_length)
+        windows = window_specificity(contigs, k, shared, window_size)
+        first, last = merge_islands(windows, min_fraction, max_gap_windows, min_island_length)
+        islands = island_table(strain, contigs, windows, first, last)
+        strains[strain] = (islands, list(contigs['names']), windows)
+        print_status('success', f"{strain}: {len(islands)} îlots, {int(islands['Longueur_bp'].sum()):,} bp "
+                     f"({len(windows['contig']):,} fenêtres de {window_size:,} bp)")
+
+    tables = [islands for islands, _, _ in strains.values()]
+    islands = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=ISLAND_COLUMNS)
+    return {'islands': islands, 'strains': strains}
+
+
+def write_islands_outputs(island_data, output_dir):
+    """Écrire islands.tsv et, pour chaque souche, le BED des îlots et le bedGraph de spécificité"""
+    os.makedirs(output_dir, exist_ok=True)
+    for strain, (islands, names, windows) in island_data['strains'].items():
+        write_islands_bed(islands, os.path.join(output_dir, f"{strain}_islands.bed"))
+        write_specificity_bedgraph(strain, names, windows, os.path.join(output_dir, f"{strain}_specific.bedgraph"))
+
+    islands_path = os.path.join(output_dir, 'islands.tsv')
+    with atomic_path(islands_path) as temporary:
+        island_data['islands'].to_csv(temporary, sep='\t', index=False)
+    print_status('success', f"Îlots génomiques: {islands_path}")
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Îlots génomiques propres à une souche (k-mers du panel)")
+    parser.add_argument('--k', type=int, default=ISLAND_PARAMS['k'], help="Taille des k-mers")
+    parser.add_argument('--window', type=int, default=ISLAND_PARAMS['window_size'], help="Taille des fenêtres (bp)")
+    parser.add_argument('--min-fraction', type=float, default=ISLAND_PARAMS['min_specific_fraction'],
+                        help="Fraction minimale de k-mers spécifiques d'une fenêtre d'îlot")
+    parser.add_argument('--max-gap', type=int, default=ISLAND_PARAMS['max_gap_windows'],
+                        help="Fenêtres sous le seuil tolérées à l'intérieur d'un îlot")
+    parser.add_argument('--min-length', type=int, default=ISLAND_PARAMS['min_island_length'],
+                        help="Longueur minimale d'un îlot (bp)")
+    parser.add_argument('--max-memory', type=int, default=PANGENOME_PARAMS.get('max_memory_mb', 256),
+                        help="Budget mémoire du comptage des k-mers (Mo)")
+    parser.add_argument('--output', default=os.path.join(PATHS['results'], 'islands'), help="Dossier de sortie")
+    args = parser.parse_args()
+
+    print("🏝️ === ÎLOTS GÉNOMIQUES SPÉCIFIQUES ===")
+    print(f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    print()
+
+    genome_paths = {}
+    for strain_name, strain_info in STRAINS.items():
+        genome_path = os.path.join(PATHS['genomes'], strain_info['filename'])
+        if os.path.exists(genome_path):
+            genome_paths[strain_name] = genome_path
+        else:
+            print_status('warning', f"Fichier non trouvé: {genome_path}")
+
+    if len(genome_paths) < 2:
+        print_status('error', "Au moins 2 génomes sont nécessaires pour les îlots spécifiques!")
+        sys.exit(1)
+
+    island_data = run_islands(genome_paths, args.output, k=args.k, window_size=args.window,
+                              min_fraction=args.min_fraction, max_gap_windows=args.max_gap,
+                              min_island_length=args.min_length,
+                              min_contig_length=ANALYSIS_PARAMS['min_contig_length'],
+                              max_memory_mb=args.max_memory,
+                              max_bucket_kmers=PANGENOME_PARAMS['max_bucket_kmers'],
+                              kmer_sets=pangenome_kmer_sets(genome_paths, args.k))
+    write_islands_outputs(island_data, args.output)
+    islands = island_data['islands']
+
+    print()
+    if len(islands):
+        print(islands.sort_values('Longueur_bp', ascending=False).head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
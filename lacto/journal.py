@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Journal de reprise (append-only) pour les calculs longs
+
+Une ligne JSON par enregistrement ; la première décrit le calcul (empreinte
+des fichiers d'entrée et des paramètres). Chaque enregistrement est écrit puis
+synchronisé sur disque (fsync) dès qu'un résultat est terminé : après un arrêt
+brutal, seule la dernière ligne peut être incomplète, elle est alors ignorée
+et tronquée à la reprise.
+
+Usage: python3 -m lacto.journal data/results/comparison_journal.jsonl
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from collections import Counter
+from datetime import datetime
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.shard import json_default
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def input_fingerprint(paths, params):
+    """Empreinte d'un calcul : contenu des fichiers d'entrée (par nom) et paramètres"""
+    return {
+        'inputs': {name: file_digest(path) for name, path in sorted(paths.items())},
+        'params': json.loads(json.dumps(params, sort_keys=True, default=json_default)),
+    }
+
+
+def fingerprint_differences(expected, found):
+    """Entrées et paramètres qui diffèrent entre deux empreintes"""
+    differences = []
+    for section in ('inputs', 'params'):
+        old, new = found.get(section, {}), expected.get(section, {})
+        for key in sorted(set(old) | set(new)):
+            if old.get(key) != new.get(key):
+                differences.append(f"{section}.{key}")
+    return differences
+
+
+def _read_records(path):
+    """Enregistrements valides et taille en octets de la partie valide du fichier"""
+    with open(path, 'rb') as f:
+        content = f.read()
+    records, valid_size = [], 0
+    for line in content.split(b'\n')[:-1]:  # Le dernier morceau n'est pas terminé par \n
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            break
+        valid_size += len(line) + 1
+    return records, valid_size
+
+
+class Journal:
+    """Journal de reprise : enregistrements (type, clé, données) en ajout seul"""
+
+    def __init__(self, path, fingerprint, resume=False):
+        self.path = path
+        self.entries = {}
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        if resume and os.path.exists(path):
+            records, valid_size = _read_records(path)
+            if not records or records[0].get('type') != 'header':
+                raise ValueError(f"Journal invalide: {path}")
+            differences = fingerprint_differences(fingerprint, records[0]['fingerprint'])
+            if differences:
+                raise ValueError(f"Entrées ou paramètres modifiés depuis le journal {path}: "
+                                 f"{', '.join(differences)}")
+            for record in records[1:]:
+                self.entries.setdefault(record['type'], {})[record['key']] = record['data']
+            if valid_size < os.path.getsize(path):
+                print_status('warning', f"Journal: dernier enregistrement incomplet ignoré ({path})")
+                with open(path, 'r+b') as f:
+                    f.truncate(valid_size)
+            self._file = open(path, 'a')
+        else:
+            self._file = open(path, 'w')
+            self._write({'type': 'header', 'fingerprint': fingerprint,
+                         'created': datetime.now().isoformat(timespec='seconds')})
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, default=json_default) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def get(self, kind, key):
+        """Données enregistrées (None si absentes)"""
+        return self.entries.get(kind, {}).get(key)
+
+    def append(self, kind, key, data):
+        """Enregistrer un résultat terminé (écrit et synchronisé immédiatement)"""
+        self._write({'type': kind, 'key': key, 'data': data})
+        self.entries.setdefault(kind, {})[key] = data
+
+    def count(self, kind):
+        return len(self.entries.get(kind, {}))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Contenu d'un journal de reprise")
+    parser.add_argument('journal', help="Fichier journal (JSON lines)")
+    args = parser.parse_args()
+
+    records, valid_size = _read_records(args.journal)
+    if not records:
+        print_status('error', f"Journal vide ou invalide: {args.journal}")
+        sys.exit(1)
+    header = records[0]
+    print_status('info', f"Créé le {header.get('created')}, entrées: {', '.join(header['fingerprint']['inputs'])}")
+    for kind, count in sorted(Counter(record['type'] for record in records[1:]).items()):
+        print(f"  {kind}: {count}")
+    if valid_size < os.path.getsize(args.journal):
+        print_status('warning', "Dernier enregistrement incomplet")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Noyaux de calcul par base : version compilée Numba optionnelle, référence NumPy
+
+Quelques routines parcourent la séquence base par base et ne se vectorisent
+qu'au prix de plusieurs passes et de tableaux temporaires :
+
+  rolling_kmers   k-mers direct et complément inverse de chaque position
+                  (NumPy : encodage par doublement, log2(k) passes)
+  sliding_argmin  position du minimum de chaque fenêtre glissante, le plus à
+                  gauche en cas d'égalité (NumPy : vue glissante, w passes)
+  dust_scores     scores DUST des fenêtres de faible complexité (NumPy :
+                  bincount par lot de fenêtres)
+
+Chaque noyau a une implémentation de référence NumPy et une implémentation
+en une passe, compilée par Numba (njit, cache disque : pas de recompilation
+d'une exécution à l'autre) quand Numba est importable. Les deux donnent des
+résultats identiques ; check_kernels le vérifie sur des données aléatoires
+(sans Numba, la version une passe est exécutée telle quelle, sur de petites
+entrées).
+
+Choix du backend : KERNEL_PARAMS['backend'] dans config.py ou variable
+d'environnement LACTO_KERNELS ('auto', 'numba', 'numpy'), ou set_backend().
+Numba n'est importé qu'au premier appel d'un noyau.
+
+Usage: python3 -m lacto.kernels [--check] [--benchmark] [--backend numpy]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.append('.')
+from lacto.console import print_status
+
+try:
+    from config import KERNEL_PARAMS
+except ImportError:
+    KERNEL_PARAMS = {"backend": "auto"}
+
+BACKENDS = ('auto', 'numba', 'numpy')
+# Fenêtres DUST traitées par lot (borne la mémoire des index de triplets)
+DUST_BATCH_WINDOWS = 1 << 14
+N_TRIPLETS = 64
+
+_state = {'requested': os.environ.get('LACTO_KERNELS', KERNEL_PARAMS['backend']), 'active': None,
+          'numba': None, 'compiled': {}}
+
+
+# --- Références NumPy -------------------------------------------------------
+
+def _rolling_kmers_numpy(codes, k):
+    """Encodage par doublement : les m-mers de toutes les positions donnent les
+    2m-mers en un décalage et un OU, et le k-mer est assemblé à partir des
+    puissances de 2 de sa décomposition binaire (log2(k) passes au lieu de k).
+    """
+    n = len(codes) - k + 1
+    power = (codes & 3).astype(np.uint64)                        # m-mers directs, m = 1, 2, 4...
+    reverse_power = np.uint64(3) - power                         # m-mers complémentaires inverses
+    forward = reverse = None
+    length, m = 0, 1
+    while True:
+        if k & m:
+            # Ajouter le m-mer qui suit les length bases déjà assemblées
+            if forward is None:
+                forward, reverse = power[:n].copy(), reverse_power[:n].copy()
+            else:
+                forward <<= np.uint64(2 * m)
+                forward |= power[length:length + n]
+                reverse |= reverse_power[length:length + n] << np.uint64(2 * length)
+            length += m
+        if 2 * m > k:
+            return forward, reverse
+        span = len(power) - m
+        doubled = power[:span] << np.uint64(2 * m)
+        doubled |= power[m:m + span]
+        reverse_doubled = reverse_power[m:m + span] << np.uint64(2 * m)
+        reverse_doubled |= reverse_power[:span]
+        power, reverse_power = doubled, reverse_doubled
+        m *= 2
+
+
+def _sliding_argmin_numpy(values, w):
+    return np.lib.stride_tricks.sliding_window_view(values, w).argmin(axis=1) + np.arange(len(values) - w + 1)
+
+
+def _dust_scores_numpy(codes, starts, spans, scores):
+    triplets = (codes[:-2].astype(np.int64) * 16 + codes[1:-1] * 4 + codes[2:])
+    triplets[(codes[:-2] | codes[1:-1] | codes[2:]) > 3] = N_TRIPLETS
+
+    for begin in range(0, len(starts), DUST_BATCH_WINDOWS):
+        batch_starts = starts[begin:begin + DUST_BATCH_WINDOWS]
+        n_triplets = np.maximum(spans[begin:begin + DUST_BATCH_WINDOWS] - 2, 0)
+        n_windows = len(batch_starts)
+        # Index de tous les triplets des fenêtres du lot, puis un seul bincount (fenêtre, triplet)
+        rows = np.repeat(np.arange(n_windows), n_triplets)
+        positions = (np.arange(len(rows)) - np.repeat(np.cumsum(n_triplets) - n_triplets, n_triplets)
+                     + np.repeat(batch_starts, n_triplets))
+        counts = np.bincount(rows * (N_TRIPLETS + 1) + triplets[positions],
+                             minlength=n_windows * (N_TRIPLETS + 1)).reshape(n_windows, N_TRIPLETS + 1)
+        counts = counts[:, :N_TRIPLETS]
+        valid = counts.sum(axis=1)
+        pairs = (counts * (counts - 1) // 2).sum(axis=1)
+        np.divide(pairs, valid - 1, out=scores[begin:begin + n_windows], where=valid > 1)
+
+
+# --- Versions une passe (compilées par Numba) -------------------------------
+
+def _rolling_kmers_loop(codes, k, kmer_mask, forward, reverse):
+    top = np.uint64(2 * (k - 1))
+    two = np.uint64(2)
+    three = np.uint64(3)
+    word = np.uint64(0)
+    complement = np.uint64(0)
+    for i in range(len(codes)):
+        base = np.uint64(codes[i] & 3)
+        word = ((word << two) | base) & kmer_mask
+        complement = (complement >> two) | ((three - base) << top)
+        if i >= k - 1:
+            forward[i - k + 1] = word
+            reverse[i - k + 1] = complement
+
+
+def _sliding_argmin_loop(values, w, out):
+    # File monotone des candidats (valeurs croissantes strictement) : le premier est le minimum le plus à gauche
+    queue = np.empty(len(values), dtype=np.int64)
+    head = 0
+    tail = 0
+    for i in range(len(values)):
+        while tail > head and values[queue[tail - 1]] > values[i]:
+            tail -= 1
+        queue[tail] = i
+        tail += 1
+        if queue[head] <= i - w:
+            head += 1
+        if i >= w - 1:
+            out[i - w + 1] = queue[head]
+
+
+def _dust_scores_loop(codes, starts, spans, scores):
+    counts = np.zeros(N_TRIPLETS, dtype=np.int64)
+    for window in range(len(starts)):
+        counts[:] = 0
+        valid = 0
+        pairs = 0
+        for position in range(starts[window], starts[window] + spans[window] - 2):
+            first, second, third = int(codes[position]), int(codes[position + 1]), int(codes[position + 2])
+            if first > 3 or second > 3 or third > 3:
+                continue
+            triplet = first * 16 + second * 4 + third
+            pairs += counts[triplet]  # somme des c (c - 1) / 2 tenue à jour
+            counts[triplet] += 1
+            valid += 1
+        scores[window] = pairs / (valid - 1) if valid > 1 else 0.0
+
+
+_LOOPS = {
+    'rolling_kmers': _rolling_kmers_loop,
+    'sliding_argmin': _sliding_argmin_loop,
+    'dust_scores': _dust_scores_loop,
+}
+
+
+# --- Choix du backend -------------------------------------------------------
+
+def _import_numba():
+    if _state['numba'] is None:
+        try:
+            import numba
+            _state['numba'] = numba
+        except ImportError:
+            _state['numba'] = False
+    return _state['numba']
+
+
+def set_backend(name):
+    """Choisir le backend ('auto', 'numba' ou 'numpy') ; effet au prochain appel d'un noyau"""
+    if name not in BACKENDS:
+        raise ValueError(f"Backend de noyaux inconnu: {name} (choix: {', '.join(BACKENDS)})")
+    _state['requested'] = name
+    _state['active'] = None
+
+
+def active_backend():
+    """Backend effectivement utilisé ('numba' ou 'numpy')"""
+    if _state['active'] is None:
+        requested = _state['requested']
+        if requested not in BACKENDS:
+            print_status('warning', f"LACTO_KERNELS={requested} inconnu, backend automatique")
+            requested = 'auto'
+        if requested == 'numpy':
+            _state['active'] = 'numpy'
+        elif _import_numba():
+            _state['active'] = 'numba'
+        else:
+            if requested == 'numba':
+                print_status('warning', "Numba n'est pas installé : noyaux NumPy utilisés")
+            _state['active'] = 'numpy'
+    return _state['active']
+
+
+def backend_report():
+    """Description d'une ligne du backend actif (rapport de démarrage)"""
+    backend = active_backend()
+    if backend == 'numba':
+        cache = os.environ.get('NUMBA_CACHE_DIR', '__pycache__ du module')
+        return f"Noyaux: Numba {_state['numba'].__version__} (cache: {cache})"
+    reason = "demandé" if _state['requested'] == 'numpy' else "Numba absent"
+    return f"Noyaux: NumPy ({reason})"
+
+
+def _compiled(name):
+    """Version Numba d'un noyau (compilée au premier appel, puis relue du cache disque)"""
+    if name not in _state['compiled']:
+        _state['compiled'][name] = _state['numba'].njit(cache=True, nogil=True)(_LOOPS[name])
+    return _state['compiled'][name]
+
+
+def _loop(name, backend):
+    return _compiled(name) if backend == 'numba' else _LOOPS[name]
+
+
+# --- Noyaux -----------------------------------------------------------------
+
+def rolling_kmers(codes, k, backend=None):
+    """k-mers direct et complément inverse (uint64, 2 bits par base, ambiguïtés codées & 3)
+
+    Une valeur par position de départ : len(codes) - k + 1 valeurs.
+    """
+    backend = backend or active_backend()
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint64)
+    if backend == 'numpy':
+        return _rolling_kmers_numpy(codes, k)
+    forward = np.empty(n, dtype=np.uint64)
+    reverse = np.empty(n, dtype=np.uint64)
+    _loop('rolling_kmers', backend)(np.ascontiguousarray(codes), k, np.uint64((1 << (2 * k)) - 1), forward, reverse)
+    return forward, reverse
+
+
+def sliding_argmin(values, w, backend=None):
+    """Position (dans values) du minimum de chaque fenêtre de w valeurs, la plus à gauche à égalité"""
+    backend = backend or active_backend()
+    if len(values) < w:
+        return np.zeros(0, dtype=np.int64)
+    if backend == 'numpy':
+        return _sliding_argmin_numpy(values, w)
+    out = np.empty(len(values) - w + 1, dtype=np.int64)
+    _loop('sliding_argmin', backend)(np.ascontiguousarray(values), w, out)
+    return out
+
+
+def dust_scores(codes, starts, spans, backend=None):
+    """Scores DUST des fenêtres (somme des c_t (c_t - 1) / 2 divisée par l - 1)
+
+    Les triplets contenant une base ambiguë ne sont pas comptés.
+    """
+    backend = backend or active_backend()
+    scores = np.zeros(len(starts))
+    if len(codes) < 3:
+        return scores
+    if backend == 'numpy':
+        _dust_scores_numpy(codes, starts, spans, scores)
+    else:
+        _loop('dust_scores', backend)(codes, np.asarray(starts, dtype=np.int64), np.asarray(spans, dtype=np.int64),
+                                      scores)
+    return scores
+
+
+# --- Vérification et mesures ------------------------------------------------
+
+def _random_codes(rng, n):
+    """Codes nucléotidiques aléatoires avec plages ambiguës et de faible complexité"""
+    codes = rng.integers(0, 4, n).astype(np.uint8)
+    for _ in range(max(1, n // 2000)):
+        start = int(rng.integers(0, max(n - 50, 1)))
+        codes[start:start + int(rng.integers(1, 50))] = 4 if rng.random() < 0.5 else codes[start]
+    return codes
+
+
+def _kernel_cases(rng, n):
+    codes = _random_codes(rng, n)
+    hashes = rng.integers(0, 50, n).astype(np.uint64)  # petites valeurs : nombreuses égalités
+    starts = np.arange(0, max(n - 64, 1), 32)
+    spans = np.minimum(64, n - starts)
+    yield 'rolling_kmers', lambda backend: rolling_kmers(codes, 21, backend) + rolling_kmers(codes, 15, backend)
+    yield 'sliding_argmin', lambda backend: (sliding_argmin(hashes, 10, backend), sliding_argmin(hashes, 13, backend))
+    yield 'dust_scores', lambda backend: (dust_scores(codes, starts, spans, backend),)
+
+
+def check_kernels(n=20_000, seed=0):
+    """Comparer chaque noyau à sa référence NumPy ; retourne le nombre d'écarts
+
+    Avec Numba, la version compilée est comparée ; sans Numba, la version une
+    passe est interprétée (même code source).
+    """
+    compiled = bool(_import_numba())
+    backend = 'numba' if compiled else 'python'
+    mismatches = 0
+    for name, run in _kernel_cases(np.random.default_rng(seed), n):
+        reference = run('numpy')
+        candidate = run(backend)
+        same = all(np.array_equal(a, b) for a, b in zip(reference, candidate))
+        mismatches += not same
+        level = 'success' if same else 'error'
+        print_status(level, f"{name:<16} {backend} = numpy: {'identique' if same else 'DIFFÉRENT'}")
+    return mismatches
+
+
+def benchmark_kernels(n=5_000_000, seed=0, repeats=3):
+    """Temps (meilleur de repeats essais) de chaque noyau par backend disponible"""
+    backends = ['numpy'] + (['numba'] if _import_numba() else [])
+    timings = {}
+    for name, run in _kernel_cases(np.random.default_rng(seed), n):
+        for backend in backends:
+            run(backend)  # compilation ou lecture du cache
+            best = float('inf')
+            for _ in range(repeats):
+                start = time.perf_counter()
+                run(backend)
+                best = min(best, time.perf_counter() - start)
+            timings[(name, backend)] = best
+            print_status('info', f"{name:<16} {backend:<6} {best * 1000:8.1f} ms ({n:,} positions)")
+    return timings
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Backend des noyaux de calcul (Numba ou NumPy)")
+    parser.add_argument('--backend', choices=BACKENDS, help="Backend à utiliser (défaut: KERNEL_PARAMS / LACTO_KERNELS)")
+    parser.add_argument('--check', action='store_true', help="Vérifier l'équivalence avec les références NumPy")
+    parser.add_argument('--benchmark', action='store_true', help="Mesurer chaque noyau par backend")
+    parser.add_argument('--size', type=int, default=5_000_000, help="Positions des mesures (défaut: 5 000 000)")
+    args = parser.parse_args()
+
+    if args.backend:
+        set_backend(args.backend)
+    print_status('info', backend_report())
+    if args.check:
+        mismatches = check_kernels()
+        if mismatches:
+            print_status('error', f"{mismatches} noyau(x) différent(s) de la référence")
+            sys.exit(1)
+        print_status('success', "Tous les noyaux sont identiques à leur référence")
+    if args.benchmark:
+        benchmark_kernels(args.size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Encodage des k-mers canoniques en entiers uint64 (k <= 31) et comptage exact
+
+Chaque base est codée sur 2 bits (A=0, C=1, G=2, T=3) ; un k-mer et son
+complément inverse sont encodés en parallèle et le plus petit des deux est
+retenu. Les k-mers contenant une ambiguïté ou chevauchant deux contigs sont
+ignorés (voir lacto.contigs.kmer_start_mask).
+
+Le comptage (count_kmers) répartit les occurrences dans des partitions qui
+sont des intervalles de valeurs des k-mers canoniques (bornes choisies sur un
+échantillon de tout ce qui a été vu au premier remplissage du tampon) ; les partitions sont vidées sur disque dès que
+le tampon dépasse le budget mémoire, puis chacune est comptée par tri
+(np.unique) et recopiée à sa place dans les tableaux de sortie : les
+intervalles se suivent, aucun tri global n'est nécessaire. Le résultat est un
+couple de tableaux triés (k-mers, comptes), facile à fusionner ou à
+intersecter entre souches.
+
+Usage: python3 -m lacto.kmers data/genomes/LB_DSM20081.fna -k 31 --max-memory 256 --output DSM20081_k31
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.contigs import as_contig_set, kmer_start_mask, load_contig_set
+from lacto.kernels import rolling_kmers
+
+MAX_K = 31
+DEFAULT_CHUNK_SIZE = 1 << 22
+DEFAULT_MAX_MEMORY_MB = 256
+
+# Octets de mémoire de travail par position lors de l'encodage d'un bloc
+_BYTES_PER_POSITION = 64
+# Octets par occurrence pour le comptage d'une partition (données, tri, comptes)
+_BYTES_PER_OCCURRENCE = 40
+
+
+def _encode_chunk(codes, start, end, k):
+    """k-mers direct et complément inverse (uint64) des positions [start, end)"""
+    return rolling_kmers(codes[start:end + k - 1], k)
+
+
+def iter_canonical_kmers(contigs, k, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Blocs (début, k-mers canoniques, validité) de toutes les positions de départ d'un génome
+
+    Les k-mers sont donnés pour chaque position [début, début + taille du
+    bloc) ; validité est faux pour les k-mers ambigus, masqués ou à cheval
+    sur deux contigs.
+    """
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k doit être compris entre 1 et {MAX_K} (reçu: {k})")
+
+    contigs = as_contig_set(contigs)
+    codes, valid = kmer_start_mask(contigs, k)
+    for start in range(0, len(valid), chunk_size):
+        end = min(start + chunk_size, len(valid))
+        forward, reverse = _encode_chunk(codes, start, end, k)
+        yield start, np.minimum(forward, reverse), valid[start:end]
+
+
+def canonical_kmers(contigs, k, chunk_size=DEFAULT_CHUNK_SIZE):
+    """k-mers canoniques (uint64, non triés, avec répétitions) d'un génome
+
+    Le calcul est fait par blocs de chunk_size positions pour borner la
+    mémoire temporaire.
+    """
+    chunks = [kmers[valid] for _, kmers, valid in iter_canonical_kmers(contigs, k, chunk_size)]
+    if not chunks:
+        return np.zeros(0, dtype=np.uint64)
+    return np.concatenate(chunks)
+
+
+def kmer_set(contigs, k, max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+    """Ensemble trié (uint64, sans doublon) des k-mers canoniques d'un génome"""
+    return count_kmers(contigs, k, max_memory_mb)[0]
+
+
+def range_boundaries(sorted_kmers, n_buckets):
+    """Bornes de n_buckets intervalles de valeurs d'effectifs égaux sur un échantillon trié de k-mers"""
+    if n_buckets <= 1 or len(sorted_kmers) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    quantiles = np.linspace(0, len(sorted_kmers), n_buckets + 1)[1:-1].astype(np.int64)
+    return np.unique(sorted_kmers[quantiles])
+
+
+class _SpillBuckets:
+    """Tampons de partitions (intervalles de valeurs croissants) en mémoire, vidés sur disque au-delà d'un budget"""
+
+    def __init__(self, n_buckets, budget_bytes, spill_dir):
+        self.n_buckets = n_buckets
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir
+        self.buffers = [[] for _ in range(n_buckets)]
+        self.buffered_bytes = 0
+        self.spilled_files = 0
+        self.occurrences = 0
+        # Bornes fixées au premier remplissage du tampon (ou au comptage) ; blocs triés en attente d'ici là
+        self.boundaries = np.zeros(0, dtype=np.uint64) if n_buckets <= 1 else None
+        self.pending = []
+
+    def path(self, bucket):
+        return os.path.join(self.spill_dir, f"bucket_{bucket:05d}.u64")
+
+    def add(self, kmers):
+        """Ajouter un bloc de k-mers (trié sur place puis découpé selon les bornes)"""
+        kmers.sort()
+        if self.boundaries is None:
+            self.pending.append(kmers)
+        else:
+            self._distribute(kmers)
+        self.buffered_bytes += kmers.nbytes
+        self.occurrences += len(kmers)
+        if self.buffered_bytes > self.budget_bytes:
+            self.spill()
+
+    def _distribute(self, kmers):
+        cuts = np.searchsorted(kmers, self.boundaries)
+        for bucket, part in enumerate(np.split(kmers, cuts)):
+            if len(part):
+                self.buffers[bucket].append(part)
+
+    def fix_boundaries(self):
+        """Fixer les bornes sur un échantillon des blocs en attente (tampon plein ou fin des données)"""
+        if self.boundaries is not None:
+            return
+        total = sum(len(kmers) for kmers in self.pending)
+        step = max(1, total // (16 * self.n_buckets))
+        sample = np.sort(np.concatenate([kmers[::step] for kmers in self.pending] or [np.zeros(0, np.uint64)]))
+        self.boundaries = range_boundaries(sample, self.n_buckets)
+        for kmers in self.pending:
+            self._distribute(kmers)
+        self.pending = []
+
+    def spill(self):
+        self.fix_boundaries()
+        for bucket, parts in enumerate(self.buffers):
+            if parts:
+                with open(self.path(bucket), 'ab') as f:
+                    for part in parts:
+                        part.tofile(f)
+                self.spilled_files += 1
+        self.buffers = [[] for _ in range(self.n_buckets)]
+        self.buffered_bytes = 0
+
+    def load(self, bucket):
+        parts = list(self.buffers[bucket])
+        self.buffers[bucket] = []
+        if os.path.exists(self.path(bucket)):
+            parts.append(np.fromfile(self.path(bucket), dtype=np.uint64))
+            os.remove(self.path(bucket))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.uint64)
+
+
+def _add_contig_kmers(buckets, contigs, k, chunk_size):
+    """Répartir les k-mers canoniques valides d'un jeu de contigs dans les partitions"""
+    codes, valid = kmer_start_mask(contigs, k)
+    n_kmers = len(valid)
+    for start in range(0, n_kmers, chunk_size):
+        end = min(start + chunk_size, n_kmers)
+        chunk_valid = valid[start:end]
+        forward, reverse = _encode_chunk(codes, start, end, k)
+        np.minimum(forward, reverse, out=forward)
+        del reverse
+        buckets.add(forward[chunk_valid])
+        del forward
+
+
+def _count_buckets(buckets, min_count=1):
+    """Compter chaque partition (tri) ; k-mers triés et comptes (uint32) des comptes >= min_count
+
+    Les partitions sont des intervalles de valeurs croissants : chacune est
+    écrite à la suite de la précédente dans les tableaux de sortie, réservés
+    pour toutes les occurrences puis raccourcis (seules les pages écrites
+    occupent de la mémoire).
+    """
+    buckets.fix_boundaries()
+    if buckets.spilled_files:
+        buckets.spill()
+
+    out_kmers = np.empty(buckets.occurrences, dtype=np.uint64)
+    out_counts = np.empty(buckets.occurrences, dtype=np.uint32)
+    position = 0
+    for bucket in range(buckets.n_buckets):
+        kmers, counts = np.unique(buckets.load(bucket), return_counts=True)
+        if min_count > 1:
+            keep = counts >= min_count
+            kmers, counts = kmers[keep], counts[keep]
+        out_kmers[position:position + len(kmers)] = kmers
+        out_counts[position:position + len(kmers)] = counts
+        position += len(kmers)
+        del kmers, counts
+
+    out_kmers.resize(position, refcheck=False)
+    out_counts.resize(position, refcheck=False)
+    return out_kmers, out_counts
+
+
+def count_kmers(contigs, k, max_memory_mb=DEFAULT_MAX_MEMORY_MB, spill_dir=None, n_buckets=None):
+    """Comptes exacts des k-mers canoniques : (k-mers triés uint64, comptes uint32)
+
+    La mémoire de travail (encodage, tampons des partitions, tri d'une
+    partition) reste sous max_memory_mb ; seuls le génome encodé et les
+    tableaux de sortie (12 octets par k-mer distinct, remplis partition par
+    partition, sans tri global) s'y ajoutent. Les partitions qui dépassent le
+    tampon sont écrites dans spill_dir (dossier temporaire par défaut).
+    """
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k doit être compris entre 1 et {MAX_K} (reçu: {k})")
+
+    contigs = as_contig_set(contigs)
+    n_kmers = max(0, contigs['total_length'] - k + 1)
+    budget = max_memory_mb * 1024 * 1024
+    chunk_size = max(1 << 16, budget // (2 * _BYTES_PER_POSITION))
+
+    if n_buckets is None:
+        n_buckets = max(1, int(np.ceil(n_kmers * _BYTES_PER_OCCURRENCE / (budget / 2))))
+
+    if n_buckets == 1 and n_kmers * _BYTES_PER_OCCURRENCE <= budget:
+        # Tout tient dans le budget : un seul tri
+        kmers, counts = np.unique(canonical_kmers(contigs, k, chunk_size), return_counts=True)
+        return kmers, counts.astype(np.uint32)
+
+    return count_kmers_stream([contigs], k, max_memory_mb, spill_dir, n_buckets)
+
+
+def count_kmers_stream(contig_sets, k, max_memory_mb=DEFAULT_MAX_MEMORY_MB, spill_dir=None, n_buckets=None,
+                       expected_kmers=None, min_count=1):
+    """Comptes exacts des k-mers canoniques d'une suite de jeux de contigs (blocs de lectures, etc.)
+
+    Les jeux sont consommés un par un (un itérateur suffit) : seuls un bloc et
+    le budget max_memory_mb restent en mémoire, les partitions sont vidées sur
+    disque. Le nombre de partitions est déduit de expected_kmers (estimation
+    du nombre d'occurrences) pour qu'une partition tienne dans la moitié du
+    budget. Seuls les k-mers vus au moins min_count fois sont retournés ;
+    comme pour count_kmers, seuls le bloc courant et les tableaux de sortie
+    s'ajoutent au budget.
+    """
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k doit être compris entre 1 et {MAX_K} (reçu: {k})")
+
+    budget = max_memory_mb * 1024 * 1024
+    chunk_size = max(1 << 16, budget // (2 * _BYTES_PER_POSITION))
+    if n_buckets is None:
+        n_buckets = max(1, int(np.ceil((expected_kmers or 0) * _BYTES_PER_OCCURRENCE / (budget / 2))))
+
+    own_dir = spill_dir is None
+    spill_dir = tempfile.mkdtemp(prefix='lacto_kmers_') if own_dir else spill_dir
+    os.makedirs(spill_dir, exist_ok=True)
+    buckets = _SpillBuckets(n_buckets, budget // 4, spill_dir)
+    try:
+        for contigs in contig_sets:
+            _add_contig_kmers(buckets, as_contig_set(contigs), k, chunk_size)
+        return _count_buckets(buckets, min_count)
+    finally:
+        if own_dir:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+def save_kmer_counts(prefix, kmers, counts):
+    """Sauvegarder un comptage : <prefix>.kmers.npy et <prefix>.counts.npy"""
+    np.save(f"{prefix}.kmers.npy", kmers)
+    np.save(f"{prefix}.counts.npy", counts)
+
+
+def load_kmer_counts(prefix, mmap=True):
+    """Relire un comptage (en mémoire partagée par défaut)"""
+    mode = 'r' if mmap else None
+    return np.load(f"{prefix}.kmers.npy", mmap_mode=mode), np.load(f"{prefix}.counts.npy", mmap_mode=mode)
+
+
+def merge_kmer_counts(tables):
+    """Union de comptages triés [(k-mers, comptes), ...] avec somme des comptes"""
+    kmers = np.concatenate([np.asarray(table[0]) for table in tables])
+    counts = np.concatenate([np.asarray(table[1], dtype=np.uint64) for table in tables])
+    merged, inverse = np.unique(kmers, return_inverse=True)
+    return merged, np.bincount(inverse, weights=counts, minlength=len(merged)).astype(np.uint64)
+
+
+def intersect_kmer_counts(table1, table2):
+    """k-mers communs à deux comptages triés : (k-mers, comptes 1, comptes 2)"""
+    common, index1, index2 = np.intersect1d(table1[0], table2[0], assume_unique=True, return_indices=True)
+    return common, np.asarray(table1[1])[index1], np.asarray(table2[1])[index2]
+
+
+def decode_kmer(code, k):
+    """Convertir un k-mer encodé en chaîne de caractères"""
+    code = int(code)
+    return ''.join('ACGT'[(code >> (2 * (k - 1 - pos))) & 3] for pos in range(k))
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Comptage exact des k-mers canoniques (k <= 31)")
+    parser.add_argument('fasta', help="Génome au format FASTA")
+    parser.add_argument('-k', type=int, default=31, help="Taille des k-mers")
+    parser.add_argument('--max-memory', type=int, default=DEFAULT_MAX_MEMORY_MB,
+                        help="Budget de mémoire de travail (Mo)")
+    parser.add_argument('--spill-dir', help="Dossier des partitions vidées sur disque")
+    parser.add_argument('--output', help="Préfixe des fichiers .kmers.npy / .counts.npy")
+    args = parser.parse_args()
+
+    kmers, counts = count_kmers(load_contig_set(args.fasta), args.k, args.max_memory, args.spill_dir)
+    print_status('success', f"{len(kmers):,} k-mers distincts, {int(counts.sum()):,} occurrences (k={args.k})")
+    if args.output:
+        save_kmer_counts(args.output, kmers, counts)
+        print_status('success', f"Comptages: {args.output}.kmers.npy, {args.output}.counts.npy")
+
+
+if __name__ == "__main__":
+    main()
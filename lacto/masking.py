@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Masquage des régions peu informatives avant les métriques de composition
+
+Trois sources sont réunies en un seul masque d'intervalles [début, fin)
+(coordonnées du tableau de séquence concaténé d'un jeu de contigs) :
+
+  - codes IUPAC (N, R, Y, K...) : toute base autre que A, C, G, T ;
+  - masquage « doux » : séquences en minuscules du FASTA (RepeatMasker,
+    dustmasker...), perdues sinon à la mise en majuscules ;
+  - faible complexité, façon DUST : fenêtres glissantes (dust_window bases,
+    pas d'une demi-fenêtre, contig par contig) dont les triplets sont
+    comptés par lacto.kernels.dust_scores (Numba si disponible). Score d'une
+    fenêtre = somme des c_t (c_t - 1) / 2 sur les 64 triplets, divisée par
+    (l - 1) où l est le nombre de triplets valides ; la fenêtre entière est
+    masquée si 10 x score > dust_level (même échelle que dustmasker -level).
+
+Les noyaux vectorisés (lacto.contigs.kmer_start_mask, gc_windows) lisent
+ce masque sous forme d'intervalles : aucun coût Python par base.
+
+Usage: python3 -m lacto.masking data/genomes/LB_DSM20081.fna --output masque.bed
+"""
+
+import sys
+import argparse
+
+import numpy as np
+
+sys.path.append('.')
+from lacto.kernels import dust_scores
+
+try:
+    from config import MASK_PARAMS
+except ImportError:
+    MASK_PARAMS = {"soft_mask": True, "dust": True, "dust_window": 64, "dust_level": 20}
+
+
+def runs_to_intervals(flags):
+    """Intervalles [début, fin) des plages consécutives de positions vraies"""
+    edges = np.diff(flags.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def merge_intervals(starts, ends):
+    """Union triée d'intervalles (les intervalles qui se touchent sont fusionnés)"""
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    keep = ends > starts
+    starts, ends = starts[keep], ends[keep]
+    if len(starts) == 0:
+        return starts, ends
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    first = np.flatnonzero(np.concatenate(([True], starts[1:] > reach[:-1])))
+    return starts[first], np.maximum.reduceat(ends, first)
+
+
+def split_intervals(starts, ends, cuts):
+    """Couper des intervalles disjoints triés aux positions cuts (jonctions entre contigs)"""
+    cuts = np.asarray(cuts, dtype=np.int64)
+    if len(starts) == 0 or len(cuts) == 0:
+        return starts, ends
+    row = np.maximum(np.searchsorted(starts, cuts, side='right') - 1, 0)
+    cuts = cuts[(cuts > starts[row]) & (cuts < ends[row])]
+    if len(cuts) == 0:
+        return starts, ends
+    return np.sort(np.concatenate((starts, cuts))), np.sort(np.concatenate((ends, cuts)))
+
+
+def intervals_to_mask(starts, ends, length):
+    """Masque booléen de longueur length (intervalles bornés à [0, length))"""
+    starts, ends = merge_intervals(np.clip(starts, 0, length), np.clip(ends, 0, length))
+    if len(starts) == 0:
+        return np.zeros(length, dtype=bool)
+    # Alternance non masqué / masqué : un seul np.repeat, pas de tableau d'entiers par base
+    runs = np.empty(2 * len(starts) + 1, dtype=np.int64)
+    runs[0] = starts[0]
+    runs[1::2] = ends - starts
+    runs[2:-1:2] = starts[1:] - ends[:-1]
+    runs[-1] = length - ends[-1]
+    states = np.zeros(len(runs), dtype=bool)
+    states[1::2] = True
+    return np.repeat(states, runs)
+
+
+def masked_length(mask):
+    """Nombre de bases couvertes par un masque d'intervalles (disjoints)"""
+    return int((mask['ends'] - mask['starts']).sum())
+
+
+def dust_windows(offsets, window, step):
+    """Fenêtres glissantes (débuts, longueurs) contig par contig
+
+    La dernière fenêtre d'un contig est alignée sur sa fin ; un contig plus
+    court que window forme une seule fenêtre.
+    """
+    lengths = np.diff(offsets)
+    spans = np.minimum(lengths, window)
+    counts = np.where(lengths > window, -(-(lengths - window) // step) + 1, (lengths > 0).astype(np.int64))
+    total = int(counts.sum())
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    rank = np.arange(total) - first
+    starts = np.repeat(offsets[:-1], counts) + np.minimum(rank * step, np.repeat(lengths - spans, counts))
+    return starts, np.repeat(spans, counts)
+
+
+def low_complexity_intervals(codes, offsets, window=None, level=None):
+    """Intervalles des fenêtres de faible complexité (10 x score DUST > level)"""
+    window = window or MASK_PARAMS['dust_window']
+    level = MASK_PARAMS['dust_level'] if level is None else level
+    starts, spans = dust_windows(offsets, window, max(1, window // 2))
+    flagged = dust_scores(codes, starts, spans) * 10 > level
+    return merge_intervals(starts[flagged], starts[flagged] + spans[flagged])
+
+
+def build_mask(codes, offsets, soft_masked=None, params=None):
+    """Masque d'intervalles d'un jeu de contigs (IUPAC, minuscules, faible complexité)
+
+    codes : codes nucléotidiques (A=0, C=1, G=2, T=3, autre=4) ;
+    soft_masked : positions en minuscules dans le FASTA (ou None).
+    Retourne {'starts', 'ends'} (intervalles disjoints, coupés aux jonctions)
+    et le nombre de bases masquées par chaque source.
+    """
+    params = {**MASK_PARAMS, **(params or {})}
+    sources = {'ambiguous': runs_to_intervals(codes > 3)}
+    if params['soft_mask'] and soft_masked is not None:
+        sources['soft_masked'] = runs_to_intervals(soft_masked)
+    if params['dust']:
+        sources['low_complexity'] = low_complexity_intervals(codes, offsets, params['dust_window'],
+                                                             params['dust_level'])
+
+    starts, ends = merge_intervals(np.concatenate([source[0] for source in sources.values()]),
+                                   np.concatenate([source[1] for source in sources.values()]))
+    starts, ends = split_intervals(starts, ends, offsets[1:-1])
+    mask = {'starts': starts, 'ends': ends}
+    for name in ('ambiguous', 'soft_masked', 'low_complexity'):
+        source = sources.get(name)
+        mask[name] = int((source[1] - source[0]).sum()) if source is not None else 0
+    return mask
+
+
+def mask_bed_lines(contigs):
+    """Lignes BED (contig, début, fin) du masque d'un jeu de contigs"""
+    mask = contigs.get('mask')
+    if mask is None or len(mask['starts']) == 0:
+        return []
+    offsets = contigs['offsets']
+    rows = np.searchsorted(offsets, mask['starts'], side='right') - 1
+    return [f"{contigs['names'][row]}\t{start - offsets[row]}\t{end - offsets[row]}\n"
+            for row, start, end in zip(rows, mask['starts'], mask['ends'])]
+
+
+def write_mask_bed(contigs, output_path):
+    """Écrire le masque au format BED (coordonnées 0-based, fin exclue)"""
+    lines = mask_bed_lines(contigs)
+    with open(output_path, 'w') as f:
+        f.writelines(lines)
+    return len(lines)
+
+
+def main():
+    """Fonction principale"""
+    from lacto.console import print_status
+    from lacto.contigs import load_contig_set
+
+    parser = argparse.ArgumentParser(description="Masque IUPAC, minuscules et faible complexité (DUST) d'un génome")
+    parser.add_argument('fasta', help="Fichier FASTA du génome")
+    parser.add_argument('--window', type=int, default=MASK_PARAMS['dust_window'], help="Fenêtre DUST (bases)")
+    parser.add_argument('--level', type=float, default=MASK_PARAMS['dust_level'],
+                        help="Seuil DUST (échelle dustmasker, défaut: 20)")
+    parser.add_argument('--no-soft-mask', action='store_true', help="Ignorer les minuscules du FASTA")
+    parser.add_argument('--output', help="Fichier BED de sortie")
+    args = parser.parse_args()
+
+    params = {'dust_window': args.window, 'dust_level': args.level, 'soft_mask': not args.no_soft_mask}
+    contigs = load_contig_set(args.fasta, mask=params)
+    mask = contigs['mask']
+    total = contigs['total_length']
+    print_status('info', f"{len(mask['starts']):,} intervalles, {masked_length(mask):,} bases masquées "
+                 f"({masked_length(mask) / total * 100 if total else 0:.2f}%)")
+    print_status('info', f"IUPAC: {mask['ambiguous']:,} bp, minuscules: {mask['soft_masked']:,} bp, "
+                 f"faible complexité: {mask['low_complexity']:,} bp")
+    if args.output:
+        n_lines = write_mask_bed(contigs, args.output)
+        print_status('success', f"Masque: {args.output} ({n_lines:,} intervalles)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Registre des métriques de comparaison de paires de génomes
+
+Chaque métrique déclare :
+  - un noyau par lot : kernel(left, right) reçoit deux listes alignées de
+    GenomeInputs (une paire par position) et retourne une valeur par paire ;
+  - optionnellement un noyau par bloc (graphe des voisins, lacto.neighbors) :
+    stack(inputs) empile une fois les entrées de tout le panel (tableau
+    indexable par tranches) et block(left, right) retourne la matrice
+    (len(left), len(right)) de toutes les paires croisées de deux tranches ;
+    à défaut, le noyau par lot est appliqué au produit des deux listes ;
+  - sa classe de coût (COST_CLASSES) : 'scalar' (longueurs), 'profile'
+    (profils précalculés par génome) ou 'sequence' (parcours des séquences) ;
+    les métriques sont évaluées par coût croissant et la comparaison calcule
+    les métriques 'scalar' et 'profile' de toutes les paires en un seul lot ;
+  - les entrées précalculées dont elle a besoin (GENOME_INPUTS).
+
+Les entrées d'un génome (codage nucléotidique, vecteur de k-mers, GC par
+fenêtre, RSCU, index de minimiseurs...) sont calculées à la première demande
+puis partagées par toutes les métriques et toutes les paires ; seules celles
+des métriques sélectionnées sont calculées.
+
+La sélection (metric_selection) vient de COMPARISON_PARAMS ou de la ligne de
+commande : une métrique non demandée ou de poids nul n'est jamais calculée ;
+la similarité composite est la moyenne pondérée des métriques de poids
+positif (poids renormalisés si leur somme diffère de 1).
+"""
+
+import math
+from functools import partial
+
+import numpy as np
+
+from lacto.contigs import NUCLEOTIDE_CODES, as_contig_set, kmer_counts, gc_windows
+from lacto.orfs import codon_usage_profile, compare_codon_usage
+from lacto.synteny import minimizer_index, synteny_from_indexes, blocks_table
+
+try:
+    from config import COMPARISON_PARAMS
+except ImportError:
+    COMPARISON_PARAMS = {"metrics": ["kmer", "sequence", "gc", "size", "codon", "synteny"],
+                         "weights": {"kmer": 0.4, "sequence": 0.3, "gc": 0.2, "size": 0.1},
+                         "dotplots": False}
+
+COST_CLASSES = ('scalar', 'profile', 'sequence')
+KMER_K = 4
+
+GENOME_INPUTS = {}
+METRICS = {}
+
+
+def calculate_kmer_vector(genome, k=KMER_K, codes=None):
+    """Calculer le vecteur dense (4^k) des fréquences de k-mers d'un génome
+
+    Les k-mers sont comptés contig par contig : aucun k-mer artificiel n'est
+    créé aux jonctions entre contigs.
+    """
+    counts = kmer_counts(genome, k, codes=codes).astype(np.float64)
+    total_kmers = counts.sum()
+
+    # Normaliser en fréquences
+    return counts / total_kmers if total_kmers > 0 else counts
+
+
+def compare_kmer_vectors(vector1, vector2):
+    """Similarité cosinus entre deux vecteurs de fréquences de k-mers"""
+    dot_product = np.dot(vector1, vector2)
+    norm1 = np.linalg.norm(vector1)
+    norm2 = np.linalg.norm(vector2)
+
+    if norm1 == 0 or norm2 == 0:
+        return 0.0
+
+    return float(dot_product / (norm1 * norm2))
+
+
+def calculate_sequence_similarity(seq1, seq2, window_size=1000):
+    """Calculer un score de similarité approximatif basé sur des fenêtres"""
+    seq1 = as_contig_set(seq1)['sequence']
+    seq2 = as_contig_set(seq2)['sequence']
+
+    min_len = min(len(seq1), len(seq2))
+    if min_len < window_size:
+        window_size = min_len // 2
+
+    if window_size < 10:
+        return 0.0
+
+    num_windows = min_len // window_size
+    span = num_windows * window_size
+
+    # Score basé sur les correspondances exactes, fenêtre par fenêtre
+    matches = (seq1[:span] == seq2[:span]).reshape(num_windows, window_size)
+    scores = matches.mean(axis=1)
+
+    return float(scores.mean()) if num_windows else 0.0
+
+
+def gc_profile_similarity(gc1, gc2):
+    """Corrélation de Pearson de deux profils de GC par fenêtre (tronqués à la même longueur)"""
+    if len(gc1) == 0 or len(gc2) == 0:
+        return 0.0
+
+    min_windows = min(len(gc1), len(gc2))
+    if min_windows < 2:
+        return 0.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = np.corrcoef(gc1[:min_windows], gc2[:min_windows])[0, 1]
+    return float(correlation) if not np.isnan(correlation) else 0.0
+
+
+def calculate_size_similarity(length1, length2):
+    """Similarité de taille entre deux génomes"""
+    size_diff = abs(length1 - length2) / max(length1, length2)
+    return 1 - size_diff
+
+
+class GenomeInputs:
+    """Entrées précalculées d'un génome, calculées à la première demande et partagées
+
+    values : entrées déjà connues (profil relu d'un journal ou d'un index).
+    Les entrées 'transient' (codage nucléotidique) ne sont gardées que le
+    temps de prepare(), pour calculer les autres en un seul passage.
+    """
+
+    def __init__(self, contigs, window_size, values=None):
+        self.contigs = contigs
+        self.window_size = window_size
+        self.values = {name: GENOME_INPUTS[name]['load'](value) for name, value in (values or {}).items()
+                       if name in GENOME_INPUTS}
+        self._keep_transient = False
+
+    def get(self, name):
+        if name in self.values:
+            return self.values[name]
+        value = GENOME_INPUTS[name]['compute'](self)
+        if self._keep_transient or not GENOME_INPUTS[name]['transient']:
+            self.values[name] = value
+        return value
+
+    def prepare(self, names):
+        """Calculer les entrées demandées (codage partagé), puis libérer les entrées transitoires"""
+        self._keep_transient = True
+        try:
+            for name in names:
+                self.get(name)
+        finally:
+            self._keep_transient = False
+            for name in [name for name in self.values if GENOME_INPUTS[name]['transient']]:
+                del self.values[name]
+
+    def profile(self):
+        """Entrées sérialisables déjà calculées (journal de reprise)"""
+        return {name: GENOME_INPUTS[name]['dump'](value) for name, value in self.values.items()
+                if GENOME_INPUTS[name]['dump'] is not None}
+
+
+def register_input(name, compute, transient=False, dump=None, load=None):
+    """Déclarer une entrée précalculée par génome
+
+    compute(inputs) la calcule à partir d'un GenomeInputs ; dump/load la
+    convertissent vers et depuis JSON (None : entrée gardée en mémoire seulement).
+    """
+    GENOME_INPUTS[name] = {'compute': compute, 'transient': transient, 'dump': dump,
+                           'load': load or (lambda value: value)}
+
+
+def register_metric(name, kernel, inputs, cost, matrix, column, short, label, description, record=None,
+                    field=None, stack=None, block=None):
+    """Déclarer une métrique de paire
+
+    matrix : clé de sa matrice dans comparison_data ; column : colonne du
+    tableau des paires ; short, label, description : affichage console,
+    titre de heatmap et ligne du rapport ; record(value) : champs
+    sérialisables d'une valeur (par défaut {name: float}) ; field : champ
+    portant la valeur de la matrice ; stack(inputs), block(left, right) :
+    entrées empilées et matrice de toutes les paires croisées (défaut: liste
+    des GenomeInputs et kernel sur le produit des listes).
+    """
+    if cost not in COST_CLASSES:
+        raise ValueError(f"Classe de coût inconnue: {cost}")
+    METRICS[name] = {'kernel': kernel, 'inputs': tuple(inputs), 'cost': cost, 'matrix': matrix,
+                     'column': column, 'short': short, 'label': label, 'description': description,
+                     'record': record or (lambda value, name=name: {name: float(value)}),
+                     'field': field or name, 'stack': stack or list,
+                     'block': block or partial(_product_block, kernel)}
+
+
+def _product_block(kernel, left, right):
+    pairs = [(inputs1, inputs2) for inputs1 in left for inputs2 in right]
+    values = kernel([pair[0] for pair in pairs], [pair[1] for pair in pairs]) if pairs else []
+    return np.asarray(values, dtype=np.float64).reshape(len(left), len(right))
+
+
+def _as_list(value):
+    return np.asarray(value).tolist()
+
+
+register_input('codes', lambda inputs: NUCLEOTIDE_CODES[inputs.contigs['sequence']], transient=True)
+register_input('length', lambda inputs: int(inputs.contigs['total_length']), dump=int)
+register_input('kmer_vector', lambda inputs: calculate_kmer_vector(inputs.contigs, KMER_K, inputs.get('codes')),
+               dump=_as_list, load=np.asarray)
+register_input('gc_windows', lambda inputs: gc_windows(inputs.contigs, inputs.window_size, inputs.get('codes')),
+               dump=_as_list, load=np.asarray)
+register_input('rscu', lambda inputs: codon_usage_profile(inputs.contigs)['rscu'], dump=_as_list, load=np.asarray)
+register_input('minimizer_index', lambda inputs: minimizer_index(inputs.contigs, codes=inputs.get('codes')))
+
+
+def _kmer_kernel(left, right):
+    vectors1 = np.array([inputs.get('kmer_vector') for inputs in left])
+    vectors2 = np.array([inputs.get('kmer_vector') for inputs in right])
+    norms = np.linalg.norm(vectors1, axis=1) * np.linalg.norm(vectors2, axis=1)
+    scores = np.zeros(len(left))
+    np.divide(np.einsum('ij,ij->i', vectors1, vectors2), norms, out=scores, where=norms > 0)
+    return scores
+
+
+def _kmer_stack(inputs):
+    vectors = np.array([genome.get('kmer_vector') for genome in inputs], dtype=np.float64)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _kmer_block(left, right):
+    return left @ right.T
+
+
+def _size_kernel(left, right):
+    lengths1 = np.array([inputs.get('length') for inputs in left], dtype=np.float64)
+    lengths2 = np.array([inputs.get('length') for inputs in right], dtype=np.float64)
+    return 1 - np.abs(lengths1 - lengths2) / np.maximum(lengths1, lengths2)
+
+
+def _size_stack(inputs):
+    return np.array([genome.get('length') for genome in inputs], dtype=np.float64)
+
+
+def _size_block(left, right):
+    return 1 - np.abs(left[:, None] - right[None, :]) / np.maximum(left[:, None], right[None, :])
+
+
+def _gc_kernel(left, right):
+    return [gc_profile_similarity(inputs1.get('gc_windows'), inputs2.get('gc_windows'))
+            for inputs1, inputs2 in zip(left, right)]
+
+
+def _codon_kernel(left, right):
+    return [compare_codon_usage(inputs1.get('rscu'), inputs2.get('rscu')) for inputs1, inputs2 in zip(left, right)]
+
+
+def _sequence_kernel(left, right):
+    return [calculate_sequence_similarity(inputs1.contigs, inputs2.contigs, inputs1.window_size)
+            for inputs1, inputs2 in zip(left, right)]
+
+
+def _synteny_kernel(left, right):
+    return [synteny_from_indexes(inputs1.get('minimizer_index'), inputs2.get('minimizer_index'))
+            for inputs1, inputs2 in zip(left, right)]
+
+
+def _synteny_record(synteny):
+    return {
+        'synteny_fraction': float(synteny['synteny_fraction']),
+        'breakpoints': synteny['breakpoints'],
+        'inversions': synteny['inversions'],
+        'synteny_blocks': blocks_table(synteny).to_dict('list'),
+    }
+
+
+register_metric('kmer', _kmer_kernel, ('kmer_vector',), 'profile', 'kmer_similarity', 'Similarite_kmers', 'k-mer',
+                'K-mers (4-mers)', "Profils de k-mers (k=4): Composition en tétranucléotides", stack=_kmer_stack,
+                block=_kmer_block)
+register_metric('sequence', _sequence_kernel, (), 'sequence', 'sequence_similarity', 'Similarite_sequence', 'seq',
+                'Similarité de séquence', "Similarité de séquence: Correspondances par fenêtres")
+register_metric('gc', _gc_kernel, ('gc_windows',), 'profile', 'gc_similarity', 'Similarite_GC', 'GC',
+                'Contenu GC', "Contenu GC: Corrélation des profils GC")
+register_metric('size', _size_kernel, ('length',), 'scalar', 'size_similarity', 'Similarite_taille', 'taille',
+                'Taille relative', "Taille relative: Similarité basée sur la taille", stack=_size_stack,
+                block=_size_block)
+register_metric('codon', _codon_kernel, ('rscu',), 'profile', 'codon_similarity', 'Similarite_codons', 'codons',
+                'Usage des codons', "Usage des codons: Corrélation des RSCU des ORF (six cadres)")
+register_metric('synteny', _synteny_kernel, ('minimizer_index',), 'sequence', 'synteny_fraction',
+                'Fraction_synteny', 'synténie', 'Synténie',
+                "Synténie: Blocs colinéaires d'ancres de minimiseurs (deux brins)",
+                record=_synteny_record, field='synteny_fraction')
+
+
+def parse_metric_list(text):
+    """'kmer,gc' -> ['kmer', 'gc']"""
+    return [name.strip() for name in text.split(',') if name.strip()]
+
+
+def parse_weights(text):
+    """'kmer=0.5,gc=0.5' -> {'kmer': 0.5, 'gc': 0.5}"""
+    weights = {}
+    for item in parse_metric_list(text):
+        name, separator, value = item.partition('=')
+        if not separator:
+            raise ValueError(f"Poids invalide '{item}' (attendu: métrique=poids)")
+        weights[name.strip()] = float(value)
+    return weights
+
+
+def metric_selection(metrics=None, weights=None):
+    """Métriques à calculer et poids (normalisés) de la similarité composite
+
+    metrics remplace la liste de COMPARISON_PARAMS ; weights complète ses
+    poids (un poids nul retire la métrique du calcul).
+    """
+    requested = list(COMPARISON_PARAMS['metrics'] if metrics is None else metrics)
+    weights = {**COMPARISON_PARAMS['weights'], **(weights or {})}
+    unknown = sorted((set(requested) | set(weights)) - set(METRICS))
+    if unknown:
+        raise ValueError(f"Métrique(s) inconnue(s): {', '.join(unknown)} (disponibles: {', '.join(METRICS)})")
+    if any(weight < 0 for weight in weights.values()):
+        raise ValueError("Les poids doivent être positifs ou nuls")
+
+    computed = [name for name in METRICS if name in requested and weights.get(name) != 0]
+    composite = {name: weights[name] for name in computed if weights.get(name, 0) > 0}
+    if not composite:
+        raise ValueError("Aucune métrique pondérée sélectionnée pour la similarité composite")
+    total = sum(composite.values())
+    if not math.isclose(total, 1.0):
+        composite = {name: weight / total for name, weight in composite.items()}
+    return {'metrics': computed, 'weights': composite}
+
+
+def required_inputs(metrics, cost=None):
+    """Entrées par génome nécessaires aux métriques (éventuellement d'une seule classe de coût)"""
+    names = []
+    for name in metrics:
+        if cost is None or METRICS[name]['cost'] == cost:
+            names.extend(input_name for input_name in METRICS[name]['inputs'] if input_name not in names)
+    return names
+
+
+def profile_inputs(metrics):
+    """Entrées sérialisables des métriques (profils calculés un génome à la fois, journalisés)"""
+    return [name for name in required_inputs(metrics) if GENOME_INPUTS[name]['dump'] is not None]
+
+
+def split_by_cost(metrics):
+    """(métriques calculables par lot sur toutes les paires, métriques parcourant les séquences)"""
+    batch = [name for name in metrics if METRICS[name]['cost'] != 'sequence']
+    return batch, [name for name in metrics if METRICS[name]['cost'] == 'sequence']
+
+
+def evaluate_pairs(left, right, metrics):
+    """Valeurs des métriques pour des paires (listes alignées de GenomeInputs), par coût croissant"""
+    results = [{} for _ in left]
+    if not results:
+        return results
+    for name in sorted(metrics, key=lambda name: COST_CLASSES.index(METRICS[name]['cost'])):
+        for result, value in zip(results, METRICS[name]['kernel'](left, right)):
+            result[name] = value
+    return results
+
+
+def stack_inputs(inputs, metrics):
+    """Entrées d'une liste de GenomeInputs empilées pour les noyaux par bloc des métriques"""
+    return {name: METRICS[name]['stack'](inputs) for name in metrics}
+
+
+def evaluate_block(left, right, metrics):
+    """Matrices (len(left), len(right)) des métriques pour toutes les paires croisées
+
+    left, right : entrées empilées (stack_inputs) ou tranches de celles-ci.
+    """
+    return {name: METRICS[name]['block'](left[name], right[name]) for name in metrics}
+
+
+def pair_record(pair):
+    """Métriques d'une paire sous forme sérialisable (journal, blocs fractionnés)"""
+    record = {}
+    for name in METRICS:
+        if name in pair:
+            record.update(METRICS[name]['record'](pair[name]))
+    return record
+
+
+def matrix_values(pair):
+    """Valeur de matrice (float) de chaque métrique calculée d'une paire"""
+    return {name: float(METRICS[name]['record'](value)[METRICS[name]['field']])
+            for name, value in pair.items()}
+
+
+def composite_score(values, weights):
+    """Similarité composite (valeurs ou matrices par métrique, poids de metric_selection)"""
+    return sum(weight * values[name] for name, weight in weights.items())
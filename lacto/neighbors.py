@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Graphe creux des plus proches voisins et groupes de souches par seuil
+
+Au-delà de quelques milliers de souches, les matrices denses n x n de
+l'étape 3 ne tiennent plus en mémoire et ne sont plus lisibles. Ce module
+garde, pour chaque souche :
+
+  - ses top_k plus proches voisins (similarité composite, quelle qu'elle soit) ;
+  - au-delà, ses voisins de similarité >= seuil (ANALYSIS_PARAMS
+    ['similarity_threshold']), dans la limite de max_degree voisins.
+
+Les similarités sont calculées par blocs de block_size souches contre tout
+le panel (noyaux par bloc du registre lacto.metrics, métriques sur profils
+seulement) : la mémoire est en O(n x max_degree + block_size x n), jamais en
+O(n²). Le graphe est stocké en liste d'arêtes CSR compressée (indptr,
+indices, similarités triées par voisin décroissant).
+
+Les groupes sont les composantes connexes du graphe restreint aux arêtes
+>= seuil, pour un ou plusieurs seuils : groupes de lien simple, exacts tant
+que chaque souche a au plus max_degree voisins au-dessus du seuil. Le
+représentant d'un groupe est la souche de plus forte similarité cumulée
+avec les autres membres.
+
+Usage: python3 -m lacto.neighbors data/results/neighbor_graph.npz --thresholds 0.8,0.9,0.95
+"""
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.atomic import atomic_path
+from lacto.metrics import stack_inputs, evaluate_block, composite_score
+
+try:
+    from config import ANALYSIS_PARAMS, NEIGHBOR_PARAMS
+except ImportError:
+    ANALYSIS_PARAMS = {"similarity_threshold": 0.8}
+    NEIGHBOR_PARAMS = {"top_k": 10, "max_degree": 50, "block_size": 256, "cluster_thresholds": [0.9, 0.95]}
+
+
+def cluster_thresholds(thresholds=None):
+    """Seuils de regroupement croissants (défaut: seuil de similarité et NEIGHBOR_PARAMS)"""
+    if thresholds is None:
+        thresholds = [ANALYSIS_PARAMS['similarity_threshold'], *NEIGHBOR_PARAMS['cluster_thresholds']]
+    return sorted(set(float(threshold) for threshold in thresholds))
+
+
+def block_neighbors(scores, first_row, top_k, threshold, max_degree):
+    """Voisins retenus d'un bloc de lignes (scores : bloc x n, first_row : souche de la première ligne)
+
+    Retourne (nombre de voisins par ligne, indices, similarités), voisins de
+    chaque ligne par similarité décroissante puis indice croissant.
+    """
+    n_rows, n = scores.shape
+    scores = scores.astype(np.float64, copy=True)
+    scores[np.arange(n_rows), first_row + np.arange(n_rows)] = -np.inf  # Pas de boucle sur soi
+    degree = min(max_degree, n - 1)
+    if degree <= 0:
+        return np.zeros(n_rows, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0)
+
+    if degree < n - 1:
+        candidates = np.argpartition(-scores, degree - 1, axis=1)[:, :degree]
+    else:
+        candidates = np.tile(np.arange(n), (n_rows, 1))
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.lexsort((candidates, -candidate_scores))
+    candidates = np.take_along_axis(candidates, order, axis=1)
+    candidate_scores = np.take_along_axis(candidate_scores, order, axis=1)
+
+    rank = np.arange(candidates.shape[1])[None, :]
+    keep = ((rank < top_k) | (candidate_scores >= threshold)) & np.isfinite(candidate_scores)
+    return keep.sum(axis=1), candidates[keep].astype(np.int32), candidate_scores[keep]
+
+
+def _assemble_graph(parts, names, top_k, threshold, max_degree):
+    counts = np.concatenate([part[0] for part in parts]) if parts else np.zeros(0, dtype=np.int64)
+    return {
+        'names': list(names),
+        'indptr': np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+        'indices': np.concatenate([part[1] for part in parts]) if parts else np.zeros(0, dtype=np.int32),
+        'similarities': np.concatenate([part[2] for part in parts]) if parts else np.zeros(0),
+        'top_k': top_k,
+        'threshold': threshold,
+        'max_degree': max_degree,
+    }
+
+
+def neighbor_graph(inputs, names, selection, top_k=None, threshold=None, max_degree=None, block_size=None):
+    """Graphe CSR des voisins à partir des entrées par génome (lacto.metrics.GenomeInputs)
+
+    Seules les métriques sur profils de la sélection sont calculées ; la
+    similarité composite utilise leurs poids (renormalisés par l'appelant).
+    """
+    top_k = NEIGHBOR_PARAMS['top_k'] if top_k is None else top_k
+    threshold = ANALYSIS_PARAMS['similarity_threshold'] if threshold is None else threshold
+    max_degree = max(top_k, NEIGHBOR_PARAMS['max_degree'] if max_degree is None else max_degree)
+    block_size = block_size or NEIGHBOR_PARAMS['block_size']
+
+    weights = selection['weights']
+    panel = stack_inputs(inputs, weights)
+    parts = []
+    for start in range(0, len(inputs), block_size):
+        rows = {name: stacked[start:start + block_size] for name, stacked in panel.items()}
+        scores = composite_score(evaluate_block(rows, panel, weights), weights)
+        parts.append(block_neighbors(scores, start, top_k, threshold, max_degree))
+        del scores
+    return _assemble_graph(parts, names, top_k, threshold, max_degree)
+
+
+def graph_from_matrix(matrix, names, top_k=None, threshold=None, max_degree=None, block_size=None):
+    """Graphe CSR des voisins extrait d'une matrice de similarité dense (petits panels)"""
+    top_k = NEIGHBOR_PARAMS['top_k'] if top_k is None else top_k
+    threshold = ANALYSIS_PARAMS['similarity_threshold'] if threshold is None else threshold
+    max_degree = max(top_k, NEIGHBOR_PARAMS['max_degree'] if max_degree is None else max_degree)
+    block_size = block_size or NEIGHBOR_PARAMS['block_size']
+    matrix = np.asarray(matrix, dtype=np.float64)
+    parts = [block_neighbors(np.nan_to_num(matrix[start:start + block_size], nan=-np.inf), start, top_k,
+                             threshold, max_degree)
+             for start in range(0, len(matrix), block_size)]
+    return _assemble_graph(parts, names, top_k, threshold, max_degree)
+
+
+def graph_edges(graph):
+    """Arêtes (source, cible, similarité) du graphe CSR"""
+    sources = np.repeat(np.arange(len(graph['names'])), np.diff(graph['indptr']))
+    return sources, graph['indices'].astype(np.int64), graph['similarities']
+
+
+def save_neighbor_graph(graph, path):
+    """Écrire le graphe CSR (npz compressé)"""
+    with atomic_path(path) as temporary, open(temporary, 'wb') as f:
+        np.savez_compressed(f, names=np.array(graph['names'], dtype=str), indptr=graph['indptr'],
+                            indices=graph['indices'], similarities=graph['similarities'],
+                            parameters=np.array([graph['top_k'], graph['threshold'], graph['max_degree']]))
+    return path
+
+
+def load_neighbor_graph(path):
+    """Relire un graphe écrit par save_neighbor_graph"""
+    with np.load(path) as data:
+        top_k, threshold, max_degree = data['parameters']
+        return {'names': data['names'].tolist(), 'indptr': data['indptr'], 'indices': data['indices'],
+                'similarities': data['similarities'], 'top_k': int(top_k), 'threshold': float(threshold),
+                'max_degree': int(max_degree)}
+
+
+def cluster_labels(graph, threshold):
+    """Groupe de chaque souche : composantes connexes des arêtes >= threshold
+
+    Groupes numérotés par taille décroissante (puis par premier membre).
+    """
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    n = len(graph['names'])
+    sources, targets, similarities = graph_edges(graph)
+    kept = similarities >= threshold
+    adjacency = csr_matrix((np.ones(int(kept.sum()), dtype=np.int8), (sources[kept], targets[kept])), shape=(n, n))
+    _, labels = connected_components(adjacency, directed=True, connection='weak')
+
+    sizes = np.bincount(labels)
+    first_member = np.full(len(sizes), n)
+    np.minimum.at(first_member, labels, np.arange(n))
+    order = np.lexsort((first_member, -sizes))
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[order] = np.arange(len(sizes))
+    return rank[labels]
+
+
+def cluster_representatives(graph, labels, threshold):
+    """Représentant de chaque groupe : plus forte similarité cumulée aux membres (arêtes >= threshold)"""
+    sources, targets, similarities = graph_edges(graph)
+    inside = (similarities >= threshold) & (labels[sources] == labels[targets])
+    n = len(labels)
+    strength = (np.bincount(sources[inside], weights=similarities[inside], minlength=n)
+                + np.bincount(targets[inside], weights=similarities[inside], minlength=n))
+    order = np.lexsort((np.arange(n), -strength, labels))
+    first = np.concatenate(([True], labels[order][1:] != labels[order][:-1]))
+    representatives = np.empty(labels.max() + 1 if n else 0, dtype=np.int64)
+    representatives[labels[order][first]] = order[first]
+    return representatives
+
+
+def cluster_table(graph, thresholds=None):
+    """Tableau (Seuil, Souche, Groupe, Taille_groupe, Representant) pour chaque seuil"""
+    names = np.array(graph['names'], dtype=object)
+    tables = []
+    for threshold in cluster_thresholds(thresholds):
+        labels = cluster_labels(graph, threshold)
+        representatives = cluster_representatives(graph, labels, threshold)
+        tables.append(pd.DataFrame({
+            'Seuil': threshold,
+            'Souche': names,
+            'Groupe': labels,
+            'Taille_groupe': np.bincount(labels)[labels],
+            'Representant': names[representatives[labels]],
+        }))
+    if not tables:
+        return pd.DataFrame(columns=['Seuil', 'Souche', 'Groupe', 'Taille_groupe', 'Representant'])
+    return pd.concat(tables, ignore_index=True)
+
+
+def write_cluster_table(clusters, path):
+    """Écrire le tableau des groupes et résumer chaque seuil"""
+    with atomic_path(path) as temporary:
+        clusters.to_csv(temporary, index=False)
+    for threshold, table in clusters.groupby('Seuil'):
+        print_status('info', f"Seuil {threshold:.2f}: {table['Groupe'].nunique()} groupes "
+                     f"({int((table['Taille_groupe'] == 1).sum())} souches isolées)")
+    print_status('success', f"Groupes de souches: {path}")
+
+
+def write_neighbor_outputs(graph, results_dir, thresholds=None):
+    """Écrire le graphe (neighbor_graph.npz) et les groupes (strain_clusters.csv) ; retourne le tableau"""
+    graph_path = save_neighbor_graph(graph, os.path.join(results_dir, 'neighbor_graph.npz'))
+    print_status('success', f"Graphe des voisins: {graph_path} ({len(graph['indices']):,} arêtes, "
+                 f"{len(graph['names'])} souches)")
+    clusters = cluster_table(graph, thresholds)
+    write_cluster_table(clusters, os.path.join(results_dir, 'strain_clusters.csv'))
+    return clusters
+
+
+def parse_thresholds(text):
+    """'0.8,0.9' -> [0.8, 0.9]"""
+    return [float(value) for value in text.split(',') if value.strip()]
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Groupes de souches à partir du graphe creux des voisins")
+    parser.add_argument('graph', nargs='?', default='data/results/neighbor_graph.npz',
+                        help="Graphe écrit par l'étape 3 (défaut: data/results/neighbor_graph.npz)")
+    parser.add_argument('--thresholds', type=parse_thresholds, metavar='LISTE',
+                        help="Seuils de similarité des groupes, ex. 0.8,0.9,0.95")
+    parser.add_argument('--output', help="Tableau des groupes (défaut: strain_clusters.csv à côté du graphe)")
+    parser.add_argument('--neighbors', metavar='SOUCHE', help="Afficher les voisins retenus d'une souche")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.graph):
+        print_status('error', f"Graphe non trouvé: {args.graph} (lancer l'étape 3)")
+        sys.exit(1)
+    graph = load_neighbor_graph(args.graph)
+    print_status('info', f"{len(graph['names'])} souches, {len(graph['indices']):,} arêtes "
+                 f"(top {graph['top_k']}, seuil {graph['threshold']:.2f}, au plus {graph['max_degree']} voisins)")
+
+    if args.neighbors:
+        if args.neighbors not in graph['names']:
+            print_status('error', f"Souche inconnue: {args.neighbors}")
+            sys.exit(1)
+        row = graph['names'].index(args.neighbors)
+        begin, end = graph['indptr'][row], graph['indptr'][row + 1]
+        for target, similarity in zip(graph['indices'][begin:end], graph['similarities'][begin:end]):
+            print(f"{graph['names'][target]}\t{similarity:.4f}")
+        return
+
+    output = args.output or os.path.join(os.path.dirname(args.graph), 'strain_clusters.csv')
+    write_cluster_table(cluster_table(graph, args.thresholds), output)
+
+
+if __name__ == "__main__":
+    main()
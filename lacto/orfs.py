@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Recherche vectorisée des ORF sur les six cadres de lecture et usage des codons
+
+Chaque position est convertie en code de codon (16*b1 + 4*b2 + b3, 64 si une
+base est ambiguë). Pour chaque brin et chaque cadre, la vue décalée de 3 en 3
+de ce tableau donne la suite des codons ; les ORF sont les segments entre deux
+codons stop consécutifs, du premier ATG jusqu'au stop inclus. Aucune boucle
+Python par codon : seules les boucles sur les contigs, brins et cadres restent.
+
+Usage: python3 -m lacto.orfs data/genomes/LB_DSM20081.fna
+"""
+
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+from lacto.contigs import NUCLEOTIDE_CODES, as_contig_set, load_contig_set
+from lacto.kmers import decode_kmer
+
+# Code génétique bactérien (table 11), codons dans l'ordre AAA, AAC, ..., TTT
+GENETIC_CODE = 'KNKNTTTTRSRSIIMIQHQHPPPPRRRRLLLLEDEDAAAAGGGGVVVV*Y*YSSSS*CWCLFLF'
+CODONS = [decode_kmer(code, 3) for code in range(64)]
+STOP_CODONS = np.array([code for code, aa in enumerate(GENETIC_CODE) if aa == '*'])
+START_CODON = 14  # ATG
+AMINO_ACIDS = sorted(set(GENETIC_CODE) - {'*'})
+AMBIGUOUS_CODON = 64
+DEFAULT_MIN_CODONS = 100
+
+_IS_STOP = np.zeros(65, dtype=bool)
+_IS_STOP[STOP_CODONS] = True
+_CODON_AA = np.array([AMINO_ACIDS.index(aa) if aa != '*' else -1 for aa in GENETIC_CODE])
+
+
+def codon_codes(codes):
+    """Code de codon commençant à chaque position (64 si ambigu)"""
+    if len(codes) < 3:
+        return np.zeros(0, dtype=np.int16)
+    first, second, third = codes[:-2].astype(np.int16), codes[1:-1].astype(np.int16), codes[2:].astype(np.int16)
+    codons = first * 16 + second * 4 + third
+    codons[(first > 3) | (second > 3) | (third > 3)] = AMBIGUOUS_CODON
+    return codons
+
+
+def scan_frame(codons, min_codons=DEFAULT_MIN_CODONS):
+    """ORF d'un cadre : (indice du codon ATG, indice du codon stop), ORF complets uniquement"""
+    stops = np.flatnonzero(_IS_STOP[codons])
+    if len(stops) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Premier ATG après le stop précédent (ou après le début du cadre)
+    previous_stop = np.concatenate(([-1], stops[:-1]))
+    atg = np.flatnonzero(codons == START_CODON)
+    if len(atg) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    first_atg_rank = np.searchsorted(atg, previous_stop + 1)
+    has_atg = first_atg_rank < len(atg)
+    starts = atg[np.minimum(first_atg_rank, len(atg) - 1)]
+
+    keep = has_atg & (starts < stops) & (stops - starts >= min_codons)
+
+    # Écarter les ORF contenant un codon ambigu
+    ambiguous = np.concatenate(([0], np.cumsum(codons == AMBIGUOUS_CODON)))
+    keep &= (ambiguous[np.maximum(stops, 0)] - ambiguous[np.maximum(starts, 0)]) == 0
+    return starts[keep], stops[keep]
+
+
+def find_orfs(contigs, min_codons=DEFAULT_MIN_CODONS):
+    """ORF des six cadres de tous les contigs et comptes de codons codants
+
+    Retourne un DataFrame des ORF (contig, brin, cadre, début, fin en pb sur le
+    brin direct, 0-based, fin exclue) et le vecteur des 64 comptes de codons.
+    """
+    contigs = as_contig_set(contigs)
+    codes = NUCLEOTIDE_CODES[contigs['sequence']]
+    complement = np.array([3, 2, 1, 0, 4], dtype=np.uint8)
+
+    codon_counts = np.zeros(65, dtype=np.int64)
+    records = {'contig': [], 'strand': [], 'frame': [], 'start': [], 'end': [], 'codons': []}
+
+    for name, offset, length in zip(contigs['names'], contigs['offsets'][:-1], contigs['lengths']):
+        forward = codes[offset:offset + length]
+        for strand, strand_codes in (('+', forward), ('-', complement[forward[::-1]])):
+            all_codons = codon_codes(strand_codes)
+            for frame in range(3):
+                codons = all_codons[frame::3]
+                starts, stops = scan_frame(codons, min_codons)
+                if len(starts) == 0:
+                    continue
+
+                # Codons des ORF (stop inclus) par tableau de différences
+                marks = np.zeros(len(codons) + 1, dtype=np.int32)
+                np.add.at(marks, starts, 1)
+                np.add.at(marks, stops + 1, -1)
+                codon_counts += np.bincount(codons[np.cumsum(marks[:-1]) > 0], minlength=65)
+
+                begin = frame + 3 * starts
+                end = frame + 3 * (stops + 1)
+                if strand == '-':
+                    begin, end = length - end, length - begin
+                records['contig'].append(np.full(len(starts), name, dtype=object))
+                records['strand'].append(np.full(len(starts), strand))
+                records['frame'].append(np.full(len(starts), frame))
+                records['start'].append(begin)
+                records['end'].append(end)
+                records['codons'].append(stops - starts + 1)
+
+    orfs = pd.DataFrame({key: np.concatenate(values) if values else [] for key, values in records.items()})
+    return orfs, codon_counts[:64]
+
+
+def rscu(codon_counts):
+    """Usage relatif des codons synonymes (RSCU) pour chacun des 64 codons"""
+    codon_counts = np.asarray(codon_counts, dtype=np.float64)
+    values = np.zeros(64)
+    for aa in set(GENETIC_CODE):
+        synonymous = np.array([code for code, codon_aa in enumerate(GENETIC_CODE) if codon_aa == aa])
+        mean = codon_counts[synonymous].mean()
+        if mean > 0:
+            values[synonymous] = codon_counts[synonymous] / mean
+    return values
+
+
+def amino_acid_composition(codon_counts):
+    """Fréquence de chaque acide aminé (stops exclus)"""
+    codon_counts = np.asarray(codon_counts, dtype=np.float64)
+    sense = _CODON_AA >= 0
+    counts = np.bincount(_CODON_AA[sense], weights=codon_counts[sense], minlength=len(AMINO_ACIDS))
+    total = counts.sum()
+    return counts / total if total > 0 else counts
+
+
+def codon_usage_profile(contigs, min_codons=DEFAULT_MIN_CODONS):
+    """Profil complet d'un génome : ORF, comptes de codons, RSCU et acides aminés"""
+    contigs = as_contig_set(contigs)
+    orfs, codon_counts = find_orfs(contigs, min_codons)
+    coding_bases = int(orfs['codons'].sum() * 3) if len(orfs) else 0
+    return {
+        'orfs': orfs,
+        'codon_counts': codon_counts,
+        'rscu': rscu(codon_counts),
+        'amino_acids': amino_acid_composition(codon_counts),
+        'orf_count': len(orfs),
+        'coding_fraction': coding_bases / (2 * contigs['total_length']) if contigs['total_length'] else 0.0,
+    }
+
+
+def compare_codon_usage(rscu1, rscu2):
+    """Similarité d'usage des codons : corrélation de Pearson des RSCU (bornée à [0, 1])"""
+    if np.std(rscu1) == 0 or np.std(rscu2) == 0:
+        return 0.0
+    return float(max(0.0, np.corrcoef(rscu1, rscu2)[0, 1]))
+
+
+def codon_usage_table(profiles):
+    """Tableau souches x codons (comptes et RSCU)"""
+    rows = []
+    for strain, profile in profiles.items():
+        row = {'Souche': strain, 'ORF': profile['orf_count'],
+               'Fraction_codante': round(profile['coding_fraction'], 4)}
+        for code, (codon, count, value) in enumerate(zip(CODONS, profile['codon_counts'], profile['rscu'])):
+            row[f'{codon}_{GENETIC_CODE[code]}'] = int(count)
+            row[f'RSCU_{codon}'] = round(float(value), 4)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def amino_acid_table(profiles):
+    """Tableau souches x acides aminés (fréquences en %)"""
+    return pd.DataFrame([
+        {'Souche': strain, **{aa: round(float(freq) * 100, 3) for aa, freq in zip(AMINO_ACIDS, profile['amino_acids'])}}
+        for strain, profile in profiles.items()
+    ])
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="ORF sur six cadres et usage des codons")
+    parser.add_argument('fasta', help="Génome au format FASTA")
+    parser.add_argument('--min-codons', type=int, default=DEFAULT_MIN_CODONS,
+                        help="Longueur minimale des ORF en codons")
+    args = parser.parse_args()
+
+    profile = codon_usage_profile(load_contig_set(args.fasta), args.min_codons)
+    print(f"{profile['orf_count']:,} ORF, fraction codante (2 brins): {profile['coding_fraction']:.3f}")
+    print(amino_acid_table({args.fasta: profile}).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
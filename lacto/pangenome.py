@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Pangénome k-mers : contenu partagé par toutes les souches ou propre à une seule
+
+Chaque souche est représentée par l'ensemble trié (uint64) de ses k-mers
+canoniques, stocké en .npy et relu en mémoire partagée (mmap). L'espace des
+k-mers est découpé en partitions d'intervalles de valeurs : pour chaque
+partition, la tranche correspondante de chaque souche est retrouvée par
+recherche dichotomique, ce qui borne la mémoire quelle que soit la taille du
+panel. Les k-mers sont classés en :
+
+  - core      : présents dans toutes les souches
+  - accessory : présents dans au moins deux souches mais pas toutes
+  - specific  : présents dans une seule souche
+
+Usage: python3 -m lacto.pangenome [--k 21] [--output data/results/pangenome]
+"""
+
+import os
+import sys
+import json
+import argparse
+from contextlib import ExitStack
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.atomic import atomic_path
+from lacto.contigs import load_contig_set
+from lacto.kmers import kmer_set
+
+try:
+    from config import STRAINS, PATHS, ANALYSIS_PARAMS, PANGENOME_PARAMS
+except ImportError:
+    print("❌ Erreur: fichier config.py non trouvé")
+    sys.exit(1)
+
+# Colonnes du tableau des k-mers non core (fichiers binaires bruts, une colonne par fichier)
+KMER_COLUMNS = {
+    'kmer': np.uint64,
+    'n_strains': np.uint16,
+}
+
+# Marqueur des ensembles de k-mers complets (k, souches), écrit après le dernier .npy
+KMER_SETS_MARKER = 'kmer_sets.json'
+
+
+def build_strain_kmer_sets(genome_paths, k, output_dir, min_contig_length=0, max_memory_mb=256, genomes=None):
+    """Calculer et sauvegarder l'ensemble trié des k-mers de chaque souche
+
+    Les génomes sont traités un par un : seul un génome est en mémoire à la fois,
+    et le comptage de ses k-mers respecte le budget max_memory_mb. genomes
+    fournit des contigs déjà chargés (même min_contig_length) à réutiliser.
+    Retourne {souche: chemin du fichier .npy}.
+    """
+    genomes = genomes or {}
+    kmers_dir = os.path.join(output_dir, 'kmers')
+    os.makedirs(kmers_dir, exist_ok=True)
+
+    # Marqueur retiré pendant la reconstruction : un jeu partiel n'est jamais réutilisé
+    marker_path = os.path.join(kmers_dir, KMER_SETS_MARKER)
+    if os.path.exists(marker_path):
+        os.remove(marker_path)
+
+    set_paths = {}
+    for strain, genome_path in genome_paths.items():
+        contigs = genomes.get(strain) or load_contig_set(genome_path, min_contig_length)
+        kmers = kmer_set(contigs, k, max_memory_mb)
+        set_path = os.path.join(kmers_dir, f"{strain}.npy")
+        with atomic_path(set_path) as temporary:
+            np.save(temporary, kmers)
+        set_paths[strain] = set_path
+        print_status('success', f"{strain}: {len(kmers):,} k-mers distincts (k={k})")
+
+    with atomic_path(marker_path) as temporary, open(temporary, 'w') as f:
+        json.dump({'k': k, 'min_contig_length': min_contig_length, 'strains': list(set_paths)}, f, indent=2)
+    return set_paths
+
+
+def load_strain_kmer_sets(set_paths):
+    """Relire les ensembles de k-mers en mémoire partagée"""
+    return {strain: np.load(path, mmap_mode='r') for strain, path in set_paths.items()}
+
+
+def bucket_boundaries(kmer_sets, max_bucket_kmers):
+    """Bornes des partitions de l'espace des k-mers
+
+    Les bornes sont choisies sur un échantillon des ensembles triés pour que
+    chaque partition contienne environ max_bucket_kmers occurrences au total.
+    """
+    total = sum(len(kmers) for kmers in kmer_sets.values())
+    n_buckets = max(1, int(np.ceil(total / max_bucket_kmers)))
+    if n_buckets == 1:
+        return np.zeros(0, dtype=np.uint64)
+
+    sample = np.sort(np.concatenate([
+        np.asarray(kmers[::max(1, len(kmers) // (16 * n_buckets))]) for kmers in kmer_sets.values()
+    ]))
+    quantiles = np.linspace(0, len(sample), n_buckets + 1)[1:-1].astype(np.int64)
+    return np.unique(sample[quantiles])
+
+
+def iter_buckets(kmer_sets, boundaries):
+    """Parcourir les partitions : (k-mers triés, indice de souche de chaque occurrence)"""
+    sets = list(kmer_sets.values())
+    edges = [np.searchsorted(kmers, boundaries) for kmers in sets]
+
+    for bucket in range(len(boundaries) + 1):
+        slices, strain_ids = [], []
+        for strain_index, (kmers, cuts) in enumerate(zip(sets, edges)):
+            start = cuts[bucket - 1] if bucket > 0 else 0
+            end = cuts[bucket] if bucket < len(boundaries) else len(kmers)
+            slices.append(np.asarray(kmers[start:end]))
+            strain_ids.append(np.full(end - start, strain_index, dtype=np.int32))
+
+        kmers = np.concatenate(slices)
+        order = np.argsort(kmers, kind='stable')
+        yield kmers[order], np.concatenate(strain_ids)[order]
+
+
+def group_occurrences(kmers):
+    """Indice de groupe (k-mer distinct) de chaque occurrence et début de chaque groupe"""
+    is_start = np.ones(len(kmers), dtype=bool)
+    is_start[1:] = kmers[1:] != kmers[:-1]
+    group = np.cumsum(is_start) - 1
+    return group, np.flatnonzero(is_start)
+
+
+def presence_bitmap(group, strain_ids, n_groups, n_strains):
+    """Bitmap compressé de présence (un bit par souche, np.packbits) de chaque groupe"""
+    n_bytes = (n_strains + 7) // 8
+    bits = (128 >> (strain_ids % 8)).astype(np.float64)
+    flat = np.bincount(group * n_bytes + strain_ids // 8, weights=bits, minlength=n_groups * n_bytes)
+    return flat.astype(np.uint8).reshape(n_groups, n_bytes)
+
+
+def rarefaction_histograms(group, group_starts, strain_ids, rank):
+    """Histogrammes du rang d'apparition et du premier rang manquant de chaque k-mer
+
+    Pour une permutation des souches (rank[souche] = position), un k-mer entre
+    dans le pangénome au rang de sa première souche et reste core tant que
+    toutes les souches précédentes le contiennent.
+    """
+    n_strains = len(rank)
+    ranks = rank[strain_ids]
+    order = np.lexsort((ranks, group))
+    ranks = ranks[order]
+
+    position_in_group = np.arange(len(ranks)) - group_starts[group]
+    first_missing = np.bincount(group, weights=(ranks == position_in_group), minlength=len(group_starts))
+
+    first_rank_hist = np.bincount(ranks[group_starts], minlength=n_strains)
+    first_missing_hist = np.bincount(first_missing.astype(np.int64), minlength=n_strains + 1)
+    return first_rank_hist, first_missing_hist
+
+
+class ColumnWriter:
+    """Écriture en colonnes binaires (un fichier par colonne, ajout par partition)
+
+    Les colonnes sont écrites sous des noms temporaires (atomic_path) et ne
+    remplacent les anciennes qu'à close, juste avant schema.json ; en cas
+    d'erreur (sortie du bloc with), les fichiers temporaires sont supprimés.
+    """
+
+    def __init__(self, output_dir, columns):
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.columns = dict(columns)
+        self.rows = 0
+        self._stack = ExitStack()
+        self.files = {}
+        for name in self.columns:
+            temporary = self._stack.enter_context(atomic_path(os.path.join(output_dir, f"{name}.bin")))
+            self.files[name] = self._stack.enter_context(open(temporary, 'wb'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is not None:
+            self._stack.__exit__(*exc)
+
+    def append(self, **values):
+        for name, array in values.items():
+            np.ascontiguousarray(array, dtype=self.columns[name]).tofile(self.files[name])
+        self.rows += len(next(iter(values.values())))
+
+    def close(self, **metadata):
+        self._stack.close()
+        schema = {
+            'rows': self.rows,
+            'columns': {name: np.dtype(dtype).str for name, dtype in self.columns.items()},
+            **metadata
+        }
+        with atomic_path(os.path.join(self.output_dir, 'schema.json')) as temporary, open(temporary, 'w') as f:
+            json.dump(schema, f, indent=2)
+
+
+def read_columns(columns_dir):
+    """Relire des colonnes binaires écrites par ColumnWriter (mmap)"""
+    with open(os.path.join(columns_dir, 'schema.json'), 'r') as f:
+        schema = json.load(f)
+    columns = {}
+    for name, dtype in schema['columns'].items():
+        path = os.path.join(columns_dir, f"{name}.bin")
+        shape = (schema['rows'], -1) if name == 'presence' else (schema['rows'],)
+        data = np.memmap(path, dtype=np.dtype(dtype), mode='r') if schema['rows'] else np.zeros(0, dtype)
+        columns[name] = data.reshape(shape) if schema['rows'] else data
+    return columns, schema
+
+
+def analyze_pangenome(kmer_sets, n_permutations=10, seed=42, max_bucket_kmers=5_000_000, columns_dir=None):
+    """Classer les k-mers (core / accessory / specific) et calculer la raréfaction"""
+    strain_names = list(kmer_sets.keys())
+    n_strains = len(strain_names)
+
+    rng = np.random.default_rng(seed)
+    permutations = [rng.permutation(n_strains) for _ in range(n_permutations)]
+    ranks = [np.argsort(permutation) for permutation in permutations]
+
+    frequency_spectrum = np.zeros(n_strains + 1, dtype=np.int64)
+    accessory_per_strain = np.zeros(n_strains, dtype=np.int64)
+    specific_per_strain = np.zeros(n_strains, dtype=np.int64)
+    first_rank_hists = np.zeros((n_permutations, n_strains), dtype=np.int64)
+    first_missing_hists = np.zeros((n_permutations, n_strains + 1), dtype=np.int64)
+
+    with ExitStack() as stack:
+        writer = None
+        if columns_dir:
+            writer = stack.enter_context(ColumnWriter(columns_dir, {**KMER_COLUMNS, 'presence': np.uint8}))
+
+        boundaries = bucket_boundaries(kmer_sets, max_bucket_kmers)
+        for kmers, strain_ids in iter_buckets(kmer_sets, boundaries):
+            if len(kmers) == 0:
+                continue
+            group, group_starts = group_occurrences(kmers)
+            n_strains_per_kmer = np.diff(np.append(group_starts, len(kmers)))
+            frequency_spectrum += np.bincount(n_strains_per_kmer, minlength=n_strains + 1)
+
+            occurrence_count = n_strains_per_kmer[group]
+            accessory_per_strain += np.bincount(
+                strain_ids[(occurrence_count > 1) & (occurrence_count < n_strains)], minlength=n_strains)
+            specific_per_strain += np.bincount(strain_ids[occurrence_count == 1], minlength=n_strains)
+
+            for perm_index, rank in enumerate(ranks):
+                first_rank, first_missing = rarefaction_histograms(group, group_starts, strain_ids, rank)
+                first_rank_hists[perm_index] += first_rank
+                first_missing_hists[perm_index] += first_missing
+
+            if writer:
+                non_core = n_strains_per_kmer < n_strains
+                presence = presence_bitmap(group, strain_ids, len(group_starts), n_strains)
+                writer.append(kmer=kmers[group_starts][non_core],
+                              n_strains=n_strains_per_kmer[non_core],
+                              presence=presence[non_core])
+
+        if writer:
+            writer.close(strain_names=strain_names, description="k-mers non core avec bitmap de présence")
+
+    core = int(frequency_spectrum[n_strains]) if n_strains > 1 else 0
+    totals = {
+        'n_strains': n_strains,
+        'pangenome_kmers': int(frequency_spectrum.sum()),
+        'core_kmers': core,
+        'accessory_kmers': int(frequency_spectrum[2:n_strains].sum()),
+        'specific_kmers': int(frequency_spectrum[1]) if n_strains > 1 else 0,
+        'frequency_spectrum': frequency_spectrum[1:].tolist(),
+    }
+
+    summary = pd.DataFrame({
+        'Souche': strain_names,
+        'Kmers_total': [len(kmer_sets[strain]) for strain in strain_names],
+        'Kmers_core': core,
+        'Kmers_accessoires': accessory_per_strain,
+        'Kmers_specifiques': specific_per_strain if n_strains > 1 else 0,
+    })
+    summary['Fraction_core'] = (summary['Kmers_core'] / summary['Kmers_total']).round(4)
+    summary['Fraction_specifique'] = (summary['Kmers_specifiques'] / summary['Kmers_total']).round(4)
+
+    # Courbes de raréfaction : taille du pangénome et du core selon le nombre de génomes
+    pangenome_curves = np.cumsum(first_rank_hists, axis=1)
+    core_curves = np.cumsum(first_missing_hists[:, ::-1], axis=1)[:, ::-1][:, 1:]
+    rarefaction = pd.DataFrame({
+        'N_genomes': np.arange(1, n_strains + 1),
+        'Pangenome_moyen': pangenome_curves.mean(axis=0),
+        'Pangenome_ecart_type': pangenome_curves.std(axis=0),
+        'Core_moyen': core_curves.mean(axis=0),
+        'Core_ecart_type': core_curves.std(axis=0),
+    })
+
+    return {'summary': summary, 'rarefaction': rarefaction, 'totals': totals}
+
+
+def run_pangenome(genome_paths, output_dir, k=21, n_permutations=10, seed=42,
+                  max_bucket_kmers=5_000_000, min_contig_length=0, max_memory_mb=256, genomes=None):
+    """Pangénome complet : ensembles de k-mers, classification et raréfaction
+
+    Seules les données de travail volumineuses (ensembles de k-mers, colonnes
+    des k-mers non core, écrites au fil des partitions) sont écrites ici ; les
+    tableaux sont écrits par write_pangenome_outputs.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    set_paths = build_strain_kmer_sets(genome_paths, k, output_dir, min_contig_length, max_memory_mb, genomes)
+    kmer_sets = load_strain_kmer_sets(set_paths)
+
+    print_status('info', "Classification core / accessoire / spécifique...")
+    results = analyze_pangenome(kmer_sets, n_permutations=n_permutations, seed=seed,
+                                max_bucket_kmers=max_bucket_kmers,
+                                columns_dir=os.path.join(output_dir, 'non_core_kmers'))
+    results['totals'].update({'k': k, 'analysis_date': datetime.now().isoformat()})
+    return results
+
+
+def write_pangenome_outputs(results, output_dir):
+    """Écrire le résumé, les courbes de raréfaction et les totaux du pangénome"""
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, 'pangenome_summary.csv')
+    with atomic_path(summary_path) as temporary:
+        results['summary'].to_csv(temporary, index=False)
+    rarefaction_path = os.path.join(output_dir, 'pangenome_rarefaction.csv')
+    with atomic_path(rarefaction_path) as temporary:
+        results['rarefaction'].to_csv(temporary, index=False)
+    totals_path = os.path.join(output_dir, 'pangenome_totals.json')
+    with atomic_path(totals_path) as temporary, open(temporary, 'w') as f:
+        json.dump(results['totals'], f, indent=2)
+
+    print_status('success', f"Résumé du pangénome: {summary_path}")
+    print_status('success', f"Courbes de raréfaction: {rarefaction_path}")
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Pangénome k-mers (core / accessoire / spécifique)")
+    parser.add_argument('--k', type=int, default=PANGENOME_PARAMS['k'], help="Taille des k-mers")
+    parser.add_argument('--permutations', type=int, default=PANGENOME_PARAMS['n_permutations'],
+                        help="Nombre de permutations pour la raréfaction")
+    parser.add_argument('--max-memory', type=int, default=PANGENOME_PARAMS.get('max_memory_mb', 256),
+                        help="Budget mémoire du comptage des k-mers (Mo)")
+    parser.add_argument('--output', default=os.path.join(PATHS['results'], 'pangenome'),
+                        help="Dossier de sortie")
+    args = parser.parse_args()
+
+    print("🧩 === PANGÉNOME K-MERS ===")
+    print(f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    print()
+
+    genome_paths = {}
+    for strain_name, strain_info in STRAINS.items():
+        genome_path = os.path.join(PATHS['genomes'], strain_info['filename'])
+        if os.path.exists(genome_path):
+            genome_paths[strain_name] = genome_path
+        else:
+            print_status('warning', f"Fichier non trouvé: {genome_path}")
+
+    if len(genome_paths) < 2:
+        print_status('error', "Au moins 2 génomes sont nécessaires pour le pangénome!")
+        sys.exit(1)
+
+    results = run_pangenome(genome_paths, args.output, k=args.k,
+                            n_permutations=args.permutations,
+                            seed=PANGENOME_PARAMS['seed'],
+                            max_bucket_kmers=PANGENOME_PARAMS['max_bucket_kmers'],
+                            min_contig_length=ANALYSIS_PARAMS['min_contig_length'],
+                            max_memory_mb=args.max_memory)
+    write_pangenome_outputs(results, args.output)
+
+    totals = results['totals']
+    print()
+    print("📊 === RÉSUMÉ DU PANGÉNOME ===")
+    print(f"  Pangénome: {totals['pangenome_kmers']:,} k-mers")
+    print(f"  Core: {totals['core_kmers']:,} | Accessoire: {totals['accessory_kmers']:,} | "
+          f"Spécifique: {totals['specific_kmers']:,}")
+    print()
+    print(results['summary'].to_string(index=False))
+    print()
+    print_status('success', "🎉 Analyse du pangénome terminée!")
+
+
+if __name__ == "__main__":
+    main()
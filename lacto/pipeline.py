@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Pipeline complet dans un seul processus (étapes 2, 3, pangénome, îlots et 4)
+
+Équivalent de run_pipeline.sh après le téléchargement, sans relancer un
+interpréteur par étape : les génomes sont lus une seule fois et partagés par
+l'analyse, la comparaison et le pangénome, et les résultats passent d'une
+étape à l'autre en mémoire (pas d'aller-retour CSV/JSON). Tous les calculs
+sont faits d'abord ; les tableaux, JSON, graphiques et rapports sont écrits
+à la fin. Seules exceptions : les données de travail du pangénome (ensembles
+de k-mers .npy et colonnes des k-mers non core, écrites au fil du calcul
+pour borner la mémoire). Les îlots spécifiques réutilisent ces ensembles de
+k-mers quand les deux utilisent le même k.
+
+Usage: python3 -m lacto.pipeline [--resume] [--skip-pangenome] [--skip-islands] [--dotplots] [--metrics kmer,gc] [--weights kmer=0.6,gc=0.4]
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.analysis import run_analysis, write_analysis_outputs
+from lacto.comparison import (panel_genome_paths, create_comparison_matrix,
+                              write_comparison_outputs, open_comparison_journal)
+from lacto.kernels import backend_report
+from lacto.metrics import METRICS, COMPARISON_PARAMS, metric_selection, parse_metric_list, parse_weights
+from lacto.pangenome import run_pangenome, write_pangenome_outputs
+from lacto.islands import run_islands, write_islands_outputs, pangenome_kmer_sets
+from lacto.report import results_from_memory, write_report
+
+try:
+    from config import PATHS, ANALYSIS_PARAMS, PANGENOME_PARAMS, ISLAND_PARAMS
+except ImportError:
+    PATHS = {"results": "data/results"}
+    ANALYSIS_PARAMS = {"min_contig_length": 500}
+    PANGENOME_PARAMS = {"k": 21, "n_permutations": 10, "seed": 42, "max_bucket_kmers": 5_000_000,
+                        "max_memory_mb": 256}
+    ISLAND_PARAMS = {"k": 21, "window_size": 5000, "min_specific_fraction": 0.5, "max_gap_windows": 1,
+                     "min_island_length": 10000}
+
+
+def run_pipeline(resume=False, pangenome=True, journal_path='data/results/comparison_journal.jsonl', selection=None,
+                 islands=True, dotplots=None):
+    """Exécuter les étapes 2 à 4 en mémoire ; retourne le dictionnaire de résultats du rapport"""
+    selection = selection or metric_selection()
+    for directory in ('data/analysis', 'data/results/plots'):
+        os.makedirs(directory, exist_ok=True)
+
+    print_status('info', backend_report())
+    print()
+
+    # Étape 2 : analyse des séquences ; génomes lus une seule fois (d'avance, pendant l'analyse
+    # du précédent) et gardés pour toutes les étapes
+    print("🧬 === ANALYSE DES SÉQUENCES GÉNOMIQUES ===")
+    genomes = {}
+    analyses = run_analysis(loaded=genomes)
+    if not analyses:
+        print_status('error', "Aucune analyse réussie !")
+        sys.exit(1)
+    if len(genomes) < 2:
+        print_status('error', "Au moins 2 génomes sont nécessaires pour la comparaison!")
+        sys.exit(1)
+
+    # Étape 3 : comparaison génomique
+    print("🔬 === COMPARAISON GÉNOMIQUE ===")
+    with open_comparison_journal(journal_path, genomes, resume, selection['metrics']) as journal:
+        comparison_data = create_comparison_matrix(genomes, journal, selection, dotplots)
+    print()
+
+    # Pangénome k-mers
+    pangenome_results = None
+    pangenome_dir = os.path.join(PATHS['results'], 'pangenome')
+    genome_paths = {strain: path for strain, path in panel_genome_paths().items() if strain in genomes}
+    if pangenome:
+        print("🧩 === PANGÉNOME K-MERS ===")
+        pangenome_results = run_pangenome(genome_paths, pangenome_dir,
+                                          k=PANGENOME_PARAMS['k'],
+                                          n_permutations=PANGENOME_PARAMS['n_permutations'],
+                                          seed=PANGENOME_PARAMS['seed'],
+                                          max_bucket_kmers=PANGENOME_PARAMS['max_bucket_kmers'],
+                                          min_contig_length=ANALYSIS_PARAMS['min_contig_length'],
+                                          max_memory_mb=PANGENOME_PARAMS.get('max_memory_mb', 256),
+                                          genomes=genomes)
+        print()
+
+    # Îlots génomiques spécifiques
+    island_data = None
+    islands_dir = os.path.join(PATHS['results'], 'islands')
+    if islands:
+        print("🏝️ === ÎLOTS GÉNOMIQUES SPÉCIFIQUES ===")
+        island_data = run_islands(genome_paths, islands_dir,
+                                    k=ISLAND_PARAMS['k'],
+                                    window_size=ISLAND_PARAMS['window_size'],
+                                    min_fraction=ISLAND_PARAMS['min_specific_fraction'],
+                                    max_gap_windows=ISLAND_PARAMS['max_gap_windows'],
+                                    min_island_length=ISLAND_PARAMS['min_island_length'],
+                                    min_contig_length=ANALYSIS_PARAMS['min_contig_length'],
+                                    max_memory_mb=PANGENOME_PARAMS.get('max_memory_mb', 256),
+                                    max_bucket_kmers=PANGENOME_PARAMS['max_bucket_kmers'],
+                                    genomes=genomes,
+                                    kmer_sets=pangenome_kmer_sets(genome_paths, ISLAND_PARAMS['k'], pangenome_dir))
+        print()
+
+    # Écriture des résultats
+    genome_lengths = {strain: genome['total_length'] for strain, genome in genomes.items()}
+    del genomes
+    genome_stats = write_analysis_outputs(analyses)
+    comparison_outputs = write_comparison_outputs(comparison_data, genome_lengths)
+    if pangenome_results is not None:
+        write_pangenome_outputs(pangenome_results, pangenome_dir)
+    if island_data is not None:
+        write_islands_outputs(island_data, islands_dir)
+
+    # Étape 4 : visualisations et rapport final
+    print()
+    print("🎨 === VISUALISATION ET RAPPORT FINAL ===")
+    results = results_from_memory(analyses, genome_stats, comparison_outputs, pangenome_results)
+    write_report(results)
+    return results
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Pipeline complet (étapes 2 à 4) dans un seul processus")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprendre la comparaison depuis le journal (voir 03_genome_comparison.py)")
+    parser.add_argument('--journal', default='data/results/comparison_journal.jsonl',
+                        help="Journal de reprise de la comparaison")
+    parser.add_argument('--skip-pangenome', action='store_true', help="Ne pas calculer le pangénome k-mers")
+    parser.add_argument('--skip-islands', action='store_true', help="Ne pas rechercher les îlots spécifiques")
+    parser.add_argument('--dotplots', action='store_true', default=COMPARISON_PARAMS.get('dotplots', False),
+                        help="Matrice de points PNG de chaque paire (~1,3 s par paire)")
+    parser.add_argument('--metrics', type=parse_metric_list, metavar='LISTE',
+                        help=f"Métriques de comparaison à calculer ({', '.join(METRICS)})")
+    parser.add_argument('--weights', metavar='POIDS', help="Poids de la similarité composite, ex. kmer=0.7,gc=0.3")
+    args = parser.parse_args()
+    try:
+        selection = metric_selection(args.metrics, parse_weights(args.weights) if args.weights else None)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start_time = datetime.now()
+    print("🧬 === PIPELINE DE GÉNOMIQUE COMPARATIVE (un seul processus) ===")
+    print(f"Date: {start_time.strftime('%d/%m/%Y %H:%M')}")
+    print()
+
+    run_pipeline(resume=args.resume, pangenome=not args.skip_pangenome, journal_path=args.journal,
+                 selection=selection, islands=not args.skip_islands, dotplots=args.dotplots)
+
+    elapsed = (datetime.now() - start_time).total_seconds()
+    print_status('success', f"Pipeline terminé en {elapsed:.0f} s")
+
+
+if __name__ == "__main__":
+    main()
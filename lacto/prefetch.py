@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Chargement anticipé des génomes sur un fil d'exécution d'arrière-plan
+
+Sans anticipation, chaque génome est lu puis traité : le processeur attend
+le disque pendant la lecture (système de fichiers réseau, FASTA compressés)
+et le disque attend pendant le calcul. prefetch lit et décode les génomes
+suivants pendant le traitement du génome courant :
+
+  - au plus depth génomes chargés d'avance (depth = 1 : double tampon) ;
+  - au plus max_memory_mb Mo de génomes chargés d'avance, en plus du génome
+    en cours de traitement (au moins un génome est toujours anticipé) ;
+  - résultats rendus dans l'ordre des entrées, erreurs de chargement
+    comprises (rendues à la place du génome, sans arrêter les suivants).
+
+Le décodage (lacto.contigs, NumPy) et les lectures libèrent le GIL : le
+chargement avance réellement pendant le calcul du fil principal.
+"""
+
+import sys
+import time
+import threading
+from collections import deque
+
+import numpy as np
+
+sys.path.append('.')
+
+try:
+    from config import PREFETCH_PARAMS
+except ImportError:
+    PREFETCH_PARAMS = {"depth": 2, "max_memory_mb": 1024}
+
+MB = 1024 * 1024
+
+
+def loaded_size(value):
+    """Octets des tableaux NumPy d'un résultat de chargement (jeu de contigs, dictionnaires imbriqués)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(loaded_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(loaded_size(item) for item in value)
+    return 0
+
+
+def _load(load, item):
+    try:
+        return load(item), None
+    except Exception as e:
+        return None, e
+
+
+def prefetch(items, load, depth=None, max_memory_mb=None, size_of=loaded_size, stats=None):
+    """Triplets (élément, résultat, erreur) de load(élément), chargés d'avance dans l'ordre des éléments
+
+    erreur est l'exception levée par load (résultat None), sinon None. depth = 0
+    charge à la demande, sans fil d'arrière-plan. Si stats est un dictionnaire,
+    il reçoit le temps de chargement total ('load_seconds') et le temps passé
+    par l'appelant à attendre un génome ('wait_seconds', lecture non masquée).
+    """
+    depth = PREFETCH_PARAMS['depth'] if depth is None else depth
+    max_memory_mb = PREFETCH_PARAMS['max_memory_mb'] if max_memory_mb is None else max_memory_mb
+    stats = {} if stats is None else stats
+    stats.update(load_seconds=0.0, wait_seconds=0.0)
+
+    if depth <= 0:
+        for item in items:
+            start = time.perf_counter()
+            value, error = _load(load, item)
+            elapsed = time.perf_counter() - start
+            stats['load_seconds'] += elapsed
+            stats['wait_seconds'] += elapsed
+            yield item, value, error
+        return
+
+    budget = max_memory_mb * MB
+    ready = deque()
+    state = {'bytes': 0, 'done': False, 'stop': False}
+    condition = threading.Condition()
+
+    def producer():
+        try:
+            for item in items:
+                with condition:
+                    while not state['stop'] and ready and (len(ready) >= depth or state['bytes'] >= budget):
+                        condition.wait()
+                    if state['stop']:
+                        return
+                start = time.perf_counter()
+                value, error = _load(load, item)
+                stats['load_seconds'] += time.perf_counter() - start
+                size = size_of(value) if error is None else 0
+                with condition:
+                    ready.append((item, value, error, size))
+                    state['bytes'] += size
+                    condition.notify_all()
+        finally:
+            with condition:
+                state['done'] = True
+                condition.notify_all()
+
+    thread = threading.Thread(target=producer, name='lacto-prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            start = time.perf_counter()
+            with condition:
+                while not ready and not state['done']:
+                    condition.wait()
+                if not ready:
+                    break
+                item, value, error, size = ready.popleft()
+                state['bytes'] -= size
+                condition.notify_all()
+            stats['wait_seconds'] += time.perf_counter() - start
+            yield item, value, error
+    finally:
+        # Arrêt anticipé de l'appelant : le chargement en cours se termine, aucun autre n'est lancé
+        with condition:
+            state['stop'] = True
+            ready.clear()
+            condition.notify_all()
+        thread.join()
+
+
+def describe_prefetch(stats):
+    """Résumé d'une ligne du temps de lecture masqué par le calcul"""
+    hidden = max(stats['load_seconds'] - stats['wait_seconds'], 0.0)
+    share = hidden / stats['load_seconds'] * 100 if stats['load_seconds'] else 100.0
+    return (f"Lecture des génomes: {stats['load_seconds']:.1f} s, dont {hidden:.1f} s masquées "
+            f"par le calcul ({share:.0f} %)")
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Contrôle qualité des assemblages à partir des seules longueurs de contigs
+
+Mode « métadonnées » : aucune séquence n'est décodée. Les longueurs viennent
+d'un index .fai existant (ou d'un .fai passé directement), sinon d'un
+balayage des octets du FASTA (positions des '>' et des retours à la ligne,
+éventuellement après décompression gzip).
+
+Les statistiques de tous les assemblages sont calculées ensemble : longueurs
+concaténées, triées par assemblage puis par longueur décroissante, une seule
+somme cumulée, puis un searchsorted par statistique sur cette somme (elle
+est croissante d'un assemblage à l'autre, la cible de chacun tombe donc dans
+ses propres contigs) :
+
+  N50 / L50   : longueur / rang du contig qui fait passer la moitié de la taille totale
+  NG50 / LG50 : idem avec la moitié de la taille attendue du génome (0 si jamais atteinte)
+  auN         : somme des L² / somme des L (aire sous la courbe Nx)
+
+Chaque assemblage passe ou échoue selon les seuils de QC_PARAMS.
+
+Usage: python3 -m lacto.qc data/genomes --output data/results/assembly_qc.csv
+       python3 -m lacto.qc nouveaux/*.fna.fai --genome-size 1900000 --max-contigs 200
+"""
+
+import os
+import sys
+import gzip
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.faidx import fai_path_for
+
+try:
+    from config import QC_PARAMS
+except ImportError:
+    QC_PARAMS = {"min_contig_length": 500, "expected_genome_size": None, "min_n50": 20_000,
+                 "max_contigs": 500, "max_size_deviation": 0.2,
+                 "histogram_bins": [1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000]}
+
+FASTA_EXTENSIONS = ('.fna', '.fa', '.fasta', '.fna.gz', '.fa.gz', '.fasta.gz', '.fai')
+
+
+def strip_extension(filename):
+    """Nom d'un assemblage (fichier sans .fai, .gz ni extension FASTA)"""
+    for suffix in ('.fai', '.gz'):
+        if filename.endswith(suffix):
+            filename = filename[:-len(suffix)]
+    return os.path.splitext(filename)[0]
+
+
+def assembly_paths(paths):
+    """Fichiers FASTA ou .fai des chemins donnés (dossiers parcourus, .fai doublant un FASTA ignoré)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            entries = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(FASTA_EXTENSIONS))
+            present = set(entries)
+            files.extend(entry for entry in entries if not (entry.endswith('.fai') and entry[:-4] in present))
+        else:
+            files.append(path)
+    return files
+
+
+def fai_lengths(fai_path):
+    """Longueurs des contigs (2e colonne) d'un fichier .fai"""
+    with open(fai_path, 'rb') as f:
+        lines = f.read().split(b'\n')
+    return np.array([int(line.split(b'\t', 2)[1]) for line in lines if line.strip()], dtype=np.int64)
+
+
+def scan_lengths(fasta_path):
+    """Longueurs des contigs d'un FASTA par balayage des octets (sans décoder les séquences)"""
+    if fasta_path.endswith('.gz'):
+        with gzip.open(fasta_path, 'rb') as f:
+            data = np.frombuffer(f.read(), dtype=np.uint8)
+    elif os.path.getsize(fasta_path) == 0:
+        return np.zeros(0, dtype=np.int64)
+    else:
+        data = np.memmap(fasta_path, dtype=np.uint8, mode='r')
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    newlines = np.flatnonzero(data == 10)
+    markers = np.flatnonzero(data == ord('>'))
+    # En-têtes : '>' en début de ligne
+    headers = markers[(markers == 0) | (data[np.maximum(markers - 1, 0)] == 10)]
+    if len(headers) == 0 or np.any(data[:headers[0]] > 32):
+        raise ValueError(f"Format FASTA invalide: {fasta_path}")
+    if len(newlines) == 0:
+        return np.zeros(len(headers), dtype=np.int64)
+
+    # Séquence d'un contig : de la fin de sa ligne d'en-tête au début de l'en-tête suivant
+    header_line = np.searchsorted(newlines, headers)
+    starts = np.where(header_line < len(newlines), newlines[np.minimum(header_line, len(newlines) - 1)] + 1, len(data))
+    ends = np.append(headers[1:], len(data))
+    lengths = (ends - starts) - (np.searchsorted(newlines, ends) - np.searchsorted(newlines, starts))
+    if np.any(data[np.maximum(newlines - 1, 0)] == 13):
+        carriages = np.flatnonzero(data == 13)
+        lengths -= np.searchsorted(carriages, ends) - np.searchsorted(carriages, starts)
+    return lengths.astype(np.int64)
+
+
+def contig_lengths(path):
+    """Longueurs des contigs d'un assemblage et leur source ('fai' ou 'balayage')
+
+    Un .fai plus récent que le FASTA est lu en priorité ; rien n'est écrit.
+    """
+    if path.endswith('.fai'):
+        return fai_lengths(path), 'fai'
+    fai_path = fai_path_for(path)
+    if os.path.exists(fai_path) and os.path.getmtime(fai_path) >= os.path.getmtime(path):
+        return fai_lengths(fai_path), 'fai'
+    return scan_lengths(path), 'balayage'
+
+
+def histogram_labels(edges):
+    """Libellés des classes de longueur (ex. '1-5kb', '>=1Mb')"""
+    def short(value):
+        if value >= 1_000_000 and value % 1_000_000 == 0:
+            return f"{value // 1_000_000}Mb"
+        if value >= 1_000 and value % 1_000 == 0:
+            return f"{value // 1_000}kb"
+        return f"{value}bp"
+    labels = [f"<{short(edges[0])}"]
+    labels += [f"{short(low)}-{short(high)}" for low, high in zip(edges[:-1], edges[1:])]
+    return labels + [f">={short(edges[-1])}"]
+
+
+def assembly_stats(lengths_list, genome_size=None, min_contig_length=0, histogram_bins=None):
+    """Statistiques de longueur de plusieurs assemblages, calculées ensemble
+
+    lengths_list : un tableau de longueurs de contigs par assemblage ;
+    genome_size : taille attendue (scalaire ou une valeur par assemblage),
+    médiane des tailles totales si None. Retourne un dictionnaire de tableaux
+    (une valeur par assemblage) et l'histogramme des longueurs.
+    """
+    histogram_bins = QC_PARAMS['histogram_bins'] if histogram_bins is None else histogram_bins
+    n_assemblies = len(lengths_list)
+    sizes = np.fromiter((len(lengths) for lengths in lengths_list), dtype=np.int64, count=n_assemblies)
+    lengths = (np.concatenate(lengths_list).astype(np.int64) if n_assemblies else np.zeros(0, dtype=np.int64))
+    group = np.repeat(np.arange(n_assemblies), sizes)
+    keep = lengths >= max(min_contig_length, 1)
+    lengths, group = lengths[keep], group[keep]
+    counts = np.bincount(group, minlength=n_assemblies)
+
+    # Tri par assemblage puis longueur décroissante, une seule somme cumulée
+    order = np.lexsort((-lengths, group))
+    lengths, group = lengths[order], group[order]
+    cumulative = np.concatenate(([0], np.cumsum(lengths)))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])) if n_assemblies else counts
+    base = cumulative[starts]
+    totals = cumulative[starts + counts] - base
+    present = counts > 0
+    last = max(len(lengths) - 1, 0)
+
+    if genome_size is None:
+        genome_size = float(np.median(totals[present])) if present.any() else 0.0
+    genome_size = np.broadcast_to(np.asarray(genome_size, dtype=np.float64), (n_assemblies,))
+
+    def nx(target, reached):
+        """Longueur et rang du premier contig où la somme cumulée atteint target (comparaison en 2x entiers)"""
+        index = np.minimum(np.searchsorted(2 * cumulative[1:], 2 * base + target, side='left'), last)
+        valid = present & reached
+        value = np.where(valid, lengths[index] if len(lengths) else 0, 0)
+        rank = np.where(valid, index - starts + 1, 0)
+        return value.astype(np.int64), rank.astype(np.int64)
+
+    n50, l50 = nx(totals, np.ones(n_assemblies, dtype=bool))
+    ng50, lg50 = nx(genome_size, (genome_size > 0) & (2 * totals >= genome_size))
+    squares = np.bincount(group, weights=lengths.astype(np.float64) ** 2, minlength=n_assemblies)
+    aun = np.divide(squares, totals, out=np.zeros(n_assemblies), where=totals > 0)
+
+    edges = np.asarray(histogram_bins, dtype=np.int64)
+    n_bins = len(edges) + 1
+    bins = np.searchsorted(edges, lengths, side='right')
+    histogram = np.bincount(group * n_bins + bins,
+                            minlength=n_assemblies * n_bins).reshape(n_assemblies, n_bins)
+
+    return {
+        'num_contigs': counts.astype(np.int64),
+        'excluded_contigs': sizes - counts,
+        'total_length': totals.astype(np.int64),
+        'longest_contig': np.where(present, lengths[np.minimum(starts, last)] if len(lengths) else 0, 0),
+        'shortest_contig': np.where(present, lengths[np.maximum(starts + counts - 1, 0)] if len(lengths) else 0, 0),
+        'n50': n50,
+        'l50': l50,
+        'ng50': ng50,
+        'lg50': lg50,
+        'aun': aun,
+        'genome_size': genome_size,
+        'histogram': histogram,
+        'histogram_labels': histogram_labels(edges),
+    }
+
+
+def qc_verdicts(stats, min_n50=None, max_contigs=None, max_size_deviation=None):
+    """Statut PASS/FAIL et motifs d'échec de chaque assemblage (seuil None : non vérifié)"""
+    n_assemblies = len(stats['total_length'])
+    checks = [(stats['num_contigs'] == 0, "aucun contig")]
+    if max_contigs is not None:
+        checks.append((stats['num_contigs'] > max_contigs, f"contigs>{max_contigs}"))
+    if min_n50 is not None:
+        checks.append((stats['n50'] < min_n50, f"N50<{min_n50}"))
+    if max_size_deviation is not None:
+        deviation = np.divide(np.abs(stats['total_length'] - stats['genome_size']), stats['genome_size'],
+                              out=np.zeros(n_assemblies), where=stats['genome_size'] > 0)
+        checks.append((deviation > max_size_deviation, f"taille hors ±{max_size_deviation:.0%}"))
+
+    failed = np.zeros((len(checks), n_assemblies), dtype=bool)
+    for row, (flags, _) in enumerate(checks):
+        failed[row] = flags
+    reasons = [';'.join(checks[row][1] for row in np.flatnonzero(column)) for column in failed.T]
+    return np.where(failed.any(axis=0), 'FAIL', 'PASS'), reasons
+
+
+def run_qc(paths, genome_size=None, min_contig_length=None, thresholds=None):
+    """Tableau QC et histogramme des longueurs (DataFrames) des assemblages donnés"""
+    min_contig_length = QC_PARAMS['min_contig_length'] if min_contig_length is None else min_contig_length
+    genome_size = QC_PARAMS['expected_genome_size'] if genome_size is None else genome_size
+    thresholds = {key: QC_PARAMS[key] for key in ('min_n50', 'max_contigs', 'max_size_deviation')} \
+        if thresholds is None else thresholds
+
+    names, sources, lengths_list, unreadable = [], [], [], []
+    for path in assembly_paths(paths):
+        try:
+            lengths, source = contig_lengths(path)
+        except (OSError, ValueError, EOFError) as e:
+            print_status('warning', f"{path}: {e}")
+            lengths, source = np.zeros(0, dtype=np.int64), 'illisible'
+            unreadable.append(len(names))
+        names.append(strip_extension(os.path.basename(path)))
+        sources.append(source)
+        lengths_list.append(lengths)
+
+    stats = assembly_stats(lengths_list, genome_size, min_contig_length)
+    status, reasons = qc_verdicts(stats, **thresholds)
+    for row in unreadable:
+        reasons[row] = "illisible"
+
+    table = pd.DataFrame({
+        'Assemblage': names,
+        'Source': sources,
+        'Contigs': stats['num_contigs'],
+        'Contigs_exclus': stats['excluded_contigs'],
+        'Taille_totale_bp': stats['total_length'],
+        'Plus_long_bp': stats['longest_contig'],
+        'Plus_court_bp': stats['shortest_contig'],
+        'N50_bp': stats['n50'],
+        'L50': stats['l50'],
+        'NG50_bp': stats['ng50'],
+        'LG50': stats['lg50'],
+        'auN_bp': stats['aun'].round(1),
+        'Taille_attendue_bp': stats['genome_size'].astype(np.int64),
+        'Statut': status,
+        'Echecs': reasons,
+    })
+    histogram = pd.DataFrame(stats['histogram'], columns=[f"Contigs_{label}" for label in stats['histogram_labels']])
+    histogram.insert(0, 'Assemblage', names)
+    return table, histogram
+
+
+def histogram_path_for(output_path):
+    root, extension = os.path.splitext(output_path)
+    return f"{root}_histogram{extension or '.csv'}"
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Contrôle qualité des assemblages (longueurs de contigs seulement)")
+    parser.add_argument('paths', nargs='+', help="Fichiers FASTA (.gz acceptés), index .fai ou dossiers")
+    parser.add_argument('--output', default='data/results/assembly_qc.csv', help="Tableau QC (CSV)")
+    parser.add_argument('--genome-size', type=int, default=QC_PARAMS['expected_genome_size'],
+                        help="Taille attendue du génome pour NG50/LG50 (défaut: médiane des assemblages)")
+    parser.add_argument('--min-contig-length', type=int, default=QC_PARAMS['min_contig_length'],
+                        help="Contigs plus courts ignorés (bp)")
+    parser.add_argument('--min-n50', type=int, default=QC_PARAMS['min_n50'], help="N50 minimal (bp)")
+    parser.add_argument('--max-contigs', type=int, default=QC_PARAMS['max_contigs'], help="Nombre maximal de contigs")
+    parser.add_argument('--max-size-deviation', type=float, default=QC_PARAMS['max_size_deviation'],
+                        help="Écart relatif maximal à la taille attendue")
+    parser.add_argument('--strict', action='store_true', help="Code de sortie 1 si un assemblage échoue")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table, histogram = run_qc(args.paths, args.genome_size, args.min_contig_length,
+                              {'min_n50': args.min_n50, 'max_contigs': args.max_contigs,
+                               'max_size_deviation': args.max_size_deviation})
+    elapsed = time.perf_counter() - start
+    if table.empty:
+        print_status('error', "Aucun assemblage trouvé")
+        sys.exit(1)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    table.to_csv(args.output, index=False)
+    histogram.to_csv(histogram_path_for(args.output), index=False)
+
+    failed = table[table['Statut'] == 'FAIL']
+    print_status('info', f"{len(table):,} assemblages, {int(table['Contigs'].sum()):,} contigs en {elapsed:.2f} s "
+                 f"(taille attendue: {int(table['Taille_attendue_bp'].iloc[0]):,} bp)")
+    for _, row in failed.head(10).iterrows():
+        print_status('warning', f"{row['Assemblage']}: {row['Echecs']}")
+    if len(failed) > 10:
+        print_status('warning', f"... et {len(failed) - 10} autres échecs")
+    level = 'success' if failed.empty else 'warning'
+    print_status(level, f"{len(table) - len(failed):,} PASS, {len(failed):,} FAIL : {args.output}")
+    if args.strict and not failed.empty:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
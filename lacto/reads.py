@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Profils de k-mers directement depuis les lectures FASTQ (avant assemblage)
+
+Les fichiers FASTQ (éventuellement gzippés) sont lus une seule fois, par
+grands blocs d'octets ; chaque bloc devient un jeu de contigs dont les
+« contigs » sont les lectures (aucun k-mer à cheval sur deux lectures). Les
+k-mers canoniques (k = 21 par défaut) sont comptés exactement à mémoire
+bornée, par intervalles de valeurs vidés sur disque puis comptés un à
+un (lacto.kmers.count_kmers_stream) ; seuls les k-mers vus au moins
+min_abundance fois (« solides ») sont gardés, ceux qui portent une erreur de
+séquençage étant rares. Le profil de tétranucléotides (k = 4, comme
+calculate_kmer_profile) est ensuite déduit de la table des k-mers solides.
+
+Sorties : profil JSON compatible avec la similarité k-mers de l'étape 3 et
+table des k-mers solides (.kmers.npy / .counts.npy, format lacto.kmers,
+utilisable pour le pangénome avec le même k).
+
+Usage: python3 -m lacto.reads isolat_R1.fastq.gz isolat_R2.fastq.gz --output data/reads/isolat
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import argparse
+
+import numpy as np
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.kmers import MAX_K, count_kmers_stream, decode_kmer, save_kmer_counts
+
+try:
+    from config import READS_PARAMS
+except ImportError:
+    READS_PARAMS = {"k": 21, "min_abundance": 3, "max_memory_mb": 256, "block_mb": 16}
+
+PROFILE_K = 4
+FASTQ_EXTENSIONS = ('.fastq', '.fq', '.fastq.gz', '.fq.gz')
+# Rapport de compression typique d'un FASTQ gzippé (estimation du nombre de k-mers)
+GZIP_RATIO = 4
+
+
+def is_fastq(path):
+    return path.endswith(FASTQ_EXTENSIONS)
+
+
+def read_fastq_blocks(paths, block_bytes):
+    """Blocs de lectures des fichiers FASTQ : (séquences concaténées uint8, longueurs int64)
+
+    Lecture par blocs d'octets ; un enregistrement coupé en fin de bloc est
+    complété avec le bloc suivant. Format à quatre lignes par lecture.
+    """
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rb') as f:
+            leftover = b''
+            while True:
+                chunk = f.read(block_bytes)
+                at_end = not chunk
+                data = leftover + chunk
+                if not data:
+                    break
+                lines = data.split(b'\n')
+                if at_end:
+                    if lines[-1] == b'':
+                        lines.pop()
+                    n_lines = len(lines) // 4 * 4
+                    if n_lines != len(lines):
+                        raise ValueError(f"Dernière lecture incomplète: {path}")
+                else:
+                    n_lines = (len(lines) - 1) // 4 * 4  # Dernière ligne peut-être incomplète
+                leftover = b'\n'.join(lines[n_lines:])
+                if n_lines:
+                    if not (lines[0].startswith(b'@') and lines[2].startswith(b'+')):
+                        raise ValueError(f"Format FASTQ invalide: {path}")
+                    sequences = [line.rstrip(b'\r') for line in lines[1:n_lines:4]]
+                    lengths = np.fromiter(map(len, sequences), dtype=np.int64, count=len(sequences))
+                    yield np.frombuffer(b''.join(sequences).upper(), dtype=np.uint8), lengths
+                if at_end:
+                    break
+
+
+def reads_contig_set(sequence, lengths):
+    """Jeu de contigs dont chaque lecture est un contig"""
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return {
+        'names': [],
+        'lengths': lengths,
+        'offsets': offsets,
+        'sequence': sequence,
+        'total_length': int(offsets[-1]),
+        'excluded_contigs': 0,
+        'excluded_length': 0,
+    }
+
+
+def iter_read_sets(paths, block_bytes, totals=None):
+    """Jeux de contigs des blocs de lectures ; totals compte lectures et bases lues"""
+    for sequence, lengths in read_fastq_blocks(paths, block_bytes):
+        if totals is not None:
+            totals['reads'] += len(lengths)
+            totals['bases'] += int(lengths.sum())
+        yield reads_contig_set(sequence, lengths)
+
+
+def estimated_kmers(paths):
+    """Estimation du nombre de k-mers des fichiers (séquence ~ la moitié d'un enregistrement FASTQ)"""
+    text_bytes = sum(os.path.getsize(path) * (GZIP_RATIO if path.endswith('.gz') else 1) for path in paths)
+    return int(text_bytes / 2)
+
+
+def tetranucleotide_vector(kmers, k):
+    """Fréquences des 4-mers (vecteur 4^4) déduites d'une table de k-mers canoniques
+
+    Chaque k-mer solide représente une position du génome. On compte son
+    4-mer central et le complément inverse de celui-ci : le choix du brin
+    canonique ne dépend que des premières bases du k-mer, le centre n'est donc
+    pas biaisé, et les deux brins sont comptés comme pour des lectures
+    d'orientation aléatoire.
+    """
+    shift = np.uint64(2 * ((k - PROFILE_K) - (k - PROFILE_K) // 2))
+    middle = ((np.asarray(kmers) >> shift) & np.uint64(4 ** PROFILE_K - 1)).astype(np.int64)
+    reverse = np.zeros_like(middle)
+    for position in range(PROFILE_K):
+        reverse = reverse * 4 + (3 - ((middle >> (2 * position)) & 3))
+    counts = (np.bincount(middle, minlength=4 ** PROFILE_K)
+              + np.bincount(reverse, minlength=4 ** PROFILE_K)).astype(np.float64)
+    total = counts.sum()
+    return counts / total if total > 0 else counts
+
+
+def profile_from_vector(vector, k=PROFILE_K):
+    """Profil {k-mer: fréquence} (format de calculate_kmer_profile) d'un vecteur dense"""
+    return {decode_kmer(index, k): float(vector[index]) for index in np.flatnonzero(vector)}
+
+
+def profile_reads(paths, k=None, min_abundance=None, max_memory_mb=None, block_mb=None, spill_dir=None):
+    """Profil de tétranucléotides et k-mers solides d'un jeu de lectures (une lecture des fichiers)"""
+    k = k or READS_PARAMS['k']
+    min_abundance = min_abundance or READS_PARAMS['min_abundance']
+    max_memory_mb = max_memory_mb or READS_PARAMS['max_memory_mb']
+    block_bytes = (block_mb or READS_PARAMS['block_mb']) * 1024 * 1024
+    if not PROFILE_K <= k <= MAX_K:
+        raise ValueError(f"k doit être compris entre {PROFILE_K} et {MAX_K} (reçu: {k})")
+    for path in paths:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Fichier non trouvé: {path}")
+
+    # Comptage exact, k-mers d'abondance >= min_abundance
+    start = time.perf_counter()
+    totals = {'reads': 0, 'bases': 0}
+    solid_kmers, solid_counts = count_kmers_stream(iter_read_sets(paths, block_bytes, totals), k,
+                                                   max_memory_mb, spill_dir,
+                                                   expected_kmers=estimated_kmers(paths),
+                                                   min_count=min_abundance)
+    elapsed = time.perf_counter() - start
+    print_status('info', f"{totals['reads']:,} lectures, {totals['bases']:,} bases, "
+                 f"{len(solid_kmers):,} k-mers solides (k={k}, abondance >= {min_abundance}) en {elapsed:.1f} s")
+
+    vector = tetranucleotide_vector(solid_kmers, k)
+    return {
+        'files': [os.path.basename(path) for path in paths],
+        'reads': totals['reads'],
+        'bases': totals['bases'],
+        'k': k,
+        'min_abundance': min_abundance,
+        'solid_kmers': int(len(solid_kmers)),
+        'estimated_genome_length': int(len(solid_kmers)),
+        'estimated_coverage': float(solid_counts.sum() / len(solid_kmers)) if len(solid_kmers) else 0.0,
+        'reads_per_minute': totals['reads'] / elapsed * 60 if elapsed else 0.0,
+        'kmer_vector': vector,
+        'kmer': profile_from_vector(vector),
+        'solid_table': (solid_kmers, solid_counts),
+    }
+
+
+def save_reads_profile(prefix, profile):
+    """Écrire <prefix>.profile.json et la table des k-mers solides"""
+    os.makedirs(os.path.dirname(prefix) or '.', exist_ok=True)
+    summary = {key: value for key, value in profile.items() if key not in ('kmer_vector', 'solid_table')}
+    with open(f"{prefix}.profile.json", 'w') as f:
+        json.dump(summary, f, indent=2)
+    save_kmer_counts(prefix, *profile['solid_table'])
+    return f"{prefix}.profile.json"
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Profil de k-mers depuis des lectures FASTQ (filtre d'abondance)")
+    parser.add_argument('fastq', nargs='+', help="Fichiers FASTQ (.fastq, .fq, éventuellement .gz)")
+    parser.add_argument('-k', type=int, default=READS_PARAMS['k'], help="Taille des k-mers du filtre d'abondance")
+    parser.add_argument('--min-abundance', type=int, default=READS_PARAMS['min_abundance'],
+                        help="Occurrences minimales d'un k-mer solide")
+    parser.add_argument('--max-memory', type=int, default=READS_PARAMS['max_memory_mb'],
+                        help="Budget de mémoire de travail du comptage (Mo)")
+    parser.add_argument('--block-mb', type=int, default=READS_PARAMS['block_mb'],
+                        help="Taille des blocs lus (Mo de texte FASTQ)")
+    parser.add_argument('--spill-dir', help="Dossier des partitions vidées sur disque")
+    parser.add_argument('--output', required=True, help="Préfixe des fichiers de sortie")
+    args = parser.parse_args()
+
+    try:
+        profile = profile_reads(args.fastq, args.k, args.min_abundance, args.max_memory, args.block_mb,
+                                args.spill_dir)
+    except (FileNotFoundError, ValueError) as e:
+        print_status('error', str(e))
+        sys.exit(1)
+    path = save_reads_profile(args.output, profile)
+    print_status('success', f"Génome estimé: {profile['estimated_genome_length']:,} bp, "
+                 f"couverture ~{profile['estimated_coverage']:.0f}x, "
+                 f"{profile['reads_per_minute'] / 1e6:.2f} M lectures/min")
+    print_status('success', f"Profil: {path} (k-mers solides: {args.output}.kmers.npy)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Répétitions et duplications par tableau des suffixes (SA) et tableau LCP
+
+Le texte indexé contient les contigs du brin direct puis leurs reverse
+complémentaires, séparés par un terminateur ($) ; les bases ambiguës sont
+aussi des terminateurs, si bien qu'aucune répétition ne les traverse.
+
+  - Tableau des suffixes : doublement de préfixe vectorisé. Le rang initial
+    code les 16 premiers symboles ; à chaque étape seuls les groupes de
+    suffixes encore ex aequo sont retriés (en pratique : les répétitions),
+    ce qui rend la construction quasi linéaire sur un génome bactérien.
+  - LCP : comparaison des suffixes voisins par mots de 32 bases (2 bits par
+    base) et comptage des zéros de tête du XOR ; seules les paires égales
+    sur 32 bases continuent à l'itération suivante.
+  - Répétitions maximales : blocs de suffixes voisins partageant au moins
+    min_length bases, conservés s'ils sont maximaux à gauche (bases
+    précédentes différentes) ; longueur = LCP minimal du bloc.
+
+Tous les tableaux de positions sont en int32 (génomes < 1 Gb).
+
+Usage: python3 -m lacto.repeats data/genomes/LB_DSM20081.fna --min-length 100
+"""
+
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.contigs import NUCLEOTIDE_CODES, as_contig_set, load_contig_set
+
+DEFAULT_MIN_REPEAT_LENGTH = 100
+TERMINATOR = 4
+INITIAL_PREFIX = 16
+WORD_BASES = 32
+
+
+def build_text(contigs):
+    """Texte indexé : brin direct puis reverse complémentaire, un terminateur après chaque contig
+
+    Retourne le texte (codes 0-3, 4 = terminateur) et les débuts de chaque
+    contig dans le texte (brin direct puis brin complémentaire).
+    """
+    codes = NUCLEOTIDE_CODES[contigs['sequence']]
+    complement = np.array([3, 2, 1, 0, TERMINATOR], dtype=np.uint8)
+    n_contigs = len(contigs['lengths'])
+
+    pieces, starts, position = [], [], 0
+    for strand in ('+', '-'):
+        for offset, length in zip(contigs['offsets'][:-1], contigs['lengths']):
+            piece = codes[offset:offset + length]
+            if strand == '-':
+                piece = complement[piece[::-1]]
+            pieces.append(piece)
+            pieces.append(np.array([TERMINATOR], dtype=np.uint8))
+            starts.append(position)
+            position += length + 1
+    text = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.uint8)
+    return text, np.array(starts[:n_contigs], dtype=np.int64), np.array(starts[n_contigs:], dtype=np.int64)
+
+
+def _group_starts(keys):
+    """Rang de groupe (indice du premier élément du groupe) pour des clés triées"""
+    change = np.ones(len(keys), dtype=bool)
+    change[1:] = keys[1:] != keys[:-1]
+    return np.maximum.accumulate(np.where(change, np.arange(len(keys)), 0)).astype(np.int32)
+
+
+def suffix_array(text):
+    """Tableau des suffixes (int32) par doublement de préfixe sur les groupes non résolus"""
+    n = len(text)
+    if n == 0:
+        return np.zeros(0, dtype=np.int32)
+
+    # Rang initial : INITIAL_PREFIX symboles en base 6 (0 = au-delà de la fin)
+    padded = np.concatenate((text.astype(np.int64) + 1, np.zeros(INITIAL_PREFIX, dtype=np.int64)))
+    keys = np.zeros(n, dtype=np.int64)
+    for offset in range(INITIAL_PREFIX):
+        keys = keys * 6 + padded[offset:offset + n]
+
+    sa = np.argsort(keys, kind='stable').astype(np.int32)
+    rank = np.empty(n, dtype=np.int32)
+    rank[sa] = _group_starts(keys[sa])
+    del keys, padded
+
+    h = INITIAL_PREFIX
+    while h < n:
+        sorted_rank = rank[sa]
+        unresolved = np.zeros(n, dtype=bool)
+        same = sorted_rank[1:] == sorted_rank[:-1]
+        unresolved[1:] |= same
+        unresolved[:-1] |= same
+        idx = np.flatnonzero(unresolved)
+        if len(idx) == 0:
+            break
+
+        suffixes = sa[idx]
+        groups = sorted_rank[idx]
+        following = np.full(len(idx), -1, dtype=np.int64)
+        inside = suffixes.astype(np.int64) + h < n
+        following[inside] = rank[suffixes[inside] + h]
+
+        order = np.lexsort((following, groups))
+        suffixes = suffixes[order]
+        groups, following = groups[order], following[order]
+
+        # Nouveaux groupes : (groupe, rang à +h) différent du voisin précédent
+        change = np.ones(len(idx), dtype=bool)
+        change[1:] = (groups[1:] != groups[:-1]) | (following[1:] != following[:-1])
+        run_start = np.maximum.accumulate(np.where(change, np.arange(len(idx)), 0))
+
+        sa[idx] = suffixes
+        rank[suffixes] = idx[run_start]
+        h *= 2
+    return sa
+
+
+def _packed_words(text):
+    """Mot de 32 bases (2 bits par base) commençant à chaque position du texte"""
+    n = len(text)
+    bases = np.concatenate((text & 3, np.zeros(2 * WORD_BASES, dtype=np.uint8))).astype(np.uint64)
+    half = WORD_BASES // 2
+    halves = np.zeros(n + WORD_BASES, dtype=np.uint64)
+    for offset in range(half):
+        halves = (halves << np.uint64(2)) | bases[offset:offset + n + WORD_BASES]
+    return (halves[:n + half] << np.uint64(2 * half)) | halves[half:n + WORD_BASES]
+
+
+def _leading_zero_bits(x):
+    """Nombre de bits nuls de tête de chaque entier uint64 non nul"""
+    high = (x >> np.uint64(32)).astype(np.float64)
+    low = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    _, high_exp = np.frexp(high)
+    _, low_exp = np.frexp(low)
+    return np.where(high > 0, 32 - high_exp, 64 - low_exp)
+
+
+def lcp_array(text, sa):
+    """LCP (int32) entre chaque suffixe et son prédécesseur dans le SA, borné aux terminateurs"""
+    n = len(sa)
+    lcp = np.zeros(n, dtype=np.int32)
+    if n < 2:
+        return lcp
+
+    # Distance de chaque position au prochain terminateur
+    terminators = np.flatnonzero(text == TERMINATOR)
+    run = (terminators[np.searchsorted(terminators, np.arange(n))] - np.arange(n)).astype(np.int32)
+
+    words = _packed_words(text)
+    left, right = sa[:-1].astype(np.int64), sa[1:].astype(np.int64)
+    limit = np.minimum(run[left], run[right])
+
+    active = np.flatnonzero(limit > 0)
+    matched = np.zeros(n - 1, dtype=np.int64)
+    while len(active):
+        offset = matched[active]
+        diff = words[left[active] + offset] ^ words[right[active] + offset]
+        equal = diff == 0
+        differing = active[~equal]
+        matched[differing] += _leading_zero_bits(diff[~equal]) // 2
+        matched[active[equal]] += WORD_BASES
+        active = active[equal]
+        active = active[matched[active] < limit[active]]
+
+    lcp[1:] = np.minimum(matched, limit)
+    return lcp
+
+
+def repeat_blocks(text, sa, lcp, min_length):
+    """Blocs de suffixes voisins partageant >= min_length bases, maximaux à gauche
+
+    Retourne (début, fin exclue) des blocs dans le SA et leur longueur (LCP minimal).
+    """
+    long_pairs = lcp >= min_length
+    if not long_pairs.any():
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    # Paires consécutives i (SA[i-1], SA[i]) avec LCP >= min_length
+    edges = np.diff(np.concatenate(([0], long_pairs.astype(np.int8), [0])))
+    pair_starts = np.flatnonzero(edges == 1)
+    pair_ends = np.flatnonzero(edges == -1)
+    bounds = np.column_stack((pair_starts, pair_ends)).ravel()
+    lengths = np.minimum.reduceat(np.append(lcp, 0), bounds)[::2]
+    block_starts = pair_starts - 1
+    block_ends = pair_ends
+
+    # Maximalité à gauche : au moins deux bases précédentes différentes (ou un bord)
+    sizes = block_ends - block_starts
+    first = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    members = np.repeat(block_starts - first, sizes) + np.arange(int(sizes.sum()))
+    positions = sa[members].astype(np.int64)
+    previous = np.where(positions > 0, text[np.maximum(positions - 1, 0)], TERMINATOR)
+    lowest = np.minimum.reduceat(previous, first)
+    highest = np.maximum.reduceat(previous, first)
+    keep = (lowest != highest) | (highest == TERMINATOR)
+    return block_starts[keep], block_ends[keep], lengths[keep]
+
+
+def _to_forward(positions, lengths, contigs, forward_starts, reverse_starts):
+    """Convertir des positions du texte en (contig, début sur le brin direct, brin)"""
+    n_contigs = len(contigs['lengths'])
+    all_starts = np.concatenate((forward_starts, reverse_starts))
+    row = np.searchsorted(all_starts, positions, side='right') - 1
+    within = positions - all_starts[row]
+    reverse = row >= n_contigs
+    contig = np.where(reverse, row - n_contigs, row)
+    start = np.where(reverse, contigs['lengths'][contig] - within - lengths, within)
+    return contig, start, reverse
+
+
+def find_repeats(contigs, min_length=DEFAULT_MIN_REPEAT_LENGTH):
+    """Répétitions maximales (deux brins) et fraction répétée d'un génome
+
+    Retourne un dictionnaire : 'repeats' (DataFrame longueur, copies,
+    positions), 'repeat_fraction', 'repeat_bases', 'families',
+    'longest_repeat' et 'max_copies'.
+    """
+    contigs = as_contig_set(contigs)
+    text, forward_starts, reverse_starts = build_text(contigs)
+    sa = suffix_array(text)
+    lcp = lcp_array(text, sa)
+    block_starts, block_ends, block_lengths = repeat_blocks(text, sa, lcp, min_length)
+
+    # Familles : un même bloc apparaît sur chaque brin, on ne le garde qu'une fois
+    rows, seen = [], set()
+    for start, end, length in zip(block_starts, block_ends, block_lengths):
+        positions = sa[start:end].astype(np.int64)
+        contig, forward, reverse = _to_forward(positions, np.full(len(positions), length),
+                                               contigs, forward_starts, reverse_starts)
+        order = np.lexsort((forward, contig))
+        key = (int(length), tuple(zip(contig[order].tolist(), forward[order].tolist())))
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append({
+            'length': int(length),
+            'copies': len(positions),
+            'inverted': int(min(reverse.sum(), (~reverse).sum())),
+            'positions': ';'.join(f"{contigs['names'][c]}:{s + 1}-{s + length}({'-' if r else '+'})"
+                                  for c, s, r in zip(contig[order], forward[order], reverse[order])),
+        })
+
+    repeats = pd.DataFrame(rows, columns=['length', 'copies', 'inverted', 'positions'])
+    if len(repeats):
+        repeats = repeats.sort_values(['length', 'copies'], ascending=False).reset_index(drop=True)
+
+    # Bases couvertes : chaque suffixe s'étend sur son plus long LCP voisin
+    cover = np.maximum(lcp, np.concatenate((lcp[1:], [0])))
+    covered = np.flatnonzero(cover >= min_length)
+    contig, forward, _ = _to_forward(sa[covered].astype(np.int64), cover[covered].astype(np.int64),
+                                     contigs, forward_starts, reverse_starts)
+    begin = contigs['offsets'][:-1][contig] + forward
+    size = contigs['total_length'] + 1
+    marks = np.bincount(begin, minlength=size) - np.bincount(begin + cover[covered], minlength=size)
+    repeat_bases = int((np.cumsum(marks)[:-1] > 0).sum())
+
+    return {
+        'repeats': repeats,
+        'families': len(repeats),
+        'repeat_bases': repeat_bases,
+        'repeat_fraction': repeat_bases / contigs['total_length'] if contigs['total_length'] else 0.0,
+        'longest_repeat': int(repeats['length'].max()) if len(repeats) else 0,
+        'max_copies': int(repeats['copies'].max()) if len(repeats) else 0,
+    }
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Répétitions maximales par tableau des suffixes")
+    parser.add_argument('fasta', help="Génome au format FASTA")
+    parser.add_argument('--min-length', type=int, default=DEFAULT_MIN_REPEAT_LENGTH,
+                        help="Longueur minimale des répétitions (pb)")
+    parser.add_argument('--output', help="Fichier TSV des répétitions")
+    args = parser.parse_args()
+
+    result = find_repeats(load_contig_set(args.fasta), args.min_length)
+    print_status('success', f"{result['families']} familles de répétitions >= {args.min_length} bp, "
+                            f"{result['repeat_fraction'] * 100:.2f}% du génome")
+    if args.output:
+        result['repeats'].to_csv(args.output, sep='\t', index=False)
+        print_status('success', f"Répétitions: {args.output}")
+    else:
+        print(result['repeats'].head(20).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1224 @@
+#!/usr/bin/env python3
+"""
+Étape 4 du pipeline : visualisations et rapport final
+Pipeline Python de génomique comparative - Lactobacillus bulgaricus
+Auteur: [Votre Nom]
+
+Ce module crée des visualisations avancées et un rapport HTML interactif
+compilant tous les résultats de l'analyse génomique comparative. Les
+résultats sont relus depuis data/ (load_analysis_results) ou fournis
+directement en mémoire par lacto.pipeline (results_from_memory).
+
+Usage: python3 scripts/04_visualize_results.py
+"""
+
+import os
+import sys
+import pandas as pd
+import numpy as np
+import json
+import argparse
+from datetime import datetime
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import plotly.offline as pyo
+
+# Configuration
+sys.path.append('.')
+try:
+    from config import STRAINS, PATHS, ANALYSIS_PARAMS, PROJECT_NAME, ORGANISM
+except ImportError:
+    print("❌ Erreur: fichier config.py non trouvé")
+    sys.exit(1)
+
+from lacto.console import print_status
+from lacto.atomic import atomic_path
+from lacto.tracks import TrackFile
+
+# Largeur (pixels) des graphiques de pistes du rapport HTML
+REPORT_PLOT_WIDTH = 1100
+
+# Palette "husl" de seaborn (6 couleurs), fixée ici pour ne pas importer seaborn
+HUSL_PALETTE = ['#f77189', '#bb9832', '#50b131', '#36ada4', '#3ba3ec', '#e866f4']
+
+# Couleurs des souches (répétées au-delà de trois souches)
+STRAIN_COLORS = ['#FF6B6B', '#4ECDC4', '#45B7D1']
+
+def load_analysis_results():
+    """Charger tous les résultats des analyses précédentes"""
+    results = {}
+    
+    # Charger les statistiques génomiques
+    stats_path = os.path.join(PATHS['analysis'], 'genome_statistics.csv')
+    if os.path.exists(stats_path):
+        results['genome_stats'] = pd.read_csv(stats_path)
+        print_status('success', "Statistiques génomiques chargées")
+    else:
+        print_status('warning', f"Fichier non trouvé: {stats_path}")
+    
+    # Charger les analyses détaillées JSON
+    detailed_path = os.path.join(PATHS['analysis'], 'detailed_analysis.json')
+    if os.path.exists(detailed_path):
+        with open(detailed_path, 'r') as f:
+            results['detailed_analysis'] = json.load(f)
+        print_status('success', "Analyses détaillées chargées")
+    else:
+        print_status('warning', f"Fichier non trouvé: {detailed_path}")
+    
+    # Charger les comparaisons
+    comparison_path = os.path.join(PATHS['results'], 'pairwise_comparisons.csv')
+    if os.path.exists(comparison_path):
+        results['comparisons'] = pd.read_csv(comparison_path)
+        print_status('success', "Comparaisons par paires chargées")
+    else:
+        print_status('warning', f"Fichier non trouvé: {comparison_path}")
+    
+    # Charger la matrice de similarité
+    similarity_path = os.path.join(PATHS['results'], 'similarity_matrix.csv')
+    if os.path.exists(similarity_path):
+        results['similarity_matrix'] = pd.read_csv(similarity_path, index_col=0)
+        print_status('success', "Matrice de similarité chargée")
+    else:
+        print_status('warning', f"Fichier non trouvé: {similarity_path}")
+    
+    return load_optional_results(results)
+
+def results_from_memory(analyses, genome_stats, comparison_outputs, pangenome=None):
+    """Résultats des étapes 2, 3 (et du pangénome) passés en mémoire, sans relire CSV et JSON"""
+    results = {
+        'genome_stats': genome_stats,
+        'detailed_analysis': analyses,
+        'comparisons': comparison_outputs['comparisons'],
+        'similarity_matrix': comparison_outputs['similarity_matrix'],
+    }
+    if pangenome is not None:
+        results['pangenome_summary'] = pangenome['summary']
+        results['pangenome_rarefaction'] = pangenome['rarefaction']
+        results['pangenome_totals'] = pangenome['totals']
+    return load_optional_results(results)
+
+def load_optional_results(results):
+    """Ajouter les résultats optionnels (pistes, pangénome) présents sur le disque"""
+    # Charger les pistes génomiques multi-résolution (optionnel)
+    tracks_dir = os.path.join(PATHS['analysis'], 'tracks')
+    strains = list(results['genome_stats']['Souche']) if 'genome_stats' in results else list(STRAINS)
+    track_files = {}
+    for strain in strains:
+        track_path = os.path.join(tracks_dir, f"{strain}.tracks")
+        if os.path.exists(track_path):
+            track_files[strain] = TrackFile(track_path)
+    if track_files:
+        results['tracks'] = track_files
+        print_status('success', f"Pistes génomiques chargées ({len(track_files)} souches)")
+    
+    # Charger les îlots génomiques spécifiques (optionnel)
+    islands_dir = os.path.join(PATHS['results'], 'islands')
+    islands_path = os.path.join(islands_dir, 'islands.tsv')
+    if os.path.exists(islands_path):
+        results['islands'] = pd.read_csv(islands_path, sep='\t')
+        island_tracks = {}
+        for strain in strains:
+            bedgraph_path = os.path.join(islands_dir, f"{strain}_specific.bedgraph")
+            if os.path.exists(bedgraph_path):
+                island_tracks[strain] = pd.read_csv(bedgraph_path, sep='\t', skiprows=1, header=None,
+                                                    names=['Contig', 'Debut', 'Fin', 'Fraction'])
+        results['island_tracks'] = island_tracks
+        print_status('success', f"Îlots génomiques chargés ({len(results['islands'])} îlots)")
+    
+    # Charger les groupes de souches du graphe des voisins (optionnel)
+    clusters_path = os.path.join(PATHS['results'], 'strain_clusters.csv')
+    if os.path.exists(clusters_path):
+        results['strain_clusters'] = pd.read_csv(clusters_path)
+        print_status('success', f"Groupes de souches chargés ({results['strain_clusters']['Seuil'].nunique()} seuils)")
+    
+    # Charger le pangénome k-mers (optionnel)
+    pangenome_dir = os.path.join(PATHS['results'], 'pangenome')
+    pangenome_summary_path = os.path.join(pangenome_dir, 'pangenome_summary.csv')
+    if 'pangenome_summary' not in results and os.path.exists(pangenome_summary_path):
+        results['pangenome_summary'] = pd.read_csv(pangenome_summary_path)
+        results['pangenome_rarefaction'] = pd.read_csv(os.path.join(pangenome_dir, 'pangenome_rarefaction.csv'))
+        with open(os.path.join(pangenome_dir, 'pangenome_totals.json'), 'r') as f:
+            results['pangenome_totals'] = json.load(f)
+        print_status('success', "Pangénome k-mers chargé")
+    
+    return results
+
+def create_interactive_genome_overview(genome_stats):
+    """Créer un graphique interactif de vue d'ensemble des génomes"""
+    
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('Taille des Génomes', 'Contenu GC', 'Nombre de Contigs', 'Valeur N50'),
+        specs=[[{"secondary_y": False}, {"secondary_y": False}],
+               [{"secondary_y": False}, {"secondary_y": False}]]
+    )
+    
+    strains = genome_stats['Souche'].tolist()
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
+    
+    # Taille des génomes
+    fig.add_trace(
+        go.Bar(x=strains, y=genome_stats['Taille_totale_Mb'], 
+               name='Taille (Mb)', marker_color=colors[0],
+               text=genome_stats['Taille_totale_Mb'], textposition='auto'),
+        row=1, col=1
+    )
+    
+    # Contenu GC
+    fig.add_trace(
+        go.Bar(x=strains, y=genome_stats['GC_percent'], 
+               name='GC %', marker_color=colors[1],
+               text=genome_stats['GC_percent'], textposition='auto'),
+        row=1, col=2
+    )
+    
+    # Nombre de contigs
+    fig.add_trace(
+        go.Bar(x=strains, y=genome_stats['Contigs'], 
+               name='Contigs', marker_color=colors[2],
+               text=genome_stats['Contigs'], textposition='auto'),
+        row=2, col=1
+    )
+    
+    # N50
+    fig.add_trace(
+        go.Bar(x=strains, y=genome_stats['N50_bp']/1000, 
+               name='N50 (kb)', marker_color=colors[3],
+               text=(genome_stats['N50_bp']/1000).round(0), textposition='auto'),
+        row=2, col=2
+    )
+    
+    fig.update_layout(
+        title_text="Vue d'ensemble des Génomes - Lactobacillus bulgaricus",
+        title_x=0.5,
+        showlegend=False,
+        height=600
+    )
+    
+    return fig
+
+def create_interactive_similarity_heatmap(similarity_matrix):
+    """Créer une heatmap interactive de similarité"""
+    
+    fig = go.Figure(data=go.Heatmap(
+        z=similarity_matrix.values,
+        x=similarity_matrix.columns,
+        y=similarity_matrix.index,
+        colorscale='RdYlBu_r',
+        zmin=0, zmax=1,
+        text=similarity_matrix.values.round(3),
+        texttemplate="%{text}",
+        textfont={"size": 12},
+        colorbar=dict(title="Similarité")
+    ))
+    
+    fig.update_layout(
+        title="Matrice de Similarité Génomique",
+        title_x=0.5,
+        xaxis_title="Souches",
+        yaxis_title="Souches",
+        height=500
+    )
+    
+    return fig
+
+def create_genome_tracks_plot(track_files, pixels=REPORT_PLOT_WIDTH):
+    """Créer les profils GC / skew / entropie le long des génomes
+    
+    Le niveau de zoom de chaque piste est choisi selon la largeur en pixels,
+    sans relire les séquences.
+    """
+    panels = [('gc', 'GC (%)'), ('gc_skew', 'GC skew'),
+              ('cumulative_skew', 'GC skew cumulé'), ('entropy', 'Entropie (bits)')]
+    
+    fig = make_subplots(rows=len(panels), cols=1, shared_xaxes=True,
+                        subplot_titles=[title for _, title in panels], vertical_spacing=0.05)
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
+    
+    for strain_index, (strain, track_file) in enumerate(track_files.items()):
+        for row, (track, _) in enumerate(panels, start=1):
+            positions, values, bin_size = track_file.fetch(track, pixels)
+            fig.add_trace(go.Scattergl(
+                x=positions / 1_000_000, y=values, mode='lines',
+                name=f"{strain} ({bin_size:,} pb)", legendgroup=strain, showlegend=(row == 1),
+                line=dict(width=1, color=colors[strain_index % len(colors)])
+            ), row=row, col=1)
+    
+    fig.update_xaxes(title_text="Position (Mb)", row=len(panels), col=1)
+    fig.update_layout(
+        title="Profils le long des Génomes",
+        title_x=0.5,
+        height=900
+    )
+    
+    return fig
+
+def plot_static_genome_tracks(track_files):
+    """Graphique statique des pistes (niveau choisi selon la largeur de l'image)"""
+    import matplotlib.pyplot as plt
+    
+    figsize = (12, 8)
+    dpi = 300
+    pixels = figsize[0] * dpi
+    panels = [('gc', 'GC (%)'), ('gc_skew', 'GC skew'), ('cumulative_skew', 'Skew cumulé'),
+              ('ambiguous_density', 'Bases ambiguës')]
+    
+    fig, axes = plt.subplots(len(panels), 1, figsize=figsize, sharex=True)
+    for strain, track_file in track_files.items():
+        for ax, (track, label) in zip(axes, panels):
+            positions, values, bin_size = track_file.fetch(track, pixels)
+            ax.plot(positions / 1_000_000, values, linewidth=0.5, label=f"{strain} ({bin_size:,} pb)")
+            ax.set_ylabel(label)
+    axes[0].legend(fontsize=8)
+    axes[-1].set_xlabel('Position (Mb)')
+    fig.suptitle('Profils le long des Génomes', fontweight='bold')
+    plt.tight_layout()
+    
+    output_path = os.path.join(PATHS['plots'], 'genome_tracks.png')
+    with atomic_path(output_path) as temporary:
+        plt.savefig(temporary, dpi=dpi, bbox_inches='tight')
+    print_status('success', f"Profils génomiques: {output_path}")
+    plt.close()
+
+def create_islands_track_plot(island_tracks, islands):
+    """Fraction de k-mers spécifiques le long de chaque génome, îlots surlignés
+    
+    Les contigs sont mis bout à bout dans l'ordre du fichier bedGraph.
+    """
+    strains = list(island_tracks)
+    fig = make_subplots(rows=len(strains), cols=1, shared_xaxes=True,
+                        subplot_titles=strains, vertical_spacing=0.06)
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
+    
+    for row, strain in enumerate(strains, start=1):
+        track = island_tracks[strain]
+        contig_lengths = track.groupby('Contig', sort=False)['Fin'].max()
+        contig_offsets = contig_lengths.cumsum() - contig_lengths
+        offsets = track['Contig'].map(contig_offsets)
+        fig.add_trace(go.Scattergl(
+            x=(offsets + (track['Debut'] + track['Fin']) / 2) / 1_000_000, y=track['Fraction'],
+            mode='lines', name=strain, showlegend=False,
+            line=dict(width=1, color=colors[(row - 1) % len(colors)])
+        ), row=row, col=1)
+        for island in islands[islands['Souche'] == strain].itertuples(index=False):
+            start = (contig_offsets.get(island.Contig, 0) + island.Debut) / 1_000_000
+            fig.add_vrect(x0=start, x1=start + island.Longueur_bp / 1_000_000, row=row, col=1,
+                          fillcolor='#F18F01', opacity=0.3, line_width=0)
+        fig.update_yaxes(title_text="Spécifique", range=[0, 1], row=row, col=1)
+    
+    fig.update_xaxes(title_text="Position (Mb)", row=len(strains), col=1)
+    fig.update_layout(
+        title="K-mers Absents des Autres Souches (îlots en orange)",
+        title_x=0.5,
+        height=250 * len(strains) + 150
+    )
+    
+    return fig
+
+def create_pangenome_rarefaction_plot(rarefaction):
+    """Créer les courbes de raréfaction du pangénome et du core"""
+    
+    fig = go.Figure()
+    
+    for column, label, color in [('Pangenome', 'Pangénome', '#2E86AB'), ('Core', 'Core', '#A23B72')]:
+        fig.add_trace(go.Scatter(
+            x=rarefaction['N_genomes'],
+            y=rarefaction[f'{column}_moyen'],
+            error_y=dict(type='data', array=rarefaction[f'{column}_ecart_type'], visible=True),
+            mode='lines+markers',
+            name=label,
+            line_color=color
+        ))
+    
+    fig.update_layout(
+        title="Courbes de Raréfaction (k-mers)",
+        title_x=0.5,
+        xaxis_title="Nombre de génomes",
+        yaxis_title="Nombre de k-mers distincts",
+        height=450
+    )
+    
+    return fig
+
+def create_comparative_radar_chart(genome_stats):
+    """Créer un graphique radar comparatif"""
+    
+    # Normaliser les données entre 0 et 1
+    metrics = ['Taille_totale_Mb', 'GC_percent', 'Contigs', 'N50_bp', 'Complexite']
+    
+    # Vérifier quelles métriques sont disponibles
+    available_metrics = [m for m in metrics if m in genome_stats.columns]
+    
+    if not available_metrics:
+        print_status('warning', "Aucune métrique disponible pour le graphique radar")
+        return None
+    
+    # Normaliser chaque métrique
+    normalized_data = genome_stats.copy()
+    for metric in available_metrics:
+        if metric in normalized_data.columns:
+            max_val = normalized_data[metric].max()
+            min_val = normalized_data[metric].min()
+            if max_val != min_val:
+                normalized_data[metric] = (normalized_data[metric] - min_val) / (max_val - min_val)
+            else:
+                normalized_data[metric] = 0.5  # Valeur par défaut si toutes identiques
+    
+    fig = go.Figure()
+    
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1']
+    
+    for i, (_, row) in enumerate(normalized_data.iterrows()):
+        values = [row[metric] for metric in available_metrics if metric in row]
+        values.append(values[0])  # Fermer le polygone
+        
+        metric_labels = [metric.replace('_', ' ').title() for metric in available_metrics]
+        metric_labels.append(metric_labels[0])  # Fermer le polygone
+        
+        fig.add_trace(go.Scatterpolar(
+            r=values,
+            theta=metric_labels,
+            fill='toself',
+            name=row['Souche'],
+            line_color=colors[i % len(colors)]
+        ))
+    
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 1]
+            )),
+        title="Profil Comparatif des Souches",
+        title_x=0.5
+    )
+    
+    return fig
+
+def create_composition_sunburst(genome_stats):
+    """Créer un graphique sunburst de la composition"""
+    
+    # Préparer les données pour le sunburst
+    data = []
+    
+    for _, row in genome_stats.iterrows():
+        strain = row['Souche']
+        gc_percent = row['GC_percent']
+        at_percent = row['AT_percent']
+        
+        # Niveau 1: Souche
+        data.append(dict(ids=strain, labels=strain, parents=""))
+        
+        # Niveau 2: GC vs AT
+        data.append(dict(ids=f"{strain}_GC", labels=f"GC ({gc_percent:.1f}%)", 
+                        parents=strain, values=gc_percent))
+        data.append(dict(ids=f"{strain}_AT", labels=f"AT ({at_percent:.1f}%)", 
+                        parents=strain, values=at_percent))
+    
+    if data:
+        fig = go.Figure(go.Sunburst(
+            ids=[d['ids'] for d in data],
+            labels=[d['labels'] for d in data],
+            parents=[d['parents'] for d in data],
+            values=[d.get('values', 1) for d in data],
+        ))
+        
+        fig.update_layout(
+            title="Composition Nucléotidique par Souche",
+            title_x=0.5
+        )
+        
+        return fig
+    
+    return None
+
+def create_static_plots(results):
+    """Créer des graphiques statiques supplémentaires"""
+    import matplotlib.pyplot as plt
+    
+    # Configuration matplotlib
+    plt.style.use('default')
+    plt.rcParams['axes.prop_cycle'] = plt.cycler(color=HUSL_PALETTE)
+    
+    if 'genome_stats' in results:
+        genome_stats = results['genome_stats']
+        
+        # 1. Graphique de distribution des tailles
+        plt.figure(figsize=(12, 8))
+        
+        # Subplot 1: Distribution des tailles
+        plt.subplot(2, 2, 1)
+        strains = genome_stats['Souche']
+        sizes_mb = genome_stats['Taille_totale_Mb']
+        colors = [STRAIN_COLORS[i % len(STRAIN_COLORS)] for i in range(len(genome_stats))]
+        
+        bars = plt.bar(strains, sizes_mb, color=colors)
+        plt.title('Distribution des Tailles de Génomes', fontweight='bold')
+        plt.ylabel('Taille (Mb)')
+        plt.xticks(rotation=45)
+        
+        # Ajouter les valeurs
+        for bar, size in zip(bars, sizes_mb):
+            plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.05,
+                    f'{size:.2f}', ha='center', va='bottom', fontweight='bold')
+        
+        # Subplot 2: Corrélation GC vs Taille
+        plt.subplot(2, 2, 2)
+        plt.scatter(genome_stats['GC_percent'], genome_stats['Taille_totale_Mb'], 
+                   s=100, alpha=0.7, c=colors)
+        
+        for i, strain in enumerate(strains):
+            plt.annotate(strain, 
+                        (genome_stats['GC_percent'].iloc[i], genome_stats['Taille_totale_Mb'].iloc[i]),
+                        xytext=(5, 5), textcoords='offset points')
+        
+        plt.xlabel('Contenu GC (%)')
+        plt.ylabel('Taille du génome (Mb)')
+        plt.title('Corrélation GC vs Taille', fontweight='bold')
+        plt.grid(True, alpha=0.3)
+        
+        # Subplot 3: Complexité vs N50
+        plt.subplot(2, 2, 3)
+        if 'Complexite' in genome_stats.columns:
+            plt.scatter(genome_stats['Complexite'], genome_stats['N50_bp']/1000, 
+                       s=100, alpha=0.7, c=colors)
+            
+            for i, strain in enumerate(strains):
+                plt.annotate(strain, 
+                            (genome_stats['Complexite'].iloc[i], genome_stats['N50_bp'].iloc[i]/1000),
+                            xytext=(5, 5), textcoords='offset points')
+            
+            plt.xlabel('Complexité de séquence')
+            plt.ylabel('N50 (kb)')
+            plt.title('Complexité vs Qualité d\'assemblage', fontweight='bold')
+            plt.grid(True, alpha=0.3)
+        
+        # Subplot 4: Comparaison multi-métriques
+        plt.subplot(2, 2, 4)
+        metrics = ['GC_percent', 'Taille_totale_Mb', 'Contigs']
+        x_pos = np.arange(len(strains))
+        width = 0.25
+        
+        # Normaliser pour visualisation
+        for i, metric in enumerate(metrics):
+            if metric in genome_stats.columns:
+                values = genome_stats[metric]
+                normalized_values = (values - values.min()) / (values.max() - values.min())
+                plt.bar(x_pos + i * width, normalized_values, width, 
+                       label=metric.replace('_', ' ').title(), alpha=0.8)
+        
+        plt.xlabel('Souches')
+        plt.ylabel('Valeurs normalisées')
+        plt.title('Comparaison Multi-métriques', fontweight='bold')
+        plt.xticks(x_pos + width, strains, rotation=45)
+        plt.legend()
+        plt.grid(True, alpha=0.3)
+        
+        plt.tight_layout()
+        
+        # Sauvegarder
+        output_path = os.path.join(PATHS['plots'], 'comprehensive_analysis.png')
+        with atomic_path(output_path) as temporary:
+            plt.savefig(temporary, dpi=300, bbox_inches='tight')
+        print_status('success', f"Analyse complète: {output_path}")
+        plt.close()
+    
+    if 'tracks' in results:
+        plot_static_genome_tracks(results['tracks'])
+
+def generate_html_report(results):
+    """Générer un rapport HTML interactif complet"""
+    
+    html_content = f"""
+<!DOCTYPE html>
+<html lang="fr">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Rapport d'Analyse Génomique - {ORGANISM}</title>
+    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+    <style>
+        body {{
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            line-height: 1.6;
+            margin: 0;
+            padding: 0;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            min-height: 100vh;
+        }}
+        .container {{
+            max-width: 1200px;
+            margin: 0 auto;
+            background: white;
+            min-height: 100vh;
+            box-shadow: 0 0 20px rgba(0,0,0,0.1);
+        }}
+        .header {{
+            background: linear-gradient(135deg, #2E86AB 0%, #A23B72 100%);
+            color: white;
+            padding: 2rem;
+            text-align: center;
+        }}
+        .header h1 {{
+            margin: 0;
+            font-size: 2.5rem;
+            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
+        }}
+        .header p {{
+            margin: 0.5rem 0 0 0;
+            font-size: 1.2rem;
+            opacity: 0.9;
+        }}
+        .content {{
+            padding: 2rem;
+        }}
+        .section {{
+            margin-bottom: 3rem;
+            background: #f8f9fa;
+            border-radius: 10px;
+            padding: 1.5rem;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }}
+        .section h2 {{
+            color: #2E86AB;
+            border-bottom: 3px solid #2E86AB;
+            padding-bottom: 0.5rem;
+            margin-top: 0;
+        }}
+        .plot-container {{
+            margin: 1rem 0;
+            background: white;
+            border-radius: 5px;
+            padding: 1rem;
+            box-shadow: 0 1px 5px rgba(0,0,0,0.1);
+        }}
+        .stats-grid {{
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+            gap: 1rem;
+            margin: 1rem 0;
+        }}
+        .stat-card {{
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 1.5rem;
+            border-radius: 10px;
+            text-align: center;
+            box-shadow: 0 4px 15px rgba(0,0,0,0.2);
+        }}
+        .stat-number {{
+            font-size: 2rem;
+            font-weight: bold;
+            display: block;
+        }}
+        .stat-label {{
+            font-size: 0.9rem;
+            opacity: 0.9;
+            margin-top: 0.5rem;
+        }}
+        .table-container {{
+            overflow-x: auto;
+            margin: 1rem 0;
+        }}
+        table {{
+            width: 100%;
+            border-collapse: collapse;
+            background: white;
+            border-radius: 5px;
+            overflow: hidden;
+            box-shadow: 0 1px 5px rgba(0,0,0,0.1);
+        }}
+        th, td {{
+            padding: 0.75rem;
+            text-align: left;
+            border-bottom: 1px solid #ddd;
+        }}
+        th {{
+            background: #2E86AB;
+            color: white;
+            font-weight: bold;
+        }}
+        tr:hover {{
+            background-color: #f5f5f5;
+        }}
+        .highlight {{
+            background: linear-gradient(90deg, #FFD93D 0%, #FF6B6B 100%);
+            color: white;
+            padding: 1rem;
+            border-radius: 5px;
+            margin: 1rem 0;
+            text-align: center;
+            font-weight: bold;
+        }}
+        .footer {{
+            background: #2c3e50;
+            color: white;
+            padding: 2rem;
+            text-align: center;
+            margin-top: 2rem;
+        }}
+        .methodology {{
+            background: #e8f4f8;
+            border-left: 4px solid #2E86AB;
+            padding: 1rem;
+            margin: 1rem 0;
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🧬 Rapport d'Analyse Génomique</h1>
+            <p><em>{ORGANISM}</em> - Génomique Comparative</p>
+            <p>Généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}</p>
+        </div>
+        
+        <div class="content">
+"""
+    
+    # Section vue d'ensemble
+    if 'genome_stats' in results:
+        genome_stats = results['genome_stats']
+        
+        html_content += f"""
+            <div class="section">
+                <h2>📊 Vue d'Ensemble des Génomes</h2>
+                
+                <div class="stats-grid">
+                    <div class="stat-card">
+                        <span class="stat-number">{len(genome_stats)}</span>
+                        <div class="stat-label">Souches analysées</div>
+                    </div>
+                    <div class="stat-card">
+                        <span class="stat-number">{genome_stats['Taille_totale_Mb'].mean():.2f}</span>
+                        <div class="stat-label">Taille moyenne (Mb)</div>
+                    </div>
+                    <div class="stat-card">
+                        <span class="stat-number">{genome_stats['GC_percent'].mean():.1f}%</span>
+                        <div class="stat-label">Contenu GC moyen</div>
+                    </div>
+                    <div class="stat-card">
+                        <span class="stat-number">{genome_stats['Contigs'].sum()}</span>
+                        <div class="stat-label">Contigs totaux</div>
+                    </div>
+                </div>
+                
+                <div class="plot-container">
+                    <div id="overview-plot"></div>
+                </div>
+                
+                <div class="table-container">
+                    <table>
+                        <thead>
+                            <tr>
+                                <th>Souche</th>
+                                <th>Taille (Mb)</th>
+                                <th>GC (%)</th>
+                                <th>Contigs</th>
+                                <th>N50 (kb)</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+        """
+        
+        for _, row in genome_stats.iterrows():
+            html_content += f"""
+                            <tr>
+                                <td><strong>{row['Souche']}</strong></td>
+                                <td>{row['Taille_totale_Mb']:.2f}</td>
+                                <td>{row['GC_percent']:.1f}</td>
+                                <td>{row['Contigs']}</td>
+                                <td>{row['N50_bp']/1000:.0f}</td>
+                            </tr>
+            """
+        
+        html_content += """
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+        """
+    
+    # Section comparaisons
+    if 'comparisons' in results:
+        comparisons = results['comparisons']
+        
+        html_content += f"""
+            <div class="section">
+                <h2>🔬 Analyses Comparatives</h2>
+                
+                <div class="highlight">
+                    Les souches montrent une similarité moyenne de {comparisons['Similarite_composite'].mean():.3f}
+                    avec une distance génétique moyenne de {comparisons['Distance_genetique'].mean():.3f}
+                </div>
+                
+                <div class="plot-container">
+                    <div id="similarity-heatmap"></div>
+                </div>
+                
+                <div class="table-container">
+                    <table>
+                        <thead>
+                            <tr>
+                                <th>Comparaison</th>
+                                <th>Similarité K-mers</th>
+                                <th>Similarité GC</th>
+                                <th>Similarité Composite</th>
+                                <th>Distance Génétique</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+        """
+        
+        for _, row in comparisons.iterrows():
+            html_content += f"""
+                            <tr>
+                                <td><strong>{row['Souche_1']} vs {row['Souche_2']}</strong></td>
+                                <td>{row['Similarite_kmers']:.3f}</td>
+                                <td>{row['Similarite_GC']:.3f}</td>
+                                <td>{row['Similarite_composite']:.3f}</td>
+                                <td>{row['Distance_genetique']:.3f}</td>
+                            </tr>
+            """
+        
+        html_content += """
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+        """
+    
+    # Section pistes génomiques
+    if 'tracks' in results:
+        html_content += """
+            <div class="section">
+                <h2>🧭 Profils le long des Génomes</h2>
+                <p>GC, GC skew, skew cumulé et entropie par intervalle ; la résolution
+                est choisie automatiquement selon la largeur du graphique.</p>
+                <div class="plot-container">
+                    <div id="genome-tracks"></div>
+                </div>
+            </div>
+        """
+    
+    # Section îlots génomiques
+    if results.get('island_tracks'):
+        islands = results['islands']
+        html_content += f"""
+            <div class="section">
+                <h2>🏝️ Îlots Génomiques Spécifiques</h2>
+                <p>Fraction, par fenêtre, des k-mers absents de toutes les autres souches du panel ;
+                les fenêtres consécutives au-dessus du seuil forment les îlots candidats
+                ({len(islands)} îlots, {int(islands['Longueur_bp'].sum()):,} bp au total).</p>
+                <div class="plot-container">
+                    <div id="island-tracks"></div>
+                </div>
+        """
+        
+        if len(islands):
+            html_content += """
+                <div class="table-container">
+                    <table>
+                        <thead>
+                            <tr>
+                                <th>Îlot</th>
+                                <th>Contig</th>
+                                <th>Position</th>
+                                <th>Longueur (kb)</th>
+                                <th>Spécifique (%)</th>
+                                <th>Écart GC (points)</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+            """
+            for _, row in islands.sort_values('Longueur_bp', ascending=False).head(20).iterrows():
+                html_content += f"""
+                            <tr>
+                                <td><strong>{row['Ilot']}</strong></td>
+                                <td>{row['Contig']}</td>
+                                <td>{row['Debut']:,}-{row['Fin']:,}</td>
+                                <td>{row['Longueur_bp'] / 1000:.1f}</td>
+                                <td>{row['Fraction_specifique'] * 100:.1f}</td>
+                                <td>{row['Ecart_GC']:+.2f}</td>
+                            </tr>
+                """
+            html_content += """
+                        </tbody>
+                    </table>
+                </div>
+            """
+        
+        html_content += """
+            </div>
+        """
+    
+    # Section groupes de souches
+    if 'strain_clusters' in results and len(results['strain_clusters']):
+        clusters = results['strain_clusters']
+        html_content += """
+            <div class="section">
+                <h2>🕸️ Groupes de Souches</h2>
+                <p>Composantes connexes du graphe creux des plus proches voisins
+                (similarité composite) restreint aux arêtes au-dessus de chaque seuil ;
+                le représentant est la souche la plus similaire aux autres membres.</p>
+                <div class="table-container">
+                    <table>
+                        <thead>
+                            <tr>
+                                <th>Seuil</th>
+                                <th>Groupe</th>
+                                <th>Taille</th>
+                                <th>Représentant</th>
+                                <th>Membres</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+        """
+        for threshold, table in clusters.groupby('Seuil'):
+            groups = table.groupby('Groupe', sort=True)
+            for group, members in list(groups)[:10]:
+                names = list(members['Souche'])
+                listed = ', '.join(names[:8]) + (f" (+{len(names) - 8})" if len(names) > 8 else "")
+                html_content += f"""
+                            <tr>
+                                <td>{threshold:.2f}</td>
+                                <td>{group}</td>
+                                <td>{len(names)}</td>
+                                <td><strong>{members['Representant'].iloc[0]}</strong></td>
+                                <td>{listed}</td>
+                            </tr>
+                """
+            if groups.ngroups > 10:
+                html_content += f"""
+                            <tr>
+                                <td>{threshold:.2f}</td>
+                                <td colspan="4">... {groups.ngroups - 10} autres groupes</td>
+                            </tr>
+                """
+        html_content += """
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+        """
+    
+    # Section pangénome
+    if 'pangenome_summary' in results:
+        pangenome_summary = results['pangenome_summary']
+        totals = results['pangenome_totals']
+        
+        html_content += f"""
+            <div class="section">
+                <h2>🧩 Pangénome (k-mers, k={totals['k']})</h2>
+                
+                <div class="stats-grid">
+                    <div class="stat-card">
+                        <span class="stat-number">{totals['pangenome_kmers']:,}</span>
+                        <div class="stat-label">K-mers du pangénome</div>
+                    </div>
+                    <div class="stat-card">
+                        <span class="stat-number">{totals['core_kmers']:,}</span>
+                        <div class="stat-label">Core (toutes les souches)</div>
+                    </div>
+                    <div class="stat-card">
+                        <span class="stat-number">{totals['accessory_kmers']:,}</span>
+                        <div class="stat-label">Accessoires</div>
+                    </div>
+                    <div class="stat-card">
+                        <span class="stat-number">{totals['specific_kmers']:,}</span>
+                        <div class="stat-label">Spécifiques d'une souche</div>
+                    </div>
+                </div>
+                
+                <div class="plot-container">
+                    <div id="pangenome-rarefaction"></div>
+                </div>
+                
+                <div class="table-container">
+                    <table>
+                        <thead>
+                            <tr>
+                                <th>Souche</th>
+                                <th>K-mers</th>
+                                <th>Core (%)</th>
+                                <th>Accessoires</th>
+                                <th>Spécifiques</th>
+                                <th>Spécifiques (%)</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+        """
+        
+        for _, row in pangenome_summary.iterrows():
+            html_content += f"""
+                            <tr>
+                                <td><strong>{row['Souche']}</strong></td>
+                                <td>{row['Kmers_total']:,}</td>
+                                <td>{row['Fraction_core'] * 100:.1f}</td>
+                                <td>{row['Kmers_accessoires']:,}</td>
+                                <td>{row['Kmers_specifiques']:,}</td>
+                                <td>{row['Fraction_specifique'] * 100:.1f}</td>
+                            </tr>
+            """
+        
+        html_content += """
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+        """
+    
+    # Section méthodologie
+    html_content += """
+            <div class="section">
+                <h2>🔬 Méthodologie</h2>
+                
+                <div class="methodology">
+                    <h3>Pipeline d'Analyse</h3>
+                    <ol>
+                        <li><strong>Téléchargement :</strong> Récupération des génomes depuis NCBI</li>
+                        <li><strong>Analyse des séquences :</strong> Calcul des statistiques génomiques avec Biopython</li>
+                        <li><strong>Comparaison :</strong> Analyse de similarité multi-critères</li>
+                        <li><strong>Visualisation :</strong> Création de graphiques interactifs</li>
+                    </ol>
+                </div>
+                
+                <div class="methodology">
+                    <h3>Métriques Calculées</h3>
+                    <ul>
+                        <li><strong>K-mers :</strong> Profils de tétranucléotides pour la composition</li>
+                        <li><strong>Contenu GC :</strong> Pourcentage de guanine et cytosine</li>
+                        <li><strong>N50 :</strong> Métrique de qualité d'assemblage</li>
+                        <li><strong>Complexité :</strong> Diversité des séquences</li>
+                    </ul>
+                </div>
+                
+                <div class="methodology">
+                    <h3>Outils Utilisés</h3>
+                    <ul>
+                        <li><strong>Python 3.9 :</strong> Langage principal</li>
+                        <li><strong>Biopython :</strong> Analyse des séquences biologiques</li>
+                        <li><strong>Pandas/NumPy :</strong> Manipulation et calculs sur les données</li>
+                        <li><strong>Plotly :</strong> Visualisations interactives</li>
+                        <li><strong>Matplotlib/Seaborn :</strong> Graphiques statistiques</li>
+                    </ul>
+                </div>
+            </div>
+        </div>
+        
+        <div class="footer">
+            <p>Rapport généré par le pipeline de génomique comparative</p>
+            <p>Projet développé pour l'analyse de <em>Lactobacillus bulgaricus</em></p>
+            <p>© {datetime.now().year} - Pipeline Python de bioinformatique</p>
+        </div>
+    </div>
+    
+    <script>
+    """
+    
+    # Ajouter les scripts Plotly pour les graphiques interactifs
+    if 'genome_stats' in results:
+        # Créer les graphiques interactifs
+        overview_fig = create_interactive_genome_overview(results['genome_stats'])
+        if overview_fig:
+            html_content += f"""
+        // Graphique vue d'ensemble
+        var overviewData = {overview_fig.to_json()};
+        Plotly.newPlot('overview-plot', overviewData.data, overviewData.layout);
+            """
+    
+    if 'similarity_matrix' in results:
+        similarity_fig = create_interactive_similarity_heatmap(results['similarity_matrix'])
+        if similarity_fig:
+            html_content += f"""
+        // Heatmap de similarité
+        var similarityData = {similarity_fig.to_json()};
+        Plotly.newPlot('similarity-heatmap', similarityData.data, similarityData.layout);
+            """
+    
+    if 'tracks' in results:
+        tracks_fig = create_genome_tracks_plot(results['tracks'])
+        html_content += f"""
+        // Profils le long des génomes
+        var tracksData = {tracks_fig.to_json()};
+        Plotly.newPlot('genome-tracks', tracksData.data, tracksData.layout);
+            """
+    
+    if results.get('island_tracks'):
+        islands_fig = create_islands_track_plot(results['island_tracks'], results['islands'])
+        html_content += f"""
+        // Îlots génomiques spécifiques
+        var islandsData = {islands_fig.to_json()};
+        Plotly.newPlot('island-tracks', islandsData.data, islandsData.layout);
+            """
+    
+    if 'pangenome_rarefaction' in results:
+        rarefaction_fig = create_pangenome_rarefaction_plot(results['pangenome_rarefaction'])
+        html_content += f"""
+        // Courbes de raréfaction du pangénome
+        var rarefactionData = {rarefaction_fig.to_json()};
+        Plotly.newPlot('pangenome-rarefaction', rarefactionData.data, rarefactionData.layout);
+            """
+    
+    html_content += """
+    </script>
+</body>
+</html>
+    """
+    
+    return html_content
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Visualisations et rapport final (étape 4)")
+    parser.parse_args()
+    
+    print("🎨 === VISUALISATION ET RAPPORT FINAL ===")
+    print(f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    print()
+    
+    # Charger tous les résultats
+    print_status('info', "Chargement des résultats d'analyse...")
+    results = load_analysis_results()
+    
+    if not results:
+        print_status('error', "Aucun résultat trouvé ! Exécutez d'abord les étapes précédentes.")
+        sys.exit(1)
+    
+    print()
+    write_report(results)
+
+def write_report(results):
+    """Graphiques statiques et interactifs, rapport HTML et index des résultats"""
+    # Créer les visualisations statiques
+    print_status('info', "Création des graphiques statiques...")
+    create_static_plots(results)
+    
+    # Créer les graphiques interactifs individuels
+    print_status('info', "Création des graphiques interactifs...")
+    
+    if 'genome_stats' in results:
+        # Graphique radar
+        radar_fig = create_comparative_radar_chart(results['genome_stats'])
+        if radar_fig:
+            radar_path = os.path.join(PATHS['plots'], 'radar_chart.html')
+            with atomic_path(radar_path) as temporary:
+                pyo.plot(radar_fig, filename=temporary, auto_open=False)
+            print_status('success', f"Graphique radar: {radar_path}")
+        
+        # Graphique sunburst
+        sunburst_fig = create_composition_sunburst(results['genome_stats'])
+        if sunburst_fig:
+            sunburst_path = os.path.join(PATHS['plots'], 'composition_sunburst.html')
+            with atomic_path(sunburst_path) as temporary:
+                pyo.plot(sunburst_fig, filename=temporary, auto_open=False)
+            print_status('success', f"Graphique sunburst: {sunburst_path}")
+    
+    # Générer le rapport HTML principal
+    print_status('info', "Génération du rapport HTML interactif...")
+    html_content = generate_html_report(results)
+    
+    # Sauvegarder le rapport
+    report_path = os.path.join(PATHS['results'], 'rapport_final.html')
+    with atomic_path(report_path) as temporary, open(temporary, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    
+    print_status('success', f"Rapport principal: {report_path}")
+    
+    # Créer un index des fichiers générés
+    print_status('info', "Création de l'index des résultats...")
+    
+    index_content = f"""
+# 📊 Index des Résultats - {ORGANISM}
+
+## 📁 Structure des Fichiers Générés
+
+### Données d'Analyse
+- `data/analysis/genome_statistics.csv` - Statistiques détaillées des génomes
+- `data/analysis/detailed_analysis.json` - Données brutes complètes
+- `data/analysis/analysis_report.txt` - Rapport textuel
+
+### Comparaisons
+- `data/results/similarity_matrix.csv` - Matrice de similarité
+- `data/results/pairwise_comparisons.csv` - Comparaisons par paires
+- `data/results/comparison_report.txt` - Rapport de comparaison
+- `data/results/neighbor_graph.npz` - Graphe creux des plus proches voisins (CSR)
+- `data/results/strain_clusters.csv` - Groupes de souches et représentants par seuil
+
+### Pangénome (k-mers)
+- `data/results/pangenome/pangenome_summary.csv` - K-mers core / accessoires / spécifiques par souche
+- `data/results/pangenome/pangenome_rarefaction.csv` - Courbes de raréfaction
+- `data/results/pangenome/non_core_kmers/` - K-mers non core (colonnes binaires + bitmap de présence)
+
+### Îlots génomiques spécifiques
+- `data/results/islands/islands.tsv` - Îlots candidats de toutes les souches
+- `data/results/islands/*_islands.bed` - Îlots par souche (BED)
+- `data/results/islands/*_specific.bedgraph` - Fraction de k-mers spécifiques par fenêtre
+
+### Visualisations
+- `data/results/plots/genome_statistics.png` - Vue d'ensemble des génomes
+- `data/results/plots/similarity_matrices.png` - Matrices de similarité
+- `data/results/plots/phylogenetic_tree.png` - Arbre phylogénétique
+- `data/results/plots/comprehensive_analysis.png` - Analyse complète
+- `data/results/plots/genome_tracks.png` - Profils GC / skew le long des génomes
+- `data/analysis/tracks/*.tracks` - Pistes multi-résolution (100 pb à 100 kb)
+
+### Rapports Interactifs
+- `data/results/rapport_final.html` - **Rapport principal interactif**
+- `data/results/plots/radar_chart.html` - Graphique radar comparatif
+- `data/results/plots/composition_sunburst.html` - Composition nucléotidique
+
+## 🌐 Comment Consulter les Résultats
+
+### Rapport Principal (Recommandé)
+```bash
+open data/results/rapport_final.html
+# ou
+firefox data/results/rapport_final.html
+```
+
+### Graphiques Individuels
+```bash
+open data/results/plots/
+```
+
+### Données Brutes
+```bash
+cat data/analysis/genome_statistics.csv
+cat data/results/pairwise_comparisons.csv
+```
+
+## 📈 Résumé des Analyses
+
+Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}
+Souches: {len(results['genome_stats']) if 'genome_stats' in results else len(STRAINS)} génomes analysés
+Pipeline: Python natif (compatible macOS M4 Pro)
+
+---
+*Généré automatiquement par le pipeline de génomique comparative*
+    """
+    
+    index_path = os.path.join(PATHS['results'], 'INDEX.md')
+    with atomic_path(index_path) as temporary, open(temporary, 'w', encoding='utf-8') as f:
+        f.write(index_content)
+    
+    print_status('success', f"Index créé: {index_path}")
+    
+    print()
+    print("🎉 === VISUALISATION TERMINÉE ===")
+    print()
+    print("📊 Fichiers générés:")
+    print(f"   📄 Rapport principal: {report_path}")
+    print(f"   📋 Index: {index_path}")
+    print(f"   📁 Graphiques: {PATHS['plots']}/")
+    print()
+    print("🌐 Pour consulter les résultats:")
+    print(f"   open {report_path}")
+    print("   ou")
+    print(f"   firefox {report_path}")
+    print()
+    print_status('success', "🎯 Pipeline de génomique comparative terminé!")
+    print()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Ordonnancement des comparaisons toutes-paires sous un budget mémoire
+
+Le coût mémoire d'une tâche est estimé à partir de la longueur des génomes
+et des métriques calculées (octets par base mesurés sur les étapes
+NumPy, pic de chaque métrique séparément car elles s'exécutent l'une après
+l'autre). Le plan choisit alors le nombre de workers et la taille des tuiles
+(blocs de souches du triangle supérieur, comme lacto.shard) pour que
+
+    workers x (surcoût interpréteur + génomes en cache + pic d'une paire)
+
+reste sous le budget. Dans une tuile, les paires sont parcourues ligne par
+ligne et chaque génome est libéré dès qu'aucune paire restante de la tuile
+ne l'utilise.
+
+Usage: python3 -m lacto.scheduler data/genomes/*.fna --max-memory 2048
+"""
+
+import os
+import sys
+import argparse
+import resource
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.faidx import load_fai
+from lacto.shard import plan_blocks, block_pairs
+
+# Octets par base au pic de chaque étape (mesurés avec tracemalloc)
+GENOME_BYTES_PER_BASE = 1.0
+# Entrées gardées avec un génome en cache (index de minimiseurs de la synténie, lacto.metrics)
+CACHED_BYTES_PER_BASE = {'synteny': 3.1}
+PROFILE_BYTES_PER_BASE = {'kmer': 20, 'codon': 16}
+PAIR_BYTES_PER_BASE = {'synteny': 75, 'gc': 16, 'sequence': 1, 'kmer': 0, 'size': 0, 'codon': 0}
+WORKER_OVERHEAD_MB = 160  # Interpréteur, NumPy, pandas et matplotlib importés
+SAFETY_FACTOR = 1.2
+MIN_TILE = 4
+
+MB = 1024 * 1024
+
+
+def genome_memory(length, metrics=()):
+    """Mémoire d'un génome chargé et de ses entrées précalculées (octets)"""
+    return (GENOME_BYTES_PER_BASE + sum(CACHED_BYTES_PER_BASE.get(metric, 0) for metric in metrics)) * length
+
+
+def profile_memory(length, metrics=PROFILE_BYTES_PER_BASE):
+    """Pic du calcul des profils d'un génome (octets, génome compris)"""
+    peak = max((PROFILE_BYTES_PER_BASE.get(metric, 0) for metric in metrics), default=0)
+    return SAFETY_FACTOR * (genome_memory(length) + peak * length)
+
+
+def pair_memory(length1, length2, metrics=PAIR_BYTES_PER_BASE):
+    """Pic de travail d'une paire, hors génomes en cache (octets)"""
+    peak = max((PAIR_BYTES_PER_BASE.get(metric, 0) for metric in metrics), default=0)
+    return SAFETY_FACTOR * peak * (length1 + length2)
+
+
+def worker_memory(lengths, tile, metrics=PAIR_BYTES_PER_BASE):
+    """Mémoire d'un worker traitant des tuiles de tile souches (pire cas : plus grands génomes)"""
+    largest = sorted(lengths, reverse=True)
+    cached = sum(genome_memory(length, metrics) for length in largest[:min(tile + 1, len(largest))])
+    working = pair_memory(largest[0], largest[min(1, len(largest) - 1)], metrics)
+    return WORKER_OVERHEAD_MB * MB + cached + working
+
+
+def plan_schedule(lengths, max_memory_mb, metrics=PAIR_BYTES_PER_BASE, max_workers=None):
+    """Nombre de workers et taille de tuile respectant le budget
+
+    On privilégie le nombre de workers tant que les tuiles gardent au moins
+    MIN_TILE souches par côté (sinon les génomes sont rechargés trop souvent).
+    """
+    n_items = len(lengths)
+    n_pairs = n_items * (n_items - 1) // 2
+    budget = max_memory_mb * MB
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, max(n_pairs, 1)))
+
+    def largest_tile(workers):
+        tile = 0
+        for candidate in range(1, max(n_items, 1) + 1):
+            if workers * worker_memory(lengths, candidate, metrics) > budget:
+                break
+            tile = candidate
+        return tile
+
+    workers, tile = 1, largest_tile(1)
+    for candidate_workers in range(max_workers, 0, -1):
+        candidate_tile = largest_tile(candidate_workers)
+        if candidate_tile >= min(MIN_TILE, n_items):
+            # Au moins autant de tuiles que de workers
+            while candidate_tile > 1 and len(plan_blocks(n_items, candidate_tile)) < candidate_workers:
+                candidate_tile -= 1
+            workers, tile = candidate_workers, candidate_tile
+            break
+
+    fits = tile >= 1
+    tile = max(tile, 1)
+    return {
+        'workers': workers,
+        'tile': tile,
+        'blocks': plan_blocks(n_items, tile),
+        'estimated_mb': workers * worker_memory(lengths, tile, metrics) / MB,
+        'budget_mb': max_memory_mb,
+        'fits': fits,
+    }
+
+
+def pending_references(pairs):
+    """Nombre de paires restantes utilisant chaque génome"""
+    references = {}
+    for i, j in pairs:
+        references[i] = references.get(i, 0) + 1
+        references[j] = references.get(j, 0) + 1
+    return references
+
+
+class GenomeCache:
+    """Génomes chargés à la demande, libérés dès qu'aucune paire en attente ne les utilise"""
+
+    def __init__(self, load, pairs):
+        self._load = load
+        self._genomes = {}
+        self._references = pending_references(pairs)
+        self.loads = 0
+
+    def get(self, item):
+        if item not in self._genomes:
+            self._genomes[item] = self._load(item)
+            self.loads += 1
+        return self._genomes[item]
+
+    def release(self, *items):
+        """Signaler qu'une paire utilisant ces génomes est terminée"""
+        for item in items:
+            self._references[item] -= 1
+            if self._references[item] == 0:
+                self._genomes.pop(item, None)
+
+
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus courant (Mo)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / MB if sys.platform == 'darwin' else peak / 1024  # octets sous macOS, Ko sous Linux
+
+
+def _run_tile(task, block, pending):
+    """Exécuter une tuile dans un worker ; retourne les résultats et le pic du worker"""
+    return task(block, pending), peak_rss_mb()
+
+
+def run_schedule(schedule, task, skip=frozenset(), on_result=None):
+    """Exécuter les tuiles du plan
+
+    task(block, pairs) calcule les paires (i, j) d'une tuile non présentes dans
+    skip et retourne une liste de résultats ; on_result(result) est appelé dans
+    le processus principal au fil des tuiles terminées. Retourne le pic mesuré
+    du plus gros worker (Mo).
+    """
+    tiles = []
+    for block in schedule['blocks']:
+        pending = [pair for pair in block_pairs(block) if pair not in skip]
+        if pending:
+            tiles.append((block, pending))
+
+    worker_peak = 0.0
+    if schedule['workers'] == 1 or len(tiles) <= 1:
+        for block, pending in tiles:
+            for result in task(block, pending):
+                if on_result:
+                    on_result(result)
+        return peak_rss_mb()
+
+    with ProcessPoolExecutor(max_workers=schedule['workers']) as executor:
+        futures = [executor.submit(_run_tile, task, block, pending) for block, pending in tiles]
+        for future in as_completed(futures):
+            results, peak = future.result()
+            worker_peak = max(worker_peak, peak)
+            for result in results:
+                if on_result:
+                    on_result(result)
+    return worker_peak
+
+
+def report_peak(schedule, worker_peak_mb):
+    """Comparer le pic mesuré (principal + workers) au budget"""
+    main_peak = peak_rss_mb()
+    if schedule['workers'] > 1:
+        total = main_peak + schedule['workers'] * worker_peak_mb
+        detail = f"principal {main_peak:.0f} Mo + {schedule['workers']} x {worker_peak_mb:.0f} Mo"
+    else:
+        total = max(main_peak, worker_peak_mb)
+        detail = "un seul processus"
+    level = 'success' if total <= schedule['budget_mb'] else 'warning'
+    print_status(level, f"Pic mémoire mesuré: {total:.0f} Mo ({detail}), "
+                        f"estimé {schedule['estimated_mb']:.0f} Mo, budget {schedule['budget_mb']} Mo")
+    return total
+
+
+def describe_schedule(schedule):
+    n_pairs = sum(block['pairs'] for block in schedule['blocks'])
+    return (f"{schedule['workers']} workers, tuiles de {schedule['tile']} souches "
+            f"({len(schedule['blocks'])} tuiles, {n_pairs} paires), "
+            f"estimation {schedule['estimated_mb']:.0f} Mo / budget {schedule['budget_mb']} Mo")
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Plan d'exécution toutes-paires sous budget mémoire")
+    parser.add_argument('fasta', nargs='+', help="Génomes (FASTA)")
+    parser.add_argument('--max-memory', type=int, required=True, help="Budget mémoire total (Mo)")
+    parser.add_argument('--workers', type=int, help="Nombre maximal de workers (défaut: nombre de CPU)")
+    args = parser.parse_args()
+
+    lengths = [int(sum(load_fai(path)['lengths'])) for path in args.fasta]
+    schedule = plan_schedule(lengths, args.max_memory, max_workers=args.workers)
+    print_status('success' if schedule['fits'] else 'warning', describe_schedule(schedule))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Service local en lecture seule des résultats (HTTP/JSON)
+
+Les résultats des étapes 02 et 03 sont chargés une seule fois au démarrage :
+les matrices de similarité de detailed_comparisons.json sont converties en
+.npy puis relues en mémoire partagée (mmap), les statistiques génomiques sont
+gardées en mémoire. Les requêtes passent par un cache LRU et la latence de
+chaque requête est mesurée.
+
+Routes (GET) :
+  /health                          état du service
+  /strains                         liste des souches
+  /strains/<souche>                statistiques d'une souche
+  /pair/<souche1>/<souche2>        similarités d'une paire (métriques du registre
+                                   lacto.metrics et composite ; null si non calculée)
+  /neighbors/<souche>?k=5&metric=composite
+                                   k souches les plus proches (ex. metric=synteny)
+  /subtree/<souche>?height=0.5     groupe de la souche dans l'arbre (coupé à height,
+                                   ou plus petit clade la contenant si absent)
+  /stats                           latences et état du cache
+
+Usage: python3 -m lacto.service [--port 8765]
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import threading
+import urllib.request
+from functools import lru_cache
+from urllib.parse import urlparse, parse_qs, quote, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.metrics import METRICS as METRIC_REGISTRY
+
+try:
+    from config import PATHS
+except ImportError:
+    PATHS = {"analysis": "data/analysis", "results": "data/results"}
+
+# Matrices servies : métriques du registre lacto.metrics et similarité composite (clés de detailed_comparisons.json)
+MATRICES = {**{name: metric['matrix'] for name, metric in METRIC_REGISTRY.items()}, 'composite': 'composite_similarity'}
+METRICS = list(MATRICES)
+DEFAULT_PORT = 8765
+CACHE_SIZE = 4096
+
+
+def prepare_matrix_store(results_dir, store_dir):
+    """Convertir les matrices JSON de l'étape 03 en fichiers .npy (si nécessaire)
+
+    Les métriques absentes du JSON (résultats d'une version antérieure) ne
+    sont pas servies.
+    """
+    json_path = os.path.join(results_dir, 'detailed_comparisons.json')
+    names_path = os.path.join(store_dir, 'strain_names.json')
+    os.makedirs(store_dir, exist_ok=True)
+
+    # Magasin d'une version qui servait moins de métriques : reconverti
+    up_to_date = (os.path.exists(names_path) and
+                  os.path.getmtime(names_path) >= os.path.getmtime(json_path) and
+                  all(os.path.exists(os.path.join(store_dir, f'{metric}.npy')) for metric in METRICS))
+    if not up_to_date:
+        with open(json_path, 'r') as f:
+            detailed = json.load(f)
+        for metric, key in MATRICES.items():
+            npy_path = os.path.join(store_dir, f'{metric}.npy')
+            if key in detailed:
+                np.save(npy_path, np.asarray(detailed[key], dtype=np.float64))
+            elif os.path.exists(npy_path):
+                os.remove(npy_path)
+        with open(names_path, 'w') as f:
+            json.dump(detailed['strain_names'], f)
+
+    with open(names_path, 'r') as f:
+        strain_names = json.load(f)
+    matrices = {metric: np.load(os.path.join(store_dir, f'{metric}.npy'), mmap_mode='r')
+                for metric in METRICS if os.path.exists(os.path.join(store_dir, f'{metric}.npy'))}
+    return strain_names, matrices
+
+
+class ResultsStore:
+    """Résultats chargés une fois, requêtes mises en cache (LRU)"""
+
+    def __init__(self, analysis_dir=PATHS['analysis'], results_dir=PATHS['results'],
+                 cache_size=CACHE_SIZE):
+        self.strain_names, self.matrices = prepare_matrix_store(
+            results_dir, os.path.join(results_dir, 'matrices'))
+        self.strain_index = {name: i for i, name in enumerate(self.strain_names)}
+
+        self.genome_stats = {}
+        stats_path = os.path.join(analysis_dir, 'genome_statistics.csv')
+        if os.path.exists(stats_path):
+            with open(stats_path, newline='') as f:
+                for row in csv.DictReader(f):
+                    self.genome_stats[row['Souche']] = {key: _parse_value(value) for key, value in row.items()}
+
+        self._linkage = None
+        self._lock = threading.Lock()
+
+        # Caches LRU par type de requête (arguments hachables uniquement)
+        self.strain = lru_cache(maxsize=cache_size)(self._strain)
+        self.pair = lru_cache(maxsize=cache_size)(self._pair)
+        self.neighbors = lru_cache(maxsize=cache_size)(self._neighbors)
+        self.subtree = lru_cache(maxsize=cache_size)(self._subtree)
+
+    def cache_info(self):
+        return {name: getattr(self, name).cache_info()._asdict()
+                for name in ('strain', 'pair', 'neighbors', 'subtree')}
+
+    def _index(self, strain):
+        if strain not in self.strain_index:
+            raise KeyError(f"Souche inconnue: {strain}")
+        return self.strain_index[strain]
+
+    def _strain(self, strain):
+        index = self._index(strain)
+        return {
+            'strain': strain,
+            'statistics': self.genome_stats.get(strain, {}),
+            'mean_similarity': float(np.mean(np.delete(self.matrices['composite'][index], index)))
+            if len(self.strain_names) > 1 else None,
+        }
+
+    def _pair(self, strain1, strain2):
+        i, j = self._index(strain1), self._index(strain2)
+        similarities = {metric: _json_value(matrix[i, j]) for metric, matrix in self.matrices.items()}
+        return {
+            'strain_1': strain1,
+            'strain_2': strain2,
+            'similarity': similarities,
+            'distance': 1 - similarities['composite'],
+        }
+
+    def _neighbors(self, strain, k=5, metric='composite'):
+        if metric not in self.matrices:
+            raise ValueError(f"Métrique inconnue: {metric} (choix: {', '.join(self.matrices)})")
+        index = self._index(strain)
+        row = np.array(self.matrices[metric][index])
+        if len(row) > 1 and np.isnan(np.delete(row, index)).all():
+            raise ValueError(f"Métrique non calculée: {metric}")
+        row[index] = -np.inf
+        k = max(0, min(k, len(row) - 1))
+        top = np.argpartition(-row, k - 1)[:k] if k else np.zeros(0, dtype=np.int64)
+        top = top[np.argsort(-row[top], kind='stable')]
+        return {
+            'strain': strain,
+            'metric': metric,
+            'neighbors': [{'strain': self.strain_names[j], 'similarity': float(row[j])} for j in top],
+        }
+
+    def linkage(self):
+        """Arbre hiérarchique (Ward sur 1 - similarité composite), calculé à la demande"""
+        with self._lock:
+            if self._linkage is None:
+                from scipy.cluster.hierarchy import linkage
+                from scipy.spatial.distance import squareform
+                distances = 1 - np.asarray(self.matrices['composite'])
+                np.fill_diagonal(distances, 0)
+                self._linkage = linkage(squareform(distances, checks=False), method='ward')
+            return self._linkage
+
+    def _subtree(self, strain, height=None):
+        index = self._index(strain)
+        n = len(self.strain_names)
+        if n < 2:
+            return {'strain': strain, 'height': 0.0, 'members': [strain]}
+
+        tree = self.linkage()
+        if height is not None:
+            from scipy.cluster.hierarchy import fcluster
+            labels = fcluster(tree, t=height, criterion='distance')
+            members = [self.strain_names[i] for i in np.flatnonzero(labels == labels[index])]
+            return {'strain': strain, 'height': height, 'members': members}
+
+        # Plus petit clade contenant la souche (premier regroupement qui l'inclut)
+        clusters = {i: [i] for i in range(n)}
+        for step, (left, right, merge_height, _) in enumerate(tree):
+            merged = clusters.pop(int(left)) + clusters.pop(int(right))
+            clusters[n + step] = merged
+            if index in merged:
+                return {
+                    'strain': strain,
+                    'height': float(merge_height),
+                    'members': [self.strain_names[i] for i in sorted(merged)],
+                }
+        return {'strain': strain, 'height': 0.0, 'members': [strain]}
+
+
+def _json_value(value):
+    """Valeur de matrice sérialisable (None pour une métrique non calculée, NaN)"""
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def _parse_value(value):
+    """Convertir une cellule CSV en nombre si possible"""
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            continue
+    return value
+
+
+class LatencyTracker:
+    """Latences des requêtes (fenêtre glissante des dernières mesures)"""
+
+    def __init__(self, window=10000):
+        self.window = window
+        self.samples = []
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms):
+        with self._lock:
+            self.count += 1
+            self.samples.append(latency_ms)
+            if len(self.samples) > self.window:
+                del self.samples[:len(self.samples) - self.window]
+
+    def summary(self):
+        with self._lock:
+            if not self.samples:
+                return {'requests': self.count}
+            samples = np.array(self.samples)
+        return {
+            'requests': self.count,
+            'mean_ms': float(samples.mean()),
+            'p50_ms': float(np.percentile(samples, 50)),
+            'p95_ms': float(np.percentile(samples, 95)),
+            'max_ms': float(samples.max()),
+        }
+
+
+class ResultsRequestHandler(BaseHTTPRequestHandler):
+    """Routage des requêtes GET vers le ResultsStore"""
+
+    server_version = "LactoResults/1.0"
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        try:
+            status, payload = 200, self.route(parts, query)
+        except KeyError as e:
+            status, payload = 404, {'error': str(e.args[0]) if e.args else 'introuvable'}
+        except ValueError as e:
+            status, payload = 400, {'error': str(e)}
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.server.latency.record(latency_ms)
+        payload = {**payload, 'latency_ms': round(latency_ms, 3)}  # Copie : payload peut venir du cache LRU
+
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Response-Time-ms', f"{latency_ms:.3f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def route(self, parts, query):
+        store = self.server.store
+        if parts == ['health']:
+            return {'status': 'ok', 'strains': len(store.strain_names)}
+        if parts == ['strains']:
+            return {'strains': store.strain_names}
+        if len(parts) == 2 and parts[0] == 'strains':
+            return store.strain(parts[1])
+        if len(parts) == 3 and parts[0] == 'pair':
+            return store.pair(parts[1], parts[2])
+        if len(parts) == 2 and parts[0] == 'neighbors':
+            return store.neighbors(parts[1], int(query.get('k', 5)), query.get('metric', 'composite'))
+        if len(parts) == 2 and parts[0] == 'subtree':
+            height = float(query['height']) if 'height' in query else None
+            return store.subtree(parts[1], height)
+        if parts == ['stats']:
+            return {'latency': self.server.latency.summary(), 'cache': store.cache_info()}
+        raise KeyError(f"Route inconnue: {self.path}")
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def create_server(store, host='127.0.0.1', port=DEFAULT_PORT, verbose=False):
+    """Créer le serveur HTTP (port=0 pour un port libre choisi par le système)"""
+    server = ThreadingHTTPServer((host, port), ResultsRequestHandler)
+    server.daemon_threads = True
+    server.store = store
+    server.latency = LatencyTracker()
+    server.verbose = verbose
+    return server
+
+
+class ResultsClient:
+    """Client local minimal du service de résultats"""
+
+    def __init__(self, base_url=f"http://127.0.0.1:{DEFAULT_PORT}", timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def get(self, path):
+        with urllib.request.urlopen(self.base_url + path, timeout=self.timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+    def strains(self):
+        return self.get('/strains')['strains']
+
+    def strain(self, strain):
+        return self.get(f"/strains/{quote(strain, safe='')}")
+
+    def pair(self, strain1, strain2):
+        return self.get(f"/pair/{quote(strain1, safe='')}/{quote(strain2, safe='')}")
+
+    def neighbors(self, strain, k=5, metric='composite'):
+        return self.get(f"/neighbors/{quote(strain, safe='')}?k={k}&metric={metric}")
+
+    def subtree(self, strain, height=None):
+        suffix = f"?height={height}" if height is not None else ""
+        return self.get(f"/subtree/{quote(strain, safe='')}{suffix}")
+
+    def stats(self):
+        return self.get('/stats')
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Service local des résultats (HTTP/JSON)")
+    parser.add_argument('--host', default='127.0.0.1', help="Adresse d'écoute")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port d'écoute")
+    parser.add_argument('--verbose', action='store_true', help="Journaliser chaque requête")
+    args = parser.parse_args()
+
+    try:
+        store = ResultsStore()
+    except FileNotFoundError as e:
+        print_status('error', f"Résultats introuvables ({e.filename}). Exécutez d'abord les étapes 02 et 03.")
+        sys.exit(1)
+
+    server = create_server(store, args.host, args.port, args.verbose)
+    print_status('success', f"Service des résultats: http://{args.host}:{server.server_address[1]}/ "
+                            f"({len(store.strain_names)} souches)")
+    print_status('info', "Ctrl+C pour arrêter")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+        print_status('info', "Arrêt du service")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
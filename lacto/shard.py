@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Exécution fractionnée (multi-nœuds) d'un calcul toutes-paires sur un système de fichiers partagé
+
+Le triangle supérieur de la matrice des paires est découpé en blocs de
+block_size x block_size souches. Le dossier de travail contient :
+
+  manifest.json         description du calcul et liste des blocs
+  queue/<bloc>          blocs disponibles (fichiers vides)
+  claimed/<bloc>@<id>   blocs réservés par un worker (date = dernier signe de vie)
+  done/<bloc>@<id>      blocs terminés
+  results/<bloc>.json   résultats de chaque bloc (écriture atomique)
+
+Un worker réserve un bloc en le renommant de queue/ vers claimed/ : os.rename
+est atomique, un seul worker peut réussir, sans serveur ni verrou externe. Les
+réservations dont le signe de vie est trop ancien (worker arrêté) sont remises
+dans la file par requeue_stale.
+
+Usage: python3 -m lacto.shard status DOSSIER
+       python3 -m lacto.shard requeue DOSSIER --stale-after 3600
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.atomic import atomic_path
+
+MANIFEST = 'manifest.json'
+CLAIM_SEPARATOR = '@'
+
+
+def plan_blocks(n_items, block_size):
+    """Blocs (lignes, colonnes) couvrant le triangle supérieur strict des paires"""
+    bounds = [(start, min(start + block_size, n_items)) for start in range(0, n_items, block_size)]
+    blocks = []
+    for row, (row_start, row_end) in enumerate(bounds):
+        for col_start, col_end in bounds[row:]:
+            n_pairs = sum(max(0, col_end - max(col_start, i + 1)) for i in range(row_start, row_end))
+            if n_pairs:
+                blocks.append({
+                    'id': f"block_{len(blocks):05d}",
+                    'rows': [row_start, row_end],
+                    'cols': [col_start, col_end],
+                    'pairs': n_pairs,
+                })
+    return blocks
+
+
+def block_pairs(block):
+    """Paires (i, j), i < j, d'un bloc"""
+    row_start, row_end = block['rows']
+    col_start, col_end = block['cols']
+    return [(i, j) for i in range(row_start, row_end) for j in range(max(col_start, i + 1), col_end)]
+
+
+def json_default(value):
+    """Conversion des scalaires NumPy pour json.dump"""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+
+def _write_json_atomic(path, data):
+    """Écrire un JSON via un fichier temporaire puis os.replace (jamais de fichier partiel)"""
+    with atomic_path(path) as temporary, open(temporary, 'w') as f:
+        json.dump(data, f, indent=2, default=json_default)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def create_shard_plan(shard_dir, items, block_size, metadata=None):
+    """Créer le dossier de travail : manifeste et file des blocs"""
+    if os.path.exists(os.path.join(shard_dir, MANIFEST)):
+        raise FileExistsError(f"Un plan existe déjà dans {shard_dir}")
+    for sub in ('queue', 'claimed', 'done', 'results'):
+        os.makedirs(os.path.join(shard_dir, sub), exist_ok=True)
+
+    blocks = plan_blocks(len(items), block_size)
+    manifest = {
+        'items': list(items),
+        'block_size': block_size,
+        'blocks': blocks,
+        'metadata': metadata or {},
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    _write_json_atomic(os.path.join(shard_dir, MANIFEST), manifest)
+    for block in blocks:
+        open(os.path.join(shard_dir, 'queue', block['id']), 'w').close()
+    return manifest
+
+
+def load_manifest(shard_dir):
+    with open(os.path.join(shard_dir, MANIFEST), 'r') as f:
+        return json.load(f)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def claim_next_block(shard_dir, worker_id):
+    """Réserver le prochain bloc disponible (None si la file est vide)"""
+    queue_dir = os.path.join(shard_dir, 'queue')
+    for block_id in sorted(os.listdir(queue_dir)):
+        claim = os.path.join(shard_dir, 'claimed', f"{block_id}{CLAIM_SEPARATOR}{worker_id}")
+        try:
+            os.rename(os.path.join(queue_dir, block_id), claim)
+        except FileNotFoundError:
+            continue  # Réservé entre-temps par un autre worker
+        os.utime(claim)
+        return block_id
+    return None
+
+
+def _claim_path(shard_dir, block_id, worker_id):
+    return os.path.join(shard_dir, 'claimed', f"{block_id}{CLAIM_SEPARATOR}{worker_id}")
+
+
+def heartbeat(shard_dir, block_id, worker_id):
+    """Signe de vie d'un worker sur son bloc"""
+    try:
+        os.utime(_claim_path(shard_dir, block_id, worker_id))
+    except FileNotFoundError:
+        pass
+
+
+def complete_block(shard_dir, block_id, worker_id, result):
+    """Enregistrer le résultat d'un bloc puis le marquer terminé
+
+    Retourne False si la réservation a été reprise entre-temps (requeue_stale) :
+    le résultat écrit reste valable et le bloc est retiré de la file s'il n'a
+    pas déjà été réservé par un autre worker.
+    """
+    _write_json_atomic(os.path.join(shard_dir, 'results', f"{block_id}.json"), result)
+    done = os.path.join(shard_dir, 'done', f"{block_id}{CLAIM_SEPARATOR}{worker_id}")
+    try:
+        os.rename(_claim_path(shard_dir, block_id, worker_id), done)
+    except FileNotFoundError:
+        try:
+            os.rename(os.path.join(shard_dir, 'queue', block_id), done)
+        except FileNotFoundError:
+            pass  # Réservé par un autre worker, qui réécrira le même résultat
+        return False
+    return True
+
+
+def release_block(shard_dir, block_id, worker_id):
+    """Remettre un bloc réservé dans la file (échec du worker)"""
+    try:
+        os.rename(_claim_path(shard_dir, block_id, worker_id), os.path.join(shard_dir, 'queue', block_id))
+    except FileNotFoundError:
+        pass
+
+
+def requeue_stale(shard_dir, max_age):
+    """Remettre dans la file les blocs réservés sans signe de vie depuis max_age secondes"""
+    claimed_dir = os.path.join(shard_dir, 'claimed')
+    now = time.time()
+    requeued = []
+    for name in os.listdir(claimed_dir):
+        path = os.path.join(claimed_dir, name)
+        try:
+            if now - os.path.getmtime(path) <= max_age:
+                continue
+            block_id = name.split(CLAIM_SEPARATOR, 1)[0]
+            os.rename(path, os.path.join(shard_dir, 'queue', block_id))
+            requeued.append(block_id)
+        except FileNotFoundError:
+            continue
+    return requeued
+
+
+def block_status(shard_dir):
+    """Nombre de blocs en attente, réservés et terminés"""
+    return {state: len(os.listdir(os.path.join(shard_dir, state))) for state in ('queue', 'claimed', 'done')}
+
+
+def run_worker(shard_dir, process_block, worker_id=None, stale_after=None):
+    """Traiter des blocs jusqu'à épuisement de la file
+
+    process_block(manifest, block, beat) retourne le résultat (sérialisable en
+    JSON) ; beat() signale que le worker est toujours actif.
+    """
+    worker_id = worker_id or default_worker_id()
+    manifest = load_manifest(shard_dir)
+    blocks = {block['id']: block for block in manifest['blocks']}
+
+    processed = 0
+    while True:
+        if stale_after:
+            for block_id in requeue_stale(shard_dir, stale_after):
+                print_status('warning', f"{block_id}: réservation expirée, remis dans la file")
+        block_id = claim_next_block(shard_dir, worker_id)
+        if block_id is None:
+            break
+        try:
+            result = process_block(manifest, blocks[block_id],
+                                   lambda: heartbeat(shard_dir, block_id, worker_id))
+        except BaseException:
+            release_block(shard_dir, block_id, worker_id)
+            raise
+        if not complete_block(shard_dir, block_id, worker_id, result):
+            print_status('warning', f"{block_id}: réservation reprise pendant le calcul, résultat conservé")
+        processed += 1
+        print_status('success', f"[{worker_id}] {block_id}: {blocks[block_id]['pairs']} paires")
+    return processed
+
+
+def load_block_results(shard_dir):
+    """Résultats de tous les blocs (erreur si des blocs ne sont pas terminés)"""
+    manifest = load_manifest(shard_dir)
+    missing = [block['id'] for block in manifest['blocks']
+               if not os.path.exists(os.path.join(shard_dir, 'results', f"{block['id']}.json"))]
+    if missing:
+        raise RuntimeError(f"{len(missing)} blocs non terminés: {', '.join(missing[:5])}"
+                           f"{'...' if len(missing) > 5 else ''}")
+    results = []
+    for block in manifest['blocks']:
+        with open(os.path.join(shard_dir, 'results', f"{block['id']}.json"), 'r') as f:
+            results.append(json.load(f))
+    return manifest, results
+
+
+def launch_local_workers(command, n_processes):
+    """Lancer n_processes workers locaux (même commande) et attendre leur fin"""
+    processes = [subprocess.Popen(command) for _ in range(n_processes)]
+    return [process.wait() for process in processes]
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="File de blocs sur système de fichiers partagé")
+    parser.add_argument('action', choices=['status', 'requeue'])
+    parser.add_argument('shard_dir', help="Dossier de travail")
+    parser.add_argument('--stale-after', type=float, default=3600,
+                        help="Âge (s) au-delà duquel une réservation est remise dans la file")
+    args = parser.parse_args()
+
+    if args.action == 'requeue':
+        requeued = requeue_stale(args.shard_dir, args.stale_after)
+        print_status('success', f"{len(requeued)} blocs remis dans la file")
+    status = block_status(args.shard_dir)
+    print_status('info', f"En attente: {status['queue']}, réservés: {status['claimed']}, terminés: {status['done']}")
+
+
+if __name__ == "__main__":
+    main()
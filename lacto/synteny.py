@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Synténie par ancres de minimiseurs et matrices de points à l'échelle du génome
+
+  - Index : pour chaque fenêtre de w k-mers consécutifs, le k-mer canonique de
+    hachage minimal (minimiseur) est retenu avec sa position et son brin.
+  - Ancres : jointure des deux index triés par hachage (searchsorted), les
+    minimiseurs trop fréquents (répétitions) étant écartés.
+  - Blocs : les ancres de même orientation sont regroupées par diagonale
+    (pos2 - pos1, ou pos2 + pos1 pour le brin inverse) puis découpées aux
+    trous de plus de max_gap pb ; un bloc colinéaire compte au moins
+    min_anchors ancres.
+  - Chaîne 1:1 : les blocs contenus dans un bloc plus grand sur l'un des
+    deux génomes (copies de répétitions, fragments) sont écartés.
+  - Réarrangements : points de cassure entre blocs consécutifs sur le premier
+    génome, inversions (blocs dans l'orientation minoritaire) et fraction
+    de chaque génome couverte par des blocs de synténie.
+  - Matrice de points : les ancres sont rastérisées en une image de
+    pixels x pixels (comptes par pixel) au lieu de tracer chaque point.
+
+Usage: python3 -m lacto.synteny data/genomes/LB_DSM20081.fna data/genomes/LB_CNCM1519.fna
+"""
+
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.contigs import as_contig_set, kmer_start_mask, load_contig_set
+from lacto.kernels import rolling_kmers, sliding_argmin
+
+DEFAULT_K = 15
+DEFAULT_WINDOW = 10
+MAX_OCCURRENCES = 8
+MAX_DIAGONAL_DRIFT = 500
+MAX_GAP = 20000
+MIN_ANCHORS = 10
+EMPTY_HASH = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _mix64(values):
+    """Hachage inversible de k-mers uint64 (évite de favoriser les poly-A)"""
+    with np.errstate(over='ignore'):
+        values = values ^ (values >> np.uint64(31))
+        values = values * np.uint64(0x7FB5D329728EA185)
+        values = values ^ (values >> np.uint64(27))
+        values = values * np.uint64(0x81DADEF4BC2DD44D)
+        return values ^ (values >> np.uint64(33))
+
+
+def minimizer_index(contigs, k=DEFAULT_K, w=DEFAULT_WINDOW, codes=None):
+    """Minimiseurs (w, k) d'un génome : hachages triés, positions et brins"""
+    contigs = as_contig_set(contigs)
+    codes, valid = kmer_start_mask(contigs, k, codes)
+    n_kmers = len(valid)
+
+    forward, reverse = rolling_kmers(codes[:n_kmers + k - 1], k)
+
+    hashes = _mix64(np.minimum(forward, reverse))
+    hashes[~valid] = EMPTY_HASH
+    strands = reverse < forward
+
+    if n_kmers >= w:
+        positions = np.unique(sliding_argmin(hashes, w))
+    else:
+        positions = np.arange(n_kmers) if n_kmers else np.zeros(0, dtype=np.int64)
+    positions = positions[hashes[positions] != EMPTY_HASH]
+
+    order = np.argsort(hashes[positions], kind='stable')
+    positions = positions[order]
+    return {
+        'hashes': hashes[positions],
+        'positions': positions.astype(np.int64),
+        'strands': strands[positions],
+        'k': k,
+        'w': w,
+        'names': contigs['names'],
+        'offsets': contigs['offsets'],
+        'lengths': contigs['lengths'],
+        'total_length': contigs['total_length'],
+    }
+
+
+def _frequent(hashes, max_occurrences):
+    """Masque des minimiseurs présents plus de max_occurrences fois"""
+    values, counts = np.unique(hashes, return_counts=True)
+    return np.isin(hashes, values[counts > max_occurrences])
+
+
+def find_anchors(index1, index2, max_occurrences=MAX_OCCURRENCES):
+    """Ancres partagées (pos1, pos2, inverse) par jointure des hachages triés"""
+    keep1 = ~_frequent(index1['hashes'], max_occurrences)
+    keep2 = ~_frequent(index2['hashes'], max_occurrences)
+    hashes1 = index1['hashes'][keep1]
+    hashes2 = index2['hashes'][keep2]
+
+    low = np.searchsorted(hashes2, hashes1, side='left')
+    high = np.searchsorted(hashes2, hashes1, side='right')
+    counts = high - low
+    total = int(counts.sum())
+
+    rows1 = np.repeat(np.arange(len(hashes1)), counts)
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    rows2 = np.repeat(low, counts) + (np.arange(total) - first)
+
+    return {
+        'pos1': index1['positions'][keep1][rows1],
+        'pos2': index2['positions'][keep2][rows2],
+        'reverse': index1['strands'][keep1][rows1] != index2['strands'][keep2][rows2],
+    }
+
+
+def _split_points(values, threshold):
+    """Indices de début de segment quand l'écart entre valeurs consécutives dépasse threshold"""
+    starts = np.ones(len(values), dtype=bool)
+    starts[1:] = np.diff(values) > threshold
+    return np.cumsum(starts) - 1
+
+
+def chain_anchors(anchors, k=DEFAULT_K, max_drift=MAX_DIAGONAL_DRIFT, max_gap=MAX_GAP,
+                  min_anchors=MIN_ANCHORS):
+    """Regrouper les ancres en blocs colinéaires (brin direct et inverse)"""
+    pos1, pos2, reverse = anchors['pos1'], anchors['pos2'], anchors['reverse']
+    columns = ['start1', 'end1', 'start2', 'end2', 'reverse', 'anchors']
+    if len(pos1) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Diagonale (brin direct) ou anti-diagonale (brin inverse)
+    diagonal = np.where(reverse, pos2 + pos1, pos2 - pos1)
+    order = np.lexsort((diagonal, reverse))
+    band = np.zeros(len(order), dtype=np.int64)
+    for flag in (False, True):
+        members = order[reverse[order] == flag]
+        if len(members):
+            band[members] = _split_points(diagonal[members], max_drift) + (band.max() + 1 if flag else 0)
+
+    # Découpage de chaque bande aux trous sur le premier génome
+    order = np.lexsort((pos1, band))
+    new_block = np.ones(len(order), dtype=bool)
+    new_block[1:] = (band[order][1:] != band[order][:-1]) | (np.diff(pos1[order]) > max_gap)
+    block_of = np.cumsum(new_block) - 1
+    starts = np.flatnonzero(new_block)
+
+    sorted1, sorted2 = pos1[order], pos2[order]
+    blocks = pd.DataFrame({
+        'start1': np.minimum.reduceat(sorted1, starts),
+        'end1': np.maximum.reduceat(sorted1, starts) + k,
+        'start2': np.minimum.reduceat(sorted2, starts),
+        'end2': np.maximum.reduceat(sorted2, starts) + k,
+        'reverse': reverse[order][starts],
+        'anchors': np.bincount(block_of),
+    }, columns=columns)
+    blocks = blocks[blocks['anchors'] >= min_anchors]
+    return blocks.sort_values('start1').reset_index(drop=True)
+
+
+def one_to_one_blocks(blocks):
+    """Chaîne 1:1 des blocs : les blocs inclus dans un bloc plus grand sur l'un des génomes sont écartés
+
+    Les blocs sont examinés du plus grand au plus petit (nombre d'ancres) ;
+    un bloc dont l'intervalle sur le premier ou le second génome est contenu
+    dans celui d'un bloc déjà retenu est une copie (répétition) ou un
+    fragment du bloc retenu, pas un segment colinéaire distinct.
+    """
+    if len(blocks) == 0:
+        return blocks
+    order = np.lexsort((blocks['start1'].to_numpy(), -blocks['anchors'].to_numpy()))
+    start1, end1 = blocks['start1'].to_numpy()[order], blocks['end1'].to_numpy()[order]
+    start2, end2 = blocks['start2'].to_numpy()[order], blocks['end2'].to_numpy()[order]
+    kept = np.zeros(len(order), dtype=bool)
+    for row in range(len(order)):
+        contained = (((start1[kept] <= start1[row]) & (end1[row] <= end1[kept]))
+                     | ((start2[kept] <= start2[row]) & (end2[row] <= end2[kept])))
+        kept[row] = not contained.any()
+    return blocks.iloc[np.sort(order[kept])].reset_index(drop=True)
+
+
+def _covered_length(starts, ends, total_length):
+    """Nombre de bases couvertes par l'union d'intervalles [start, end)"""
+    size = total_length + 1
+    marks = (np.bincount(np.minimum(starts, total_length), minlength=size)
+             - np.bincount(np.minimum(ends, total_length), minlength=size))
+    return int((np.cumsum(marks)[:-1] > 0).sum())
+
+
+def rearrangements(blocks):
+    """Points de cassure et inversions entre blocs consécutifs sur le premier génome"""
+    if len(blocks) == 0:
+        return {'breakpoints': 0, 'inversions': 0, 'main_orientation': '+'}
+
+    length = blocks['end1'] - blocks['start1']
+    reverse = blocks['reverse'].to_numpy()
+    main_reverse = length[reverse].sum() > length[~reverse].sum()
+    inverted = reverse != main_reverse
+
+    # Rang de chaque bloc sur le second génome, dans le sens de l'orientation principale
+    rank2 = np.argsort(np.argsort(blocks['start2'].to_numpy(), kind='stable'))
+    step = -1 if main_reverse else 1
+    collinear = (inverted[1:] == inverted[:-1]) & (np.diff(rank2) == np.where(inverted[1:], -step, step))
+
+    inversion_starts = inverted & np.concatenate(([True], ~inverted[:-1]))
+    return {
+        'breakpoints': int((~collinear).sum()),
+        'inversions': int(inversion_starts.sum()),
+        'main_orientation': '-' if main_reverse else '+',
+    }
+
+
+def compare_synteny(genome1, genome2, k=DEFAULT_K, w=DEFAULT_WINDOW):
+    """Synténie complète entre deux génomes : ancres, blocs, réarrangements et couverture"""
+    return synteny_from_indexes(minimizer_index(genome1, k, w), minimizer_index(genome2, k, w))
+
+
+def synteny_from_indexes(index1, index2):
+    """Synténie de deux génomes à partir de leurs index de minimiseurs (réutilisables d'une paire à l'autre)"""
+    anchors = find_anchors(index1, index2)
+    blocks = one_to_one_blocks(chain_anchors(anchors, index1['k']))
+
+    covered1 = _covered_length(blocks['start1'].to_numpy(np.int64), blocks['end1'].to_numpy(np.int64),
+                               index1['total_length'])
+    covered2 = _covered_length(blocks['start2'].to_numpy(np.int64), blocks['end2'].to_numpy(np.int64),
+                               index2['total_length'])
+    total = index1['total_length'] + index2['total_length']
+
+    return {
+        'anchors': anchors,
+        'blocks': blocks,
+        'index1': index1,
+        'index2': index2,
+        'synteny_fraction1': covered1 / index1['total_length'] if index1['total_length'] else 0.0,
+        'synteny_fraction2': covered2 / index2['total_length'] if index2['total_length'] else 0.0,
+        'synteny_fraction': (covered1 + covered2) / total if total else 0.0,
+        **rearrangements(blocks),
+    }
+
+
+def locate(index, positions):
+    """Convertir des positions globales en (nom du contig, position 1-based dans le contig)"""
+    rows = np.searchsorted(index['offsets'], positions, side='right') - 1
+    rows = np.clip(rows, 0, len(index['names']) - 1)
+    return [index['names'][row] for row in rows], positions - index['offsets'][rows] + 1
+
+
+def blocks_table(synteny):
+    """Blocs de synténie en coordonnées contig (1-based, bornes incluses)"""
+    blocks = synteny['blocks']
+    contig1, start1 = locate(synteny['index1'], blocks['start1'].to_numpy(np.int64))
+    contig2, start2 = locate(synteny['index2'], blocks['start2'].to_numpy(np.int64))
+    return pd.DataFrame({
+        'contig1': contig1,
+        'start1': start1,
+        'end1': start1 + (blocks['end1'] - blocks['start1']).to_numpy() - 1,
+        'contig2': contig2,
+        'start2': start2,
+        'end2': start2 + (blocks['end2'] - blocks['start2']).to_numpy() - 1,
+        'strand': np.where(blocks['reverse'], '-', '+'),
+        'anchors': blocks['anchors'].to_numpy(),
+    })
+
+
+def dotplot_raster(synteny, pixels=1000):
+    """Image (2, pixels, pixels) des comptes d'ancres par pixel : brin direct, brin inverse"""
+    anchors = synteny['anchors']
+    length1 = max(synteny['index1']['total_length'], 1)
+    length2 = max(synteny['index2']['total_length'], 1)
+    x = np.minimum(anchors['pos1'] * pixels // length1, pixels - 1)
+    y = np.minimum(anchors['pos2'] * pixels // length2, pixels - 1)
+    cells = anchors['reverse'].astype(np.int64) * pixels * pixels + y * pixels + x
+    return np.bincount(cells, minlength=2 * pixels * pixels).reshape(2, pixels, pixels)
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Synténie par ancres de minimiseurs")
+    parser.add_argument('fasta1', help="Premier génome (FASTA)")
+    parser.add_argument('fasta2', help="Second génome (FASTA)")
+    parser.add_argument('-k', type=int, default=DEFAULT_K, help="Taille des k-mers")
+    parser.add_argument('-w', type=int, default=DEFAULT_WINDOW, help="Fenêtre des minimiseurs")
+    parser.add_argument('--output', help="Fichier TSV des blocs de synténie")
+    args = parser.parse_args()
+
+    synteny = compare_synteny(load_contig_set(args.fasta1), load_contig_set(args.fasta2), args.k, args.w)
+    print_status('success', f"{len(synteny['anchors']['pos1']):,} ancres, {len(synteny['blocks'])} blocs, "
+                            f"synténie {synteny['synteny_fraction'] * 100:.1f}%, "
+                            f"{synteny['breakpoints']} points de cassure, {synteny['inversions']} inversions")
+    table = blocks_table(synteny)
+    if args.output:
+        table.to_csv(args.output, sep='\t', index=False)
+        print_status('success', f"Blocs de synténie: {args.output}")
+    else:
+        print(table.head(20).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
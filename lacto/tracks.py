@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Pistes génomiques multi-résolution (pyramides de zoom, format type bigWig)
+
+Un seul passage sur le génome encodé compte les bases (A, C, G, T, N, autres)
+par intervalle de la résolution la plus fine. Les niveaux plus grossiers sont
+obtenus en sommant ces comptes (sans relire la séquence) et toutes les pistes
+sont dérivées des comptes de chaque niveau :
+
+  - gc                 contenu GC (%)
+  - gc_skew            (G - C) / (G + C)
+  - cumulative_skew    somme cumulée de G - C le long de chaque contig, rapportée
+                       au total G + C du contig (même courbe à tous les niveaux)
+  - entropy            entropie de Shannon de la composition (bits, 0 à 2)
+  - ambiguous_density  fraction de bases ambiguës (N et codes IUPAC)
+
+Les intervalles ne chevauchent jamais deux contigs. Le fichier .tracks contient
+un en-tête JSON suivi des pistes en float32, relues en mémoire partagée.
+
+Usage: python3 -m lacto.tracks data/genomes/LB_DSM20081.fna --output DSM20081.tracks
+"""
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.contigs import BASE_CLASSES, N_BASE_CLASSES, as_contig_set, contig_ids, load_contig_set
+
+TRACK_NAMES = ['gc', 'gc_skew', 'cumulative_skew', 'entropy', 'ambiguous_density']
+DEFAULT_LEVELS = (100, 1000, 10000, 100000)
+MAGIC = b'LACTOTRK1\n'
+
+
+def count_bins(contigs, bin_size):
+    """Comptes (A, C, G, T, N, autres) par intervalle, en un seul passage"""
+    lengths = contigs['lengths']
+    bins_per_contig = -(-lengths // bin_size)
+    first_bin = np.concatenate(([0], np.cumsum(bins_per_contig)[:-1]))
+
+    ids = contig_ids(contigs)
+    position_in_contig = np.arange(len(ids)) - contigs['offsets'][:-1][ids]
+    bin_index = first_bin[ids] + position_in_contig // bin_size
+
+    classes = BASE_CLASSES[contigs['sequence']]
+    n_bins = int(bins_per_contig.sum())
+    counts = np.bincount(bin_index * N_BASE_CLASSES + classes, minlength=n_bins * N_BASE_CLASSES)
+    return counts.reshape(n_bins, N_BASE_CLASSES), bins_per_contig
+
+
+def coarsen_bins(counts, bins_per_contig, factor):
+    """Regrouper les intervalles par paquets de factor, contig par contig"""
+    coarse_per_contig = -(-bins_per_contig // factor)
+    first_fine = np.concatenate(([0], np.cumsum(bins_per_contig)[:-1]))
+    first_coarse = np.concatenate(([0], np.cumsum(coarse_per_contig)[:-1]))
+
+    contig_of_bin = np.repeat(np.arange(len(bins_per_contig)), bins_per_contig)
+    rank = np.arange(len(counts)) - first_fine[contig_of_bin]
+    target = first_coarse[contig_of_bin] + rank // factor
+
+    n_coarse = int(coarse_per_contig.sum())
+    coarse = np.zeros((n_coarse, counts.shape[1]), dtype=counts.dtype)
+    for column in range(counts.shape[1]):
+        coarse[:, column] = np.bincount(target, weights=counts[:, column], minlength=n_coarse)
+    return coarse, coarse_per_contig
+
+
+def tracks_from_counts(counts, bins_per_contig):
+    """Dériver toutes les pistes des comptes de bases d'un niveau"""
+    counts = counts.astype(np.float64)
+    a, c, g, t = counts[:, 0], counts[:, 1], counts[:, 2], counts[:, 3]
+    acgt = a + c + g + t
+    total = counts.sum(axis=1)
+
+    gc = np.zeros(len(counts))
+    np.divide((g + c) * 100.0, acgt, out=gc, where=acgt > 0)
+    skew = np.zeros(len(counts))
+    np.divide(g - c, g + c, out=skew, where=(g + c) > 0)
+
+    # Somme cumulée des comptes G - C, remise à zéro au début de chaque contig et divisée par
+    # le total G + C du contig : en fin d'intervalle, la valeur ne dépend pas de la résolution
+    excess = np.cumsum(g - c)
+    contig_start = np.concatenate(([0], np.cumsum(bins_per_contig)[:-1]))
+    before_contig = np.where(contig_start > 0, excess[np.maximum(contig_start - 1, 0)], 0.0)
+    excess -= np.repeat(before_contig, bins_per_contig)
+    contig_of_bin = np.repeat(np.arange(len(bins_per_contig)), bins_per_contig)
+    contig_gc = np.bincount(contig_of_bin, weights=g + c, minlength=len(bins_per_contig))[contig_of_bin]
+    cumulative = np.zeros(len(counts))
+    np.divide(excess, contig_gc, out=cumulative, where=contig_gc > 0)
+
+    frequencies = np.zeros((len(counts), 4))
+    np.divide(counts[:, :4], acgt[:, None], out=frequencies, where=acgt[:, None] > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropy = -np.where(frequencies > 0, frequencies * np.log2(frequencies), 0.0).sum(axis=1)
+
+    ambiguous = np.zeros(len(counts))
+    np.divide(counts[:, 4] + counts[:, 5], total, out=ambiguous, where=total > 0)
+
+    return {
+        'gc': gc,
+        'gc_skew': skew,
+        'cumulative_skew': cumulative,
+        'entropy': entropy,
+        'ambiguous_density': ambiguous,
+    }
+
+
+def build_track_pyramid(contigs, levels=DEFAULT_LEVELS):
+    """Construire toutes les pistes à tous les niveaux de zoom
+
+    Chaque niveau doit être un multiple du précédent.
+    """
+    contigs = as_contig_set(contigs)
+    levels = sorted(levels)
+    for finer, coarser in zip(levels, levels[1:]):
+        if coarser % finer:
+            raise ValueError(f"Niveaux de zoom incompatibles: {coarser} n'est pas un multiple de {finer}")
+
+    counts, bins_per_contig = count_bins(contigs, levels[0])
+    pyramid = {}
+    previous = levels[0]
+    for bin_size in levels:
+        if bin_size != previous:
+            counts, bins_per_contig = coarsen_bins(counts, bins_per_contig, bin_size // previous)
+            previous = bin_size
+        pyramid[bin_size] = {
+            'bins_per_contig': bins_per_contig,
+            'tracks': tracks_from_counts(counts, bins_per_contig),
+        }
+    return pyramid
+
+
+def write_track_file(pyramid, contigs, path):
+    """Écrire la pyramide : en-tête JSON puis blocs float32 contigus"""
+    contigs = as_contig_set(contigs)
+    header = {
+        'contigs': contigs['names'],
+        'lengths': [int(length) for length in contigs['lengths']],
+        'tracks': TRACK_NAMES,
+        'levels': {},
+    }
+    blocks = []
+    offset = 0
+    for bin_size, level in pyramid.items():
+        entry = {'bins_per_contig': [int(n) for n in level['bins_per_contig']], 'offsets': {}}
+        for name in TRACK_NAMES:
+            block = level['tracks'][name].astype(np.float32)
+            entry['offsets'][name] = offset
+            offset += block.nbytes
+            blocks.append(block)
+        header['levels'][str(bin_size)] = entry
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.array([len(header_bytes)], dtype='<u8').tobytes())
+        f.write(header_bytes)
+        for block in blocks:
+            f.write(block.astype('<f4').tobytes())
+
+
+class TrackFile:
+    """Lecture d'un fichier .tracks (mmap) et choix du niveau de zoom"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Fichier de pistes invalide: {path}")
+            header_length = int(np.frombuffer(f.read(8), dtype='<u8')[0])
+            self.header = json.loads(f.read(header_length).decode('utf-8'))
+        self.data_offset = len(MAGIC) + 8 + header_length
+        self.path = path
+        self.levels = sorted(int(level) for level in self.header['levels'])
+        self.contigs = self.header['contigs']
+        self.lengths = dict(zip(self.contigs, self.header['lengths']))
+        self._data = np.memmap(path, dtype='<f4', mode='r', offset=self.data_offset) \
+            if os.path.getsize(path) > self.data_offset else np.zeros(0, dtype='<f4')
+
+    def choose_level(self, span, pixels):
+        """Niveau le plus fin ayant au plus un intervalle par pixel"""
+        for bin_size in self.levels:
+            if span / bin_size <= pixels:
+                return bin_size
+        return self.levels[-1]
+
+    def track(self, name, bin_size, contig=None):
+        """Valeurs d'une piste à un niveau (tout le génome ou un contig)"""
+        level = self.header['levels'][str(bin_size)]
+        n_bins = sum(level['bins_per_contig'])
+        start = level['offsets'][name] // 4
+        values = self._data[start:start + n_bins]
+        if contig is None:
+            return values
+        row = self.contigs.index(contig)
+        first = sum(level['bins_per_contig'][:row])
+        return values[first:first + level['bins_per_contig'][row]]
+
+    def positions(self, bin_size, contig=None):
+        """Position (pb) du milieu de chaque intervalle, cumulée sur les contigs si contig=None"""
+        level = self.header['levels'][str(bin_size)]
+        names = [contig] if contig is not None else self.contigs
+        positions, offset = [], 0
+        for name in names:
+            n_bins = level['bins_per_contig'][self.contigs.index(name)]
+            length = self.lengths[name]
+            positions.append(offset + np.minimum(np.arange(n_bins) * bin_size + bin_size / 2, length))
+            offset += length
+        return np.concatenate(positions) if positions else np.zeros(0)
+
+    def fetch(self, name, pixels, contig=None, start=0, end=None):
+        """(positions, valeurs) d'une piste au niveau adapté à la largeur en pixels"""
+        span_total = self.lengths[contig] if contig is not None else sum(self.header['lengths'])
+        end = span_total if end is None else end
+        bin_size = self.choose_level(end - start, pixels)
+        positions = self.positions(bin_size, contig)
+        values = np.asarray(self.track(name, bin_size, contig))
+        keep = (positions >= start) & (positions < end)
+        return positions[keep], values[keep], bin_size
+
+
+def build_track_file(contigs, path, levels=DEFAULT_LEVELS):
+    """Calculer la pyramide d'un génome et l'écrire dans path"""
+    pyramid = build_track_pyramid(contigs, levels)
+    write_track_file(pyramid, contigs, path)
+    return pyramid
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Pistes génomiques multi-résolution")
+    parser.add_argument('fasta', help="Génome au format FASTA")
+    parser.add_argument('--output', required=True, help="Fichier .tracks de sortie")
+    parser.add_argument('--levels', type=int, nargs='+', default=list(DEFAULT_LEVELS),
+                        help="Tailles d'intervalle des niveaux de zoom (pb)")
+    args = parser.parse_args()
+
+    contigs = load_contig_set(args.fasta)
+    build_track_file(contigs, args.output, args.levels)
+    print_status('success', f"Pistes: {args.output} (niveaux: {', '.join(map(str, sorted(args.levels)))} pb)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Surveillance du dossier des génomes : traitement incrémental des dépôts
+
+Le dossier est scruté à intervalle régulier (stdlib, aucun service système
+requis). Un fichier n'est traité qu'une fois stable : même taille et même
+date de modification pendant settle secondes (copie ou téléchargement en
+cours ignorés). Pour chaque génome nouveau ou modifié, seuls son analyse,
+son profil et ses comparaisons avec les génomes déjà présents sont calculés ;
+les contigs, analyses, profils et paires des autres génomes restent en
+mémoire entre deux dépôts. Les sorties des étapes 2 à 4 (tableaux, matrices,
+graphiques, rapport HTML) sont ensuite réécrites atomiquement.
+
+Le pangénome k-mers n'est pas recalculé (python3 -m lacto pangenome).
+
+Usage: python3 -m lacto.watch [--interval 2] [--settle 5] [--once]
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+sys.path.append('.')
+from lacto.console import print_status
+from lacto.analysis import analyze_fasta_file, write_analysis_outputs
+from lacto.comparison import (load_genome_sequences, genome_inputs, compare_genome_pair, pair_record,
+                              dotplot_data, new_comparison_data, store_pair, print_pair,
+                              write_comparison_outputs)
+from lacto.metrics import COMPARISON_PARAMS, metric_selection
+from lacto.report import results_from_memory, write_report
+
+try:
+    from config import STRAINS, PATHS
+except ImportError:
+    STRAINS = {}
+    PATHS = {"genomes": "data/genomes", "analysis": "data/analysis", "results": "data/results"}
+
+GENOME_EXTENSIONS = ('.fna', '.fa', '.fasta', '.fna.gz', '.fa.gz', '.fasta.gz')
+
+
+def strain_for_file(filename):
+    """Nom de souche d'un fichier génome (STRAINS, sinon nom du fichier sans préfixe LB_ ni extension)"""
+    for strain, info in STRAINS.items():
+        if info['filename'] == filename:
+            return strain
+    name = filename
+    for extension in GENOME_EXTENSIONS:
+        if name.endswith(extension):
+            name = name[:-len(extension)]
+            break
+    return name[3:] if name.startswith('LB_') else name
+
+
+def scan_genomes(genome_dir):
+    """Génomes présents : souche -> (chemin, taille, date de modification en ns)"""
+    genomes = {}
+    for filename in sorted(os.listdir(genome_dir)):
+        if filename.startswith('.') or not filename.endswith(GENOME_EXTENSIONS):
+            continue
+        path = os.path.join(genome_dir, filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        genomes[strain_for_file(filename)] = (path, stat.st_size, stat.st_mtime_ns)
+    return genomes
+
+
+class DirectoryPoller:
+    """Détection des génomes ajoutés, modifiés ou supprimés, avec anti-rebond"""
+
+    def __init__(self, genome_dir, settle=5.0):
+        self.genome_dir = genome_dir
+        self.settle = settle
+        self.processed = {}   # souche -> signature (chemin, taille, mtime) déjà traitée
+        self._pending = {}    # souche -> (signature, date depuis laquelle elle est stable)
+
+    def poll(self, now=None):
+        """Génomes prêts à traiter {souche: chemin} et souches supprimées"""
+        now = time.monotonic() if now is None else now
+        current = scan_genomes(self.genome_dir)
+
+        ready = {}
+        for strain, signature in current.items():
+            if self.processed.get(strain) == signature:
+                self._pending.pop(strain, None)
+                continue
+            previous = self._pending.get(strain)
+            if previous is None or previous[0] != signature:
+                self._pending[strain] = (signature, now)  # Nouveau ou encore en cours d'écriture
+            elif signature[1] > 0 and now - previous[1] >= self.settle:
+                ready[strain] = signature[0]
+
+        removed = [strain for strain in self.processed if strain not in current]
+        for strain in removed:
+            del self.processed[strain]
+        for strain in [strain for strain in self._pending if strain not in current]:
+            del self._pending[strain]
+        return ready, removed
+
+    def mark_processed(self, strain):
+        """Enregistrer la signature traitée (celle relevée avant la lecture du fichier)"""
+        self.processed[strain] = self._pending.pop(strain)[0]
+
+
+class WarmPanel:
+    """Génomes, analyses, profils et paires gardés en mémoire entre deux dépôts"""
+
+    def __init__(self, selection=None, dotplots=None):
+        self.selection = selection or metric_selection()
+        self.dotplots = COMPARISON_PARAMS.get('dotplots', False) if dotplots is None else dotplots
+        self.genomes = {}
+        self.analyses = {}
+        self.inputs = {}  # Entrées précalculées des métriques (lacto.metrics)
+        self.pairs = {}   # (souche1, souche2) dans l'ordre du panel -> pair_record
+        self.new_dotplots = {}  # Matrices de points des paires comparées depuis la dernière écriture
+
+    def strain_names(self):
+        """Ordre du panel : souches de STRAINS puis nouvelles souches par nom"""
+        known = [strain for strain in STRAINS if strain in self.genomes]
+        return known + sorted(strain for strain in self.genomes if strain not in STRAINS)
+
+    def remove(self, strain):
+        for store in (self.genomes, self.analyses, self.inputs):
+            store.pop(strain, None)
+        self.pairs = {pair: record for pair, record in self.pairs.items() if strain not in pair}
+        self.new_dotplots = {pair: dotplot for pair, dotplot in self.new_dotplots.items() if strain not in pair}
+
+    def update(self, strain, path):
+        """Analyser un génome nouveau ou modifié et le comparer aux génomes présents"""
+        contigs = load_genome_sequences(path)
+        if contigs is None:
+            return False
+        stats = analyze_fasta_file(path, strain, contigs=contigs)
+        if stats is None:
+            return False
+
+        self.remove(strain)
+        self.genomes[strain] = contigs
+        self.analyses[strain] = stats
+        self.inputs[strain] = genome_inputs(contigs, self.selection['metrics'])
+
+        order = self.strain_names()
+        for other in order:
+            if other == strain:
+                continue
+            strain1, strain2 = sorted((strain, other), key=order.index)
+            pair = compare_genome_pair(self.inputs[strain1], self.inputs[strain2], self.selection['metrics'])
+            if self.dotplots and 'synteny' in pair:
+                self.new_dotplots[(strain1, strain2)] = dotplot_data(pair['synteny'])
+            record = pair_record(pair)
+            self.pairs[(strain1, strain2)] = record
+            print_pair("Comparaison", strain1, strain2, record)
+        return True
+
+    def comparison_data(self):
+        """Matrices de comparaison du panel courant"""
+        order = self.strain_names()
+        comparison_data = new_comparison_data(order, self.selection)
+        # Paires dans l'ordre du panel (rapport de synténie identique à l'étape 3)
+        for i, j in sorted((order.index(strain1), order.index(strain2)) for strain1, strain2 in self.pairs):
+            store_pair(comparison_data, i, j, self.pairs[(order[i], order[j])])
+        comparison_data['dotplots'] = dict(self.new_dotplots)
+        return comparison_data
+
+    def write_outputs(self):
+        """Réécrire les sorties des étapes 2 à 4 depuis l'état en mémoire"""
+        order = self.strain_names()
+        analyses = [self.analyses[strain] for strain in order]
+        genome_stats = write_analysis_outputs(analyses)
+        if len(order) < 2:
+            print_status('warning', "Au moins 2 génomes sont nécessaires pour la comparaison et le rapport")
+            return
+        genome_lengths = {strain: self.genomes[strain]['total_length'] for strain in order}
+        comparison_outputs = write_comparison_outputs(self.comparison_data(), genome_lengths)
+        self.new_dotplots = {}
+        write_report(results_from_memory(analyses, genome_stats, comparison_outputs))
+
+
+def process_changes(panel, poller, ready, removed):
+    """Traiter un lot de changements ; True si les sorties doivent être réécrites"""
+    changed = bool(removed)
+    for strain in removed:
+        print_status('warning', f"{strain}: génome supprimé, retiré du panel")
+        panel.remove(strain)
+    for strain, path in sorted(ready.items()):
+        print_status('info', f"{strain}: {'mise à jour' if strain in panel.genomes else 'nouveau génome'} ({path})")
+        try:
+            updated = panel.update(strain, path)
+        except Exception as e:
+            print_status('error', f"{strain}: échec du traitement ({e}), nouvel essai au prochain changement")
+            updated = False
+        poller.mark_processed(strain)
+        changed = changed or updated
+    return changed
+
+
+def watch(genome_dir, interval=2.0, settle=5.0, once=False, dotplots=None):
+    """Boucle de surveillance (once : traiter les génomes présents puis quitter)"""
+    for directory in ('data/analysis', 'data/results/plots'):
+        os.makedirs(directory, exist_ok=True)
+    panel = WarmPanel(dotplots=dotplots)
+    poller = DirectoryPoller(genome_dir, settle=0 if once else settle)
+
+    if once:
+        poller.poll()
+    while True:
+        ready, removed = poller.poll()
+        if ready or removed:
+            start = time.monotonic()
+            if process_changes(panel, poller, ready, removed):
+                panel.write_outputs()
+                print_status('success', f"Sorties mises à jour en {time.monotonic() - start:.1f} s "
+                             f"({len(panel.genomes)} génomes)")
+            print()
+        if once:
+            return panel
+        time.sleep(interval)
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Traitement incrémental des génomes déposés dans le dossier")
+    parser.add_argument('--genomes', default=PATHS['genomes'], help="Dossier surveillé (défaut: data/genomes)")
+    parser.add_argument('--interval', type=float, default=2.0, help="Intervalle de scrutation (s, défaut: 2)")
+    parser.add_argument('--settle', type=float, default=5.0,
+                        help="Durée sans changement avant de traiter un fichier (s, défaut: 5)")
+    parser.add_argument('--once', action='store_true', help="Traiter les génomes présents puis quitter")
+    parser.add_argument('--dotplots', action='store_true', default=COMPARISON_PARAMS.get('dotplots', False),
+                        help="Matrice de points PNG de chaque nouvelle paire (~1,3 s par paire)")
+    args = parser.parse_args()
+
+    print("👀 === SURVEILLANCE DES GÉNOMES ===")
+    print(f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    print_status('info', f"Dossier: {args.genomes} (scrutation toutes les {args.interval:g} s, "
+                 f"stabilité {args.settle:g} s) - Ctrl+C pour arrêter")
+    print()
+    try:
+        watch(args.genomes, interval=args.interval, settle=args.settle, once=args.once, dotplots=args.dotplots)
+    except KeyboardInterrupt:
+        print()
+        print_status('info', "Surveillance arrêtée")
+
+
+if __name__ == "__main__":
+    main()
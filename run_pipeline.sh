@@ -257,6 +257,23 @@ fi
 show_elapsed_time $step3_start
 echo ""
 
+# === ÉTAPE 3bis: PANGÉNOME K-MERS ===
+echo "🧩 === ÉTAPE 3bis: PANGÉNOME K-MERS ==="
+step3b_start=$(date +%s)
+
+log_message "STEP" "Début étape 3bis: Pangénome k-mers (core / accessoire / spécifique)"
+
+python3 -m lacto.pangenome
+check_step "Pangénome k-mers"
+
+log_message "STEP" "Îlots génomiques propres à une souche"
+
+python3 -m lacto.islands
+check_step "Îlots génomiques"
+
+show_elapsed_time $step3b_start
+echo ""
+
 # === ÉTAPE 4: VISUALISATION ===
 echo "4️⃣  === ÉTAPE 4: VISUALISATION ET RAPPORT ==="
 step4_start=$(date +%s)
@@ -422,6 +439,15 @@ if [[ ! "$open_response" =~ ^[Nn]$ ]]; then
     bash "$consultation_script"
 fi
 
+# Option pour démarrer le service local des résultats (HTTP/JSON)
+echo ""
+echo "Voulez-vous démarrer le service local des résultats (http://127.0.0.1:8765)? (y/N)"
+read -r serve_response
+if [[ "$serve_response" =~ ^[Yy]$ ]]; then
+    log_message "INFO" "Démarrage du service des résultats"
+    python3 -m lacto.service --port 8765
+fi
+
 echo ""
 echo "🚀 Félicitations! Votre pipeline de génomique comparative fonctionne parfaitement!"
 